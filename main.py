@@ -1,75 +1,188 @@
 # main.py
 
-import pandas as pd
+import argparse
 from src.data_loader import load_and_process_data
+from src.incremental import load_incremental
+from src.streaming import run_stream
+from src.preprocessing import ensure_nltk_data
+from src.sentiment import SCORERS
 from src.analysis import analyze_candidate_topics
-from src.reporting import (
-    save_sentiment_bar_chart,
-    plot_sentiment_over_time,
-    plot_top_words,
-    plot_sentiment_distribution,
-    plot_sentiment_by_timezone,
-    plot_top_positive_candidates_by_timezone,
-    plot_sentiment_wordclouds,
-    plot_interaction_heatmap
-)
-
-
-def run_project():
+from src.render import render_charts
+from src.metrics import PROFILERS, StageMetrics
+from src.heavy_hitters import DEFAULT_CAPACITY, TOPK_BACKENDS
+from src.reporting import candidate_charts, summary_charts
+from src.pipeline import ALL_OUTPUTS, TEXT_OUTPUT, OutputPlan
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Twitter sentiment analysis (GOP Debate 2016)")
+    parser.add_argument('--data', default='data/Sentiment.csv',
+                        help="Path to the input CSV file (default: data/Sentiment.csv)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of processes for VADER scoring and tokenization (default: 1 = serial)")
+    parser.add_argument('--scorer', choices=SCORERS, default='vader',
+                        help="'vader' = exact NLTK VADER, 'fast' = vectorized NumPy approximation, 'linear' = "
+                             "classifier trained on the dataset's labels (python -m src.linear_sentiment train) "
+                             "(default: vader)")
+    parser.add_argument('--tokenizer', choices=['nltk', 'fast'], default='nltk',
+                        help="'nltk' = word_tokenize, 'fast' = one compiled regex, drops URLs and @mentions (default: nltk)")
+    parser.add_argument('--chunksize', type=int, default=100_000,
+                        help="Number of CSV rows loaded and processed at once (default: 100000)")
+    parser.add_argument('--cache-dir', default='cache',
+                        help="Directory for the processed (tokenized + scored) data cache (default: cache)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Always process the CSV from scratch and don't write the cache")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only process rows appended to the CSV since the last --incremental run")
+    parser.add_argument('--render-workers', type=int, default=None,
+                        help="Number of processes for rendering charts (default: same as --workers)")
+    parser.add_argument('--skip-unchanged', action='store_true',
+                        help="Don't recompute or re-render outputs whose inputs haven't changed since the last run")
+    parser.add_argument('--zones', type=int, default=5,
+                        help="Number of most common timezones in the timezone charts (default: 5)")
+    parser.add_argument('--topk', choices=TOPK_BACKENDS, default='exact',
+                        help="Top words / topics / word clouds: 'exact' counts or 'spacesaving' "
+                             "approximate counts with bounded memory (default: exact)")
+    parser.add_argument('--topk-capacity', type=int, default=DEFAULT_CAPACITY,
+                        help=f"Words kept per --topk spacesaving summary (default: {DEFAULT_CAPACITY})")
+    parser.add_argument('--candidates', nargs='+', metavar='NAME', default=None,
+                        help="Only these candidates' charts and text analysis, e.g. --candidates 'Donald Trump' "
+                             "(summary charts always cover all candidates)")
+    parser.add_argument('--outputs', nargs='+', choices=ALL_OUTPUTS, metavar='OUTPUT', default=None,
+                        help="Only these outputs; stages they don't need are not computed "
+                             f"(choices: {', '.join(ALL_OUTPUTS)}; default: all)")
+    parser.add_argument('--skip-text-analysis', action='store_true',
+                        help="Don't run the per-candidate text analysis (topics, collocations, contexts)")
+    parser.add_argument('--quiet', action='store_true',
+                        help="Don't print the per-candidate text analysis (topics, collocations, contexts) "
+                             "or the per-chunk progress")
+    parser.add_argument('--profile', choices=PROFILERS, default=None,
+                        help="Profile every stage; profiles are saved to results/images/profiles/")
+    parser.add_argument('--stream', metavar='SOURCE', default=None,
+                        help="Live mode: read CSV/JSON-lines tweets from a growing file, 'unix:/path.sock' or '-' (stdin)")
+    parser.add_argument('--window', default='15min',
+                        help="Live mode: length of the rolling sentiment window (default: 15min)")
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help="Live mode: max tweets scored in one micro-batch (default: 500)")
+    parser.add_argument('--idle-timeout', type=float, default=None,
+                        help="Live mode: stop after this many seconds without new tweets (default: never)")
+    parser.add_argument('--download-nltk', action='store_true',
+                        help="Download missing NLTK data (stopwords, punkt_tab, vader_lexicon) before the run")
+    return parser.parse_args()
+
+
+def run_project(filepath: str = 'data/Sentiment.csv', workers: int = 1, scorer: str = 'vader',
+                chunksize: int = 100_000, cache_dir: str = 'cache', incremental: bool = False,
+                render_workers: int = None, skip_unchanged: bool = False, num_zones: int = 5,
+                quiet: bool = False, profile: str = None, tokenizer: str = 'nltk',
+                topk_capacity: int = None, candidates: list = None, outputs: list = None,
+                skip_text_analysis: bool = False):
     print("Starting analysis...")
 
-    all_data = load_and_process_data('data/Sentiment.csv')
+    # Čas, paměť a propustnost každé etapy -> results/images/metrics.json a metrics.csv
+    metrics = StageMetrics(profile=profile)
+
+    # Které výstupy se spočítají (--outputs, --candidates, --skip-unchanged), viz src/pipeline.py
+    outputs = list(ALL_OUTPUTS if outputs is None else outputs)
+    if skip_text_analysis and TEXT_OUTPUT in outputs:
+        outputs.remove(TEXT_OUTPUT)
+    with metrics.stage('plan'):
+        plan = OutputPlan(filepath, scorer, tokenizer, outputs, candidates, skip_unchanged, num_zones, topk_capacity)
+        pending = plan.known_pending()
+    if pending == {}:
+        print("All requested outputs are up to date, nothing to compute.")
+        print("\n--- Stage metrics ---")
+        print(metrics.report())
+        metrics.save("results/images")
+        return
+
+    # Tokenizace a zmínky jen když je potřebuje některý z požadovaných výstupů
+    # (před načtením dat jde o odhad ze všech vybraných výstupů, nebo z manifestu)
+    load_stages = plan.stages(pending)
+
+    if incremental:
+        if not cache_dir:
+            print("Error: Incremental mode needs the cache directory (don't combine with --no-cache).")
+            return
+        all_data = load_incremental(filepath, workers=workers, scorer=scorer, chunksize=chunksize,
+                                    cache_dir=cache_dir, metrics=metrics, tokenizer=tokenizer, quiet=quiet)
+    else:
+        all_data = load_and_process_data(filepath, workers=workers, scorer=scorer, chunksize=chunksize,
+                                         cache_dir=cache_dir, metrics=metrics, tokenizer=tokenizer,
+                                         tokenize='tokens' in load_stages, mentions='mentions' in load_stages,
+                                         keep_tokens='row_tokens' in load_stages, key=plan.input_key, quiet=quiet)
     if not all_data:
         print("Error loading data, exiting.")
         return
 
+    available = list(all_data)
+    tweet_counts = {candidate_name: all_data.tweet_count(candidate_name) for candidate_name in available}
+    if pending is None:
+        pending = plan.pending(available)
+    stages = plan.stages(pending)
+    print(f"\nStages: {', '.join(stages)} (outputs to compute: {sum(map(len, pending.values()))})")
+
     print("\n--- Starting analysis for individual candidates ---")
 
-    all_sentiment_counts = {}
+    # Souhrnné statistiky (počty, slova, časová okna, zóny), ze kterých se kreslí grafy
+    aggregates = None
+    if 'aggregates' in stages:
+        with metrics.stage('aggregates', rows=sum(tweet_counts.values())):
+            aggregates = all_data.aggregates
+
+    # Grafy se jen posbírají (data + cesta) a vykreslí se všechny najednou na konci
+    charts = []
 
-    for candidate_name, candidate_df in all_data.items():
+    # Řádky kandidáta (v inkrementálním režimu se kvůli nim načtou uložené bloky) jen pro textovou analýzu
+    for candidate_name in available:
+        if candidate_name not in pending:
+            continue
         print(f"\n===== Analyzing: {candidate_name} =====")
 
         # 1. Textová analýza
-        pos, neg, neu = analyze_candidate_topics(candidate_df, candidate_name)
-
-        all_sentiment_counts[candidate_name] = {
-            'positive': pos,
-            'negative': neg,
-            'neutral': neu
-        }
-
-        # 2. Generování grafů pro kandidáta
-        if len(candidate_df) > 10:
-            print(f"   -> Generating graphs for: {candidate_name}...")
-
-            # Základní grafy
-            safe_name = candidate_name.replace(' ', '_')
-
-            plot_sentiment_over_time(candidate_df, candidate_name, filepath=f"results/images/{safe_name}_time.png")
-            plot_top_words(candidate_df, candidate_name, filepath=f"results/images/{safe_name}_words.png")
-            plot_sentiment_distribution(candidate_df, candidate_name, filepath=f"results/images/{safe_name}_dist.png")
-            plot_sentiment_by_timezone(candidate_df, candidate_name,
-                                       filepath=f"results/images/{safe_name}_timezone.png")
-
-            # (1) NOVÉ: Word Clouds (Pozitivní a Negativní)
-            plot_sentiment_wordclouds(candidate_df, candidate_name,
-                                      filepath_prefix=f"results/images/{safe_name}_wordcloud")
-
-    print("\n--- Creating summary reports ---")
-
-    # Souhrnný sloupcový graf
-    sentiment_df = pd.DataFrame.from_dict(all_sentiment_counts, orient='index')
-    save_sentiment_bar_chart(sentiment_df)
-
-    # Srovnání podle časových zón
-    plot_top_positive_candidates_by_timezone(all_data)
-
-    # Heatmapa interakcí
-    plot_interaction_heatmap(all_data)
+        if TEXT_OUTPUT in pending[candidate_name]:
+            candidate_df = all_data[candidate_name]
+            with metrics.stage('topic_analysis', rows=len(candidate_df)) as counters:
+                analyze_candidate_topics(candidate_df, candidate_name, quiet=quiet, topk_capacity=topk_capacity)
+                counters['tokens'] = int(candidate_df['tokens'].map(len).sum())
+
+        # 2. Data pro grafy kandidáta
+        if tweet_counts[candidate_name] <= 10:
+            continue
+        with metrics.stage('prepare_charts', rows=tweet_counts[candidate_name]):
+            print(f"   -> Preparing graphs for: {candidate_name}...")
+            charts += candidate_charts(aggregates, all_data, candidate_name, num_zones, topk_capacity,
+                                       outputs=pending[candidate_name])
+
+    if None in pending:
+        print("\n--- Creating summary reports ---")
+
+        with metrics.stage('prepare_charts'):
+            charts += summary_charts(aggregates, num_zones, outputs=pending[None])
+
+    with metrics.stage('render_charts', rows=len(charts)):
+        render_charts(charts, workers=workers if render_workers is None else render_workers,
+                      skip_unchanged=skip_unchanged, metrics=metrics)
+    plan.record(pending, available)
 
     print("\nAnalysis complete. Check 'results/images/' for all graphs.")
 
+    print("\n--- Stage metrics ---")
+    print(metrics.report())
+    metrics.save("results/images")
+
 
 if __name__ == "__main__":
-    run_project()
\ No newline at end of file
+    args = parse_args()
+    if not ensure_nltk_data(download=args.download_nltk):
+        raise SystemExit(1)
+    if args.stream:
+        run_stream(args.stream, scorer=args.scorer, tokenizer=args.tokenizer, window=args.window,
+                   batch_size=args.batch_size, idle_timeout=args.idle_timeout)
+    else:
+        run_project(args.data, workers=args.workers, scorer=args.scorer, chunksize=args.chunksize,
+                    cache_dir=None if args.no_cache else args.cache_dir, incremental=args.incremental,
+                    render_workers=args.render_workers, skip_unchanged=args.skip_unchanged,
+                    num_zones=args.zones, quiet=args.quiet, profile=args.profile, tokenizer=args.tokenizer,
+                    topk_capacity=args.topk_capacity if args.topk == 'spacesaving' else None,
+                    candidates=args.candidates, outputs=args.outputs, skip_text_analysis=args.skip_text_analysis)
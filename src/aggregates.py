@@ -0,0 +1,291 @@
+# src/aggregates.py
+
+from collections import Counter
+import numpy as np
+import pandas as pd
+from src.mentions import MENTIONS_COLUMN, mention_matrix
+from src.timestamps import MISSING_TIME, floor_timestamps, to_datetime_index
+from src.vocabulary import TermCounts, Vocabulary
+
+LABELS = ['Positive', 'Negative', 'Neutral']
+
+# Velikost časového okna pro graf vývoje sentimentu
+TIME_BUCKET = '10min'
+
+
+class SentimentAggregates:
+    """
+    Souhrnné statistiky pro každého kandidáta, ze kterých se kreslí grafy:
+      - label_counts:   kandidát -> Counter(popisek -> počet tweetů)
+      - time_buckets:   (kandidát, 10min okno, popisek) -> součet compound skóre + počet tweetů
+      - timezone_stats: kostka (kandidát, časová zóna, popisek) -> součet compound skóre + počet tweetů
+      - mention_counts: matice kandidát (o kom je tweet) x zmíněný kandidát
+      - score_counts:   (kandidát, compound skóre) -> počet tweetů (histogram polarizace)
+      - word_counts:    řídká matice (kandidát, popisek) x id slova ze slovníku 'vocabulary' -> počet
+                        + pozice prvního výskytu v tokenech kandidáta (totéž co FreqDist, shody v pořadí
+                        prvního výskytu), token_totals: kandidát -> počet tokenů
+    Všechno jsou součty, takže statistiky dvou částí dat jdou sečíst (merge)
+    a nová data se dají přidat bez přepočítání starých.
+    """
+
+    def __init__(self):
+        self.label_counts = {}
+        self.time_buckets = pd.DataFrame(columns=['compound_sum', 'count'])
+        self.timezone_stats = pd.DataFrame(columns=['compound_sum', 'count'])
+        self.mention_counts = pd.DataFrame()
+        self.score_counts = pd.Series(dtype='int64')
+        self.vocabulary = Vocabulary()
+        self.word_counts = TermCounts.empty()
+        self.token_totals = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'SentimentAggregates':
+        """Spočítá statistiky ze zpracované tabulky (sloupce candidate, compound, sentiment_label...)."""
+        aggregates = cls()
+        if df.empty:
+            return aggregates
+
+        for candidate_name, group in df.groupby('candidate', observed=True, sort=False):
+            aggregates.label_counts[candidate_name] = Counter(group['sentiment_label'].value_counts().to_dict())
+
+        # Compound skóre má 4 desetinná místa, různých hodnot je málo -> počty místo všech skóre
+        aggregates.score_counts = df.groupby([df['candidate'], df['compound']], sort=False, observed=True).size()
+
+        if 'tweet_created' in df.columns:
+            # Čas je už při načtení převedený na int64 UTC (viz src/timestamps.py), okna se počítají v NumPy
+            valid = df['tweet_created'] != MISSING_TIME
+            buckets = pd.Series(floor_timestamps(df.loc[valid, 'tweet_created'].to_numpy(), TIME_BUCKET),
+                                index=df.index[valid], name='tweet_created')
+            aggregates.time_buckets = _sum_and_count([df.loc[valid, 'candidate'], buckets,
+                                                      df.loc[valid, 'sentiment_label']],
+                                                     df.loc[valid, 'compound'])
+
+        if 'user_timezone' in df.columns:
+            # Jedna kostka pro všechny regionální grafy, klíče jsou kategorické (malé kódy místo textů)
+            valid = df['user_timezone'].notna()
+            aggregates.timezone_stats = _sum_and_count([df.loc[valid, 'candidate'], df.loc[valid, 'user_timezone'],
+                                                        df.loc[valid, 'sentiment_label'].astype('category')],
+                                                       df.loc[valid, 'compound'])
+
+        if MENTIONS_COLUMN in df.columns:
+            aggregates.mention_counts = mention_matrix(df)
+
+        if 'tokens' in df.columns:
+            aggregates.vocabulary, aggregates.word_counts, aggregates.token_totals = _count_words(df)
+
+        return aggregates
+
+    def merge(self, other: 'SentimentAggregates') -> 'SentimentAggregates':
+        """Vrátí nové statistiky = self + other (pořadí prvního výskytu zůstává ze 'self')."""
+        return SentimentAggregates.combine([self, other])
+
+    @classmethod
+    def combine(cls, parts: list) -> 'SentimentAggregates':
+        """
+        Sečte statistiky libovolného počtu částí (bloky CSV, shardy) najednou - jedno spojení
+        a groupby na tabulku, ne postupné slučování (to by s počtem částí rostlo kvadraticky).
+        """
+        merged = cls()
+        for part in parts:
+            for candidate_name, counts in part.label_counts.items():
+                merged.label_counts.setdefault(candidate_name, Counter()).update(counts)
+
+        merged.time_buckets = _merge_sums([part.time_buckets for part in parts], merged.time_buckets)
+        merged.timezone_stats = _merge_sums([part.timezone_stats for part in parts], merged.timezone_stats)
+        merged.mention_counts = _merge_matrix([part.mention_counts for part in parts])
+        merged.score_counts = _merge_sums([part.score_counts for part in parts], merged.score_counts)
+
+        # Id slov a skupin se přečíslují do společného slovníku, pozice prvního výskytu
+        # se posunou za všechny tokeny kandidáta v předchozích částech
+        word_parts = [part for part in parts if part.word_counts.matrix.nnz]
+        if len(word_parts) == 1:
+            merged.vocabulary, merged.word_counts = word_parts[0].vocabulary, word_parts[0].word_counts
+        keys, rows, columns, counts, first = {}, [], [], [], []
+        for part in parts:
+            words = part.word_counts
+            if len(word_parts) > 1 and words.matrix.nnz:
+                word_ids = merged.vocabulary.add(part.vocabulary.words)
+                key_ids = np.array([keys.setdefault(key, len(keys)) for key in words.keys], dtype=np.int64)
+                offsets = np.array([merged.token_totals.get(candidate_name, 0) for candidate_name, _ in words.keys],
+                                   dtype=np.int64)
+                part_rows = words.row_ids()
+                rows.append(key_ids[part_rows])
+                columns.append(word_ids[words.matrix.indices])
+                counts.append(words.matrix.data)
+                first.append(words.first + offsets[part_rows])
+            for candidate_name, total in part.token_totals.items():
+                merged.token_totals[candidate_name] = merged.token_totals.get(candidate_name, 0) + total
+        if rows:
+            merged.word_counts = TermCounts(list(keys), np.concatenate(rows), np.concatenate(columns),
+                                            np.concatenate(counts), np.concatenate(first), len(merged.vocabulary))
+        return merged
+
+    # --- Data pro jednotlivé grafy ---
+
+    def interaction_matrix(self) -> pd.DataFrame:
+        """
+        Heatmapa "kdo mluví o kom": řádky = všichni kandidáti, sloupce = kandidáti,
+        které jde zmínit (bez "No candidate mentioned"), obojí v pořadí výskytu v datech.
+        """
+        speakers = list(self.mention_counts.index)
+        targets = [name for name in speakers if name in self.mention_counts.columns]
+        return self.mention_counts.loc[speakers, targets]
+
+    def sentiment_counts(self) -> pd.DataFrame:
+        """Tabulka kandidát x (positive, negative, neutral) pro souhrnný sloupcový graf."""
+        rows = {
+            candidate_name: {label.lower(): counts.get(label, 0) for label in LABELS}
+            for candidate_name, counts in self.label_counts.items()
+        }
+        return pd.DataFrame.from_dict(rows, orient='index')
+
+    def top_words(self, candidate_name: str = None, label: str = None, num: int = 15, exclude=None) -> list:
+        """
+        Nejčastější slova [(slovo, počet), ...] kandidáta (bez kandidáta všech tweetů),
+        volitelně jen jednoho sentimentu = součet vybraných řádků 'word_counts'.
+        Slova z 'exclude' se vynechají, shody v pořadí prvního výskytu.
+        """
+        words = self.word_counts
+        rows = [i for i, (key_candidate, key_label) in enumerate(words.keys)
+                if candidate_name in (None, key_candidate) and label in (None, key_label)]
+        if not rows:
+            return []
+
+        first_offsets = None
+        if candidate_name is None:
+            # Pozice jsou v rámci kandidáta, posunou se za tokeny dřívějších kandidátů
+            # (= pořadí v tabulce seřazené podle kandidáta)
+            starts = dict(zip(self.token_totals, np.cumsum([0] + list(self.token_totals.values()))))
+            first_offsets = np.array([starts[words.keys[i][0]] for i in rows], dtype=np.int64)
+        exclude_ids = [self.vocabulary.ids[word] for word in exclude or () if word in self.vocabulary.ids]
+        return [(self.vocabulary.words[word_id], count)
+                for word_id, count in words.top(rows, num, exclude_ids, first_offsets)]
+
+    def score_distribution(self, candidate_name: str) -> pd.Series:
+        """Počet tweetů kandidáta pro každou hodnotu compound skóre (index = skóre) pro histogram."""
+        if candidate_name not in self.score_counts.index.get_level_values(0):
+            return pd.Series(dtype='int64')
+        return self.score_counts.xs(candidate_name, level=0)
+
+    def sentiment_trend(self, candidate_name: str, label: str = None) -> pd.Series:
+        """
+        Průměrné compound skóre v 10min oknech (prázdná okna = NaN, stejně jako resample),
+        volitelně jen pro tweety s jedním popiskem ('Positive', ...).
+        """
+        if candidate_name not in self.time_buckets.index.get_level_values(0):
+            return pd.Series(dtype=float)
+        stats = self.time_buckets.xs(candidate_name, level=0)
+        if label is not None:
+            stats = stats[stats.index.get_level_values('sentiment_label') == label]
+        stats = stats.groupby(level='tweet_created').sum()
+        if stats.empty:
+            return pd.Series(dtype=float)
+
+        trend = (stats['compound_sum'] / stats['count']).rename('compound')
+        trend.index = to_datetime_index(trend.index, name='tweet_created')
+        return trend.asfreq(TIME_BUCKET)
+
+    def timezone_sentiment(self, candidate_name: str, num_zones: int = 5) -> pd.Series:
+        """Průměrné compound skóre v 'num_zones' nejčastějších časových zónách kandidáta."""
+        if candidate_name not in self.timezone_stats.index.get_level_values(0):
+            return pd.Series(dtype=float)
+        stats = (self.timezone_stats.xs(candidate_name, level=0)
+                 .groupby(level='user_timezone', sort=False, observed=True).sum())
+        # Stabilní řazení: při shodném počtu rozhoduje pořadí prvního výskytu
+        top = stats.sort_values('count', ascending=False, kind='stable').head(num_zones)
+        return (top['compound_sum'] / top['count']).rename('compound').sort_values()
+
+    def top_timezones(self, num_zones: int = 5) -> list:
+        """'num_zones' časových zón s nejvíc tweety (všichni kandidáti), shody v pořadí prvního výskytu."""
+        if self.timezone_stats.empty:
+            return []
+        counts = self.timezone_stats['count'].groupby(level='user_timezone', sort=False, observed=True).sum()
+        return counts.sort_values(ascending=False, kind='stable').head(num_zones).index.tolist()
+
+    def timezone_comparison(self, num_zones: int = 5, num_candidates: int = 5, min_tweets: int = 10) -> list:
+        """
+        Data pro srovnání kandidátů v 'num_zones' nejčastějších zónách: [(zóna, tabulka), ...].
+        Tabulka = podíl Positive / Neutral / Negative pro 'num_candidates' kandidátů
+        s nejvyšším podílem pozitivních tweetů (jen kandidáti s víc než 'min_tweets' tweety v zóně),
+        prázdná tabulka = v zóně nikdo takový není. Bez údajů o zónách prázdný seznam.
+        """
+        if self.timezone_stats.empty:
+            return []
+        label_counts = self.timezone_stats['count'].unstack('sentiment_label', fill_value=0)
+
+        comparison = []
+        for zone in self.top_timezones(num_zones):
+            counts = label_counts.xs(zone, level='user_timezone').sort_index()
+            counts = counts.reindex(columns=['Positive', 'Neutral', 'Negative'], fill_value=0)
+
+            counts['Total'] = counts.sum(axis=1)
+            counts = counts[counts['Total'] > min_tweets]
+
+            counts['Pos_Pct'] = counts['Positive'] / counts['Total']
+            top_cands = counts.sort_values(by='Pos_Pct', ascending=True).tail(num_candidates)
+            plot_data = top_cands[['Positive', 'Neutral', 'Negative']].div(top_cands['Total'], axis=0)
+            comparison.append((zone, plot_data))
+        return comparison
+
+
+def _sum_and_count(keys: list, compound: pd.Series) -> pd.DataFrame:
+    """
+    Součet a počet compound skóre pro každou kombinaci klíčů (první je kandidát),
+    v pořadí prvního výskytu.
+    """
+    keys = [keys[0].rename('candidate')] + list(keys[1:])
+    grouped = compound.groupby(keys, sort=False, observed=True)
+    return pd.DataFrame({'compound_sum': grouped.sum(), 'count': grouped.count()})
+
+
+def _count_words(df: pd.DataFrame):
+    """
+    Počty slov (kandidát, popisek) x slovo ze sloupce 'tokens' jako TermCounts nad vlastním slovníkem.
+    'first' = pozice prvního výskytu v tokenech kandidáta (v pořadí řádků), pro pořadí shod jako u FreqDist.
+    Vrací (slovník, počty, kandidát -> počet tokenů).
+    """
+    lengths = df['tokens'].map(len).to_numpy()
+    candidates = df['candidate'].astype(str).to_numpy()
+    token_totals = pd.Series(lengths).groupby(candidates, sort=False).sum().to_dict()
+    vocabulary = Vocabulary()
+    if lengths.sum() == 0:
+        return vocabulary, TermCounts.empty(), token_totals
+
+    word_ids = vocabulary.add([token for tokens in df['tokens'] for token in tokens])
+    group_codes, groups = pd.MultiIndex.from_arrays([candidates, df['sentiment_label'].to_numpy()]).factorize()
+    token_candidates = np.repeat(candidates, lengths)
+    positions = pd.Series(np.ones(len(word_ids), dtype=np.int64)).groupby(token_candidates).cumsum().to_numpy() - 1
+    counts = TermCounts(list(groups), np.repeat(group_codes, lengths), word_ids, np.ones(len(word_ids)),
+                        positions, len(vocabulary))
+    return vocabulary, counts, token_totals
+
+
+def _merge_sums(tables: list, empty):
+    """
+    Sečte tabulky (nebo řady) součtů a počtů se stejnými klíči, klíče v pořadí prvního výskytu
+    (nové klíče pozdějších tabulek se přidají na konec). Bez neprázdných tabulek vrací 'empty'.
+    """
+    tables = [table for table in tables if not table.empty]
+    if not tables:
+        return empty
+    if len(tables) == 1:
+        return tables[0].copy()
+    combined = pd.concat(tables)
+    return combined.groupby(level=list(range(combined.index.nlevels)), sort=False).sum()
+
+
+def _merge_matrix(matrices: list) -> pd.DataFrame:
+    """Sečte matice zmínek, řádky/sloupce chybějící v dřívějších maticích se přidají na konec."""
+    matrices = [matrix for matrix in matrices if not matrix.empty]
+    if not matrices:
+        return pd.DataFrame()
+    if len(matrices) == 1:
+        return matrices[0].copy()
+    index, columns = [], []
+    for matrix in matrices:
+        index += [name for name in matrix.index if name not in index]
+        columns += [name for name in matrix.columns if name not in columns]
+    total = pd.DataFrame(0, index=index, columns=columns, dtype=matrices[0].values.dtype)
+    for matrix in matrices:
+        total = total + matrix.reindex(index=index, columns=columns, fill_value=0)
+    return total
@@ -1,134 +1,131 @@
 # src/analysis.py
 
+import textwrap
 import pandas as pd
-from src.preprocessing import preprocess_text  # Importujeme tvůj hotový čistič
+from src.preprocessing import flatten_tokens  # Tokeny jsou předpočítané ve sloupci 'tokens'
+from src.topic_stats import TopicStats  # Frekvence, kolokace a shody místo nltk.FreqDist / nltk.Text
+from src.heavy_hitters import SpaceSaving
 
-# Importy pro VADER a NLTK analýzu
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from nltk.probability import FreqDist
-from nltk import Text
+# Po kolika tokenech se staví dílčí Space-Saving souhrny top témat, které se pak sloučí
+# (souhrn má max. 'capacity' slov, ne všechna různá slova)
+SUMMARY_BLOCK_TOKENS = 100_000
 
-# Inicializace VADERu (stačí jednou, když se soubor načte)
-# Předpokládá, že 'vader_lexicon' je stažený (což řeší preprocessing.py)
-try:
-    sia = SentimentIntensityAnalyzer()
-except LookupError:
-    print("CHYBA: VADER lexicon nebyl nalezen.")
-    print("Prosím, ujisti se, že 'nltk.download(\"vader_lexicon\")' je v src/preprocessing.py.")
-    # Pokud VADER není, skript spadne, což je v pořádku,
-    # protože bez něj nemůže analýza běžet.
 
-
-def analyze_candidate_topics(candidate_df: pd.DataFrame, candidate_name: str):
+def analyze_candidate_topics(candidate_df: pd.DataFrame, candidate_name: str, quiet: bool = False,
+                             topk_capacity: int = None):
     """
     Provede kompletní Krok 4 a 5 pro jeden dataframe kandidáta.
     Tuto funkci bude volat main.py.
+    S quiet=True se témata jen spočítají a nevypisují (u velkých dat stojí výpis do konzole dost času).
+    S 'topk_capacity' se témata počítají jen pro slova ze Space-Saving souhrnu (max. 'topk_capacity' slov).
 
     Vrací:
         Tuple (int, int, int): (počet pozitivních, počet negativních, počet neutrálních)
     """
-    print(f"\n=== OBECNÁ ANALÝZA (všechny tweety) pro: {candidate_name} ===")
-    all_tokens = []
-    for text in candidate_df['text']:
-        all_tokens.extend(preprocess_text(text))
-
-    _run_full_nltk_analysis(all_tokens)
-    print("=======================================================\n")
+    if not quiet:
+        print(f"\n=== OBECNÁ ANALÝZA (všechny tweety) pro: {candidate_name} ===")
+    all_tokens = flatten_tokens(candidate_df['tokens'])
 
-    positive_raw_tweets = []
-    negative_raw_tweets = []
-    neutral_raw_tweets = []  # Potřebujeme pro Graf 1
-
-    print(f"Running VADER sentiment analysis on {len(candidate_df)} tweets for {candidate_name}...")
+    _run_full_nltk_analysis(all_tokens, quiet=quiet, topk_capacity=topk_capacity)
+    if not quiet:
+        print("=======================================================\n")
 
     # Krok 5: Rozdělení tweetů podle sentimentu
-    for text in candidate_df['text']:
-        # VADER spouštíme na surovém textu
-        score = sia.polarity_scores(text)['compound']
-
-        if score > 0.05:
-            positive_raw_tweets.append(text)
-        elif score < -0.05:
-            negative_raw_tweets.append(text)
-        else:
-            neutral_raw_tweets.append(text)
+    # VADER skóre už je spočítané při načítání dat (sloupec 'sentiment_label')
+    print(f"Using VADER sentiment scores of {len(candidate_df)} tweets for {candidate_name}...")
+
+    labels = candidate_df['sentiment_label']
+    positive_tweet_tokens = candidate_df.loc[labels == 'Positive', 'tokens']
+    negative_tweet_tokens = candidate_df.loc[labels == 'Negative', 'tokens']
+    neutral_tweet_tokens = candidate_df.loc[labels == 'Neutral', 'tokens']  # Potřebujeme pro Graf 1
 
     print(
-        f"Found {len(positive_raw_tweets)} positive, {len(negative_raw_tweets)} negative, and {len(neutral_raw_tweets)} neutral tweets.")
+        f"Found {len(positive_tweet_tokens)} positive, {len(negative_tweet_tokens)} negative, and {len(neutral_tweet_tokens)} neutral tweets.")
 
     # --- Krok 4: Analýza témat ---
 
     # Část A: Analýza POZITIVNÍCH témat (čemu se věnovat)
-    print("\n--- Analýza POZITIVNÍCH témat (čemu se věnovat) ---")
+    if not quiet:
+        print("\n--- Analýza POZITIVNÍCH témat (čemu se věnovat) ---")
 
-    # 1. Vyčistíme jen pozitivní tweety
-    positive_tokens = []
-    for text in positive_raw_tweets:
-        positive_tokens.extend(preprocess_text(text))  # Použijeme importovanou funkci
+    # 1. Vezmeme už vyčištěné tokeny jen pozitivních tweetů
+    positive_tokens = flatten_tokens(positive_tweet_tokens)
 
     # 2. Spustíme kompletní NLTK analýzu (všechny 3 body)
-    _run_full_nltk_analysis(positive_tokens)
+    _run_full_nltk_analysis(positive_tokens, quiet=quiet, topk_capacity=topk_capacity)
 
     # Část B: Analýza NEGATIVNÍCH témat (čemu se vyhnout)
-    print("\n--- Analýza NEGATIVNÍCH témat (čemu se vyhnout) ---")
+    if not quiet:
+        print("\n--- Analýza NEGATIVNÍCH témat (čemu se vyhnout) ---")
 
-    # 1. Vyčistíme jen negativní tweety
-    negative_tokens = []
-    for text in negative_raw_tweets:
-        negative_tokens.extend(preprocess_text(text))
+    # 1. Vezmeme už vyčištěné tokeny jen negativních tweetů
+    negative_tokens = flatten_tokens(negative_tweet_tokens)
 
     # 2. Spustíme kompletní NLTK analýzu (všechny 3 body)
-    _run_full_nltk_analysis(negative_tokens)
+    _run_full_nltk_analysis(negative_tokens, quiet=quiet, topk_capacity=topk_capacity)
 
     # Konec analýzy pro tohoto kandidáta
 
     # Vrátíme počty, které si main.py převezme pro reporting
-    return len(positive_raw_tweets), len(negative_raw_tweets), len(neutral_raw_tweets)
+    return len(positive_tweet_tokens), len(negative_tweet_tokens), len(neutral_tweet_tokens)
 
 
-def _run_full_nltk_analysis(tokens: list, num_topics=10):
+def _run_full_nltk_analysis(tokens: list, num_topics=10, quiet: bool = False, topk_capacity: int = None) -> dict:
     """
     Privátní/pomocná funkce, která provede všechny 3 NLTK analýzy.
     (Frekvence, Kolokace, Shody)
+    Počítá src/topic_stats.py (stejné výsledky jako FreqDist / nltk.Text), tady se jen vypisují
+    (s quiet=True vůbec). S 'topk_capacity' se témata, kolokace i kontext počítají jen pro slova,
+    která zůstala ve Space-Saving souhrnu (max. 'topk_capacity' slov, viz TopicStats 'words').
+    Vrací výsledky z TopicStats.summary (nebo None pro prázdný seznam).
     """
     if not tokens:
-        print("No relevant tokens found to analyze (empty list).")
-        return
+        if not quiet:
+            print("No relevant tokens found to analyze (empty list).")
+        return None
+
+    words = _candidate_topics(tokens, topk_capacity) if topk_capacity is not None else None
+    stats = TopicStats(tokens, words=words)
+    results = stats.summary(num_topics=num_topics, num_collocations=5, num_contexts=3, lines=5)
+    if quiet:
+        return results
 
     # KROK 1: FREKVENČNÍ CHARAKTERISTIKY
     print(f"\nTop {num_topics} témat (Frekvence):")
-    try:
-        fdist = FreqDist(tokens)
-        top_topics = fdist.most_common(num_topics)
-        print(top_topics)
-    except Exception as e:
-        print(f"Error calculating FreqDist: {e}")
-        return  # Pokud selže FreqDist, nemá smysl pokračovat
-
-    # Vytvoříme NLTK Text objekt, který potřebujeme pro Krok 2 a 3
-    text_obj = Text(tokens)
+    top_topics = results['top_topics']
+    print(top_topics)
 
     # KROK 2: KOLOKACE (FRÁZE)
     print("\nČasté fráze (Kolokace):")
-    try:
-        text_obj.collocations(num=5)  # .collocations() si to vypíše samo
-    except Exception as e:
-        print(f"Error calculating Collocations: {e}")
+    collocation_strings = [w1 + " " + w2 for w1, w2 in results['collocations']]
+    print("\n".join(textwrap.wrap("; ".join(collocation_strings), width=70)))
 
     # KROK 3: SHODY (CONCORDANCE)
     print("\nKontext pro top 3 témata (Shody):")
     if not top_topics:
         print("Žádná top témata k zobrazení kontextu.")
-        return
-
-    try:
-        # Projedeme první 3 slova z 'top_topics' a ukážeme jejich kontext
-        # top_topics je seznam [('great', 50), ('better', 30), ...]
-        for topic_tuple in top_topics[:3]:
-            word = topic_tuple[0]  # vezmeme jen to slovo, např. 'great'
-            print(f"--- Kontext pro slovo: '{word}' ---")
-            # Vypíšeme max 5 řádků kontextu, ať to není moc dlouhé
-            text_obj.concordance(word, lines=5)
-            print("---")  # Oddělovač
-    except Exception as e:
-        print(f"Error calculating Concordance: {e}")
\ No newline at end of file
+        return results
+
+    # Projedeme první 3 slova z 'top_topics' a ukážeme jejich kontext (max 5 řádků)
+    for word, (total, context_lines) in results['concordances'].items():
+        print(f"--- Kontext pro slovo: '{word}' ---")
+        if not context_lines:
+            print("no matches")
+        else:
+            print(f"Displaying {len(context_lines)} of {total} matches:")
+            for context_line in context_lines:
+                print(context_line.line)
+        print("---")  # Oddělovač
+
+    return results
+
+
+def _candidate_topics(tokens: list, capacity: int) -> list:
+    """
+    Slova, která zůstala ve Space-Saving souhrnu (staveném po blocích SUMMARY_BLOCK_TOKENS tokenů
+    a pak sloučeném) - kandidáti na top témata, přesné počty pro ně pak spočítá TopicStats.
+    """
+    summary = SpaceSaving(capacity)
+    for start in range(0, len(tokens), SUMMARY_BLOCK_TOKENS):
+        summary = summary.merge(SpaceSaving(capacity).update_many(tokens[start:start + SUMMARY_BLOCK_TOKENS]))
+    return list(summary.counts)
@@ -0,0 +1,181 @@
+# src/benchmark.py
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from src.metrics import StageMetrics
+from src.synthetic_data import generate_csv
+
+DEFAULT_OUTPUT = 'results/benchmarks/benchmark.json'
+
+
+def _git_commit() -> str:
+    """Aktuální commit (aby šly výsledky porovnat mezi verzemi), nebo None mimo git."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark_file(filepath: str, scorer: str = 'vader', workers: int = 1,
+                   chunksize: int = 100_000, charts: bool = True, tokenizer: str = 'nltk') -> StageMetrics:
+    """
+    Projde celou pipeline nad jedním CSV a změří každou etapu zvlášť
+    (načtení, filtr, skóre, tokenizace, zmínky, rozdělení, statistiky, analýza témat, grafy).
+    """
+    # Importy až tady, ať jde generátor dat spustit i bez NLTK dat
+    from src.data_loader import load_data, filter_data, split_by_all_candidates
+    from src.sentiment import score_sentiment
+    from src.preprocessing import tokenize_data
+    from src.mentions import add_mentions
+    from src.dedup import TextCache
+    from src.parallel import worker_pool
+    from src.analysis import analyze_candidate_topics
+    from src import reporting
+
+    metrics = StageMetrics()
+
+    with metrics.stage('load') as record:
+        df = load_data(filepath, chunksize)
+        record['rows'] = len(df)
+    with metrics.stage('filter', rows=len(df)):
+        df = filter_data(df)
+    with worker_pool(workers) as executor:
+        with metrics.stage(f'score_{scorer}', rows=len(df)):
+            df = score_sentiment(df, workers, scorer, TextCache(), executor=executor)
+        with metrics.stage(f'tokenize_{tokenizer}', rows=len(df)):
+            df = tokenize_data(df, workers, tokenizer, TextCache(), executor=executor)
+    with metrics.stage('mentions', rows=len(df)):
+        df = add_mentions(df)
+    with metrics.stage('split', rows=len(df)):
+        all_data = split_by_all_candidates(df)
+    with metrics.stage('aggregates', rows=len(df)):
+        aggregates = all_data.aggregates
+
+    # Textová analýza vypisuje hodně textu, měříme výpočet, ne konzoli
+    with metrics.stage('analyze_candidate_topics', rows=len(df)):
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for candidate_name, candidate_df in all_data.items():
+                analyze_candidate_topics(candidate_df, candidate_name)
+
+    if not charts:
+        return metrics
+
+    # Grafy pro kandidáta s nejvíc tweety + souhrnné grafy, každá funkce zvlášť
+    name = max(all_data, key=lambda candidate: len(all_data[candidate]))
+    with tempfile.TemporaryDirectory() as output_dir, \
+            open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        chart_inputs = [
+            (reporting.plot_sentiment_over_time, (aggregates.sentiment_trend(name), name)),
+            (reporting.plot_top_words, (all_data.top_words(name), name)),
+            (reporting.plot_sentiment_distribution, (aggregates.score_distribution(name), name)),
+            (reporting.plot_sentiment_by_timezone, (aggregates.timezone_sentiment(name), name)),
+            (reporting.plot_sentiment_wordcloud,
+             (reporting.wordcloud_frequencies(all_data, name, 'Positive'), name, 'Positive', 'Greens')),
+            (reporting.save_sentiment_bar_chart, (aggregates.sentiment_counts(),)),
+            (reporting.plot_top_positive_candidates_by_timezone, (aggregates.timezone_comparison(),)),
+            (reporting.plot_interaction_heatmap, (aggregates.interaction_matrix(),)),
+        ]
+        for func, args in chart_inputs:
+            with metrics.stage(func.__name__):
+                func(*args, filepath=os.path.join(output_dir, f"{func.__name__}.png"))
+
+    return metrics
+
+
+def run_benchmarks(scales: list, source: str = 'data/Sentiment.csv', output: str = DEFAULT_OUTPUT,
+                   scorer: str = 'vader', workers: int = 1, chunksize: int = 100_000,
+                   charts: bool = True, keep_data: bool = False, tokenizer: str = 'nltk') -> dict:
+    """
+    Pro každé měřítko (1 = originální soubor, 10 = 10x víc řádků...) vygeneruje data,
+    změří pipeline a všechno uloží do jednoho JSON souboru.
+    """
+    results = {
+        'commit': _git_commit(),
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scorer': scorer,
+        'tokenizer': tokenizer,
+        'workers': workers,
+        'chunksize': chunksize,
+        'runs': [],
+    }
+
+    for scale in scales:
+        filepath = source if scale == 1 else generate_csv(scale, source=source)
+        print(f"\n=== Benchmark: {filepath} (scale {scale}x) ===")
+        metrics = benchmark_file(filepath, scorer=scorer, workers=workers, chunksize=chunksize, charts=charts,
+                                 tokenizer=tokenizer)
+        print(metrics.report())
+
+        results['runs'].append({
+            'scale': scale,
+            'file_mb': round(os.path.getsize(filepath) / 2 ** 20, 1),
+            'total_seconds': round(metrics.total_seconds(), 3),
+            'stages': metrics.records,
+        })
+        if scale != 1 and not keep_data:
+            os.remove(filepath)
+            if not os.listdir(os.path.dirname(filepath)):
+                os.rmdir(os.path.dirname(filepath))
+
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nBenchmark results saved: {output}")
+    return results
+
+
+def compare(old_path: str, new_path: str):
+    """Vypíše časy etap dvou benchmarků vedle sebe (např. před a po změně)."""
+    with open(old_path, encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+
+    print(f"Comparing {old_path} ({old.get('commit')}) -> {new_path} ({new.get('commit')})")
+    old_runs = {run['scale']: run for run in old['runs']}
+    for run in new['runs']:
+        if run['scale'] not in old_runs:
+            continue
+        old_stages = {record['stage']: record for record in old_runs[run['scale']]['stages']}
+        print(f"\n--- scale {run['scale']}x ---")
+        print(f"{'stage':<48}{'old s':>10}{'new s':>10}{'speedup':>10}{'old MB':>10}{'new MB':>10}")
+        for record in run['stages']:
+            before = old_stages.get(record['stage'])
+            if before is None:
+                continue
+            speedup = before['seconds'] / record['seconds'] if record['seconds'] else float('inf')
+            print(f"{record['stage']:<48}{before['seconds']:>10.3f}{record['seconds']:>10.3f}{speedup:>9.2f}x"
+                  f"{before['rss_peak_mb']:>10.1f}{record['rss_peak_mb']:>10.1f}")
+
+
+# ---- Spuštění benchmarku ----
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the whole pipeline on synthetic data")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10],
+                        help="Data sizes relative to the original, e.g. --scales 10 100 1000 (default: 1 10)")
+    parser.add_argument('--source', default='data/Sentiment.csv', help="Original CSV (default: data/Sentiment.csv)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f"Results JSON (default: {DEFAULT_OUTPUT})")
+    parser.add_argument('--scorer', choices=['vader', 'fast', 'linear'], default='vader', help="Sentiment scorer (default: vader)")
+    parser.add_argument('--tokenizer', choices=['nltk', 'fast'], default='nltk', help="Tokenizer (default: nltk)")
+    parser.add_argument('--workers', type=int, default=1, help="Processes for scoring and tokenization (default: 1)")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="CSV rows per chunk (default: 100000)")
+    parser.add_argument('--no-charts', action='store_true', help="Don't benchmark the chart functions")
+    parser.add_argument('--keep-data', action='store_true', help="Keep the generated CSVs in data/synthetic/")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="Compare two results JSON files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run_benchmarks(args.scales, source=args.source, output=args.output, scorer=args.scorer,
+                       workers=args.workers, chunksize=args.chunksize, charts=not args.no_charts,
+                       keep_data=args.keep_data, tokenizer=args.tokenizer)
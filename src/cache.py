@@ -0,0 +1,90 @@
+# src/cache.py
+
+import hashlib
+import os
+import pandas as pd
+
+# Zvýšit při změně formátu uložené tabulky (staré soubory se pak nepoužijí)
+CACHE_VERSION = 6
+DEFAULT_CACHE_DIR = 'cache'
+
+
+def file_hash(filepath: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 obsahu souboru, čte se po blocích (soubor se nenačítá celý do paměti)."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def config_key(scorer: str, tokenizer: str = 'nltk') -> str:
+    """
+    Otisk nastavení zpracování: seznam stopwords + verze VADER lexikonu + scorer + tokenizer + verze formátu
+    (u --scorer linear i obsah natrénovaného modelu, nový trénink zneplatní cache).
+    """
+    from src.preprocessing import get_stop_words
+    from src.sentiment import get_analyzer
+
+    sia = get_analyzer()
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_VERSION}|{scorer}|{tokenizer}|".encode())
+    digest.update("|".join(sorted(get_stop_words())).encode())
+    digest.update((sia.lexicon_file if sia is not None else '').encode())
+    if scorer == 'linear':
+        from src.linear_sentiment import DEFAULT_MODEL_PATH
+        digest.update((file_hash(DEFAULT_MODEL_PATH) if os.path.exists(DEFAULT_MODEL_PATH) else '').encode())
+    return digest.hexdigest()
+
+
+def cache_key(filepath: str, scorer: str, tokenizer: str = 'nltk') -> str:
+    """
+    Klíč cache: obsah vstupního souboru + nastavení zpracování (viz config_key).
+    Změna kterékoliv části dá nový klíč, takže stará cache se sama zneplatní.
+    """
+    digest = hashlib.sha256()
+    digest.update(config_key(scorer, tokenizer).encode())
+    digest.update(file_hash(filepath).encode())
+    return digest.hexdigest()
+
+
+def _cache_path(filepath: str, key: str, cache_dir: str) -> str:
+    base_name = os.path.splitext(os.path.basename(filepath))[0]
+    return os.path.join(cache_dir, f"{base_name}_{key[:16]}.pkl")
+
+
+def load_cached(filepath: str, key: str, cache_dir: str = DEFAULT_CACHE_DIR):
+    """
+    Vrátí uloženou dvojici (zpracovaná tabulka, SentimentAggregates), nebo None,
+    pokud pro klíč (viz cache_key) nic uloženého není.
+    """
+    path = _cache_path(filepath, key, cache_dir)
+    if not os.path.exists(path):
+        return None
+
+    print(f"Loading processed data from cache: {path}...")
+    try:
+        return pd.read_pickle(path)
+    except Exception as e:
+        print(f"Warning: Cache file '{path}' could not be read ({e}), processing from scratch.")
+        return None
+
+
+def save_cached(data: tuple, filepath: str, key: str, cache_dir: str = DEFAULT_CACHE_DIR):
+    """
+    Uloží (zpracovaná tabulka, SentimentAggregates) do cache a smaže starší verze pro stejný vstupní soubor.
+    Statistiky se ukládají s tabulkou, protože tabulka už nemá sloupce, ze kterých se počítají.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(filepath, key, cache_dir)
+
+    # Zastaralé záznamy stejného souboru (jiný obsah / stopwords / lexikon) už nikdy nepoužijeme
+    base_name = os.path.splitext(os.path.basename(filepath))[0]
+    for name in os.listdir(cache_dir):
+        old_path = os.path.join(cache_dir, name)
+        stem, ext = os.path.splitext(name)
+        if ext == '.pkl' and stem.rsplit('_', 1)[0] == base_name and old_path != path:
+            os.remove(old_path)
+
+    pd.to_pickle(data, path)
+    print(f"Processed data cached: {path}")
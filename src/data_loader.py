@@ -1,28 +1,146 @@
 # src/data_loader.py
 
+import io
+import os
+import numpy as np
 import pandas as pd
-from typing import Dict
-
-# Definujeme, že funkce vrací slovník
-DataFrameDict = Dict[str, pd.DataFrame]
-
-
-def load_data(filepath: str) -> pd.DataFrame:
-    """Krok 1: Načte data z CSVčka."""
-    print(f"Loading file: {filepath}...")
+from collections.abc import Mapping
+from typing import Iterator
+from src.sentiment import score_sentiment
+from src.preprocessing import tokenize_data
+from src.cache import cache_key, load_cached, save_cached
+from src.aggregates import SentimentAggregates
+from src.mentions import add_mentions
+from src.heavy_hitters import DEFAULT_CAPACITY, SpaceSaving
+from src.timestamps import parse_timestamps
+from src.metrics import StageMetrics, stage, timed_iter
+from src.dedup import TextCache
+from src.parallel import worker_pool
+
+# Ze CSV čteme jen tyhle sloupce, ostatních 17 vůbec nenačítáme
+# (tweet_created se hned po načtení převede na int64 UTC, viz src/timestamps.py)
+COLUMN_DTYPES = {
+    'candidate': 'category',
+    'text': str,
+    'tweet_created': str,
+    'user_timezone': 'category',
+}
+CATEGORY_COLUMNS = [col for col, dtype in COLUMN_DTYPES.items() if dtype == 'category']
+
+# Kolik řádků CSV se drží v paměti najednou
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Sloupce, které se ze zpracovaných bloků drží až do konce (textová analýza, top slova podle popisku / zóny).
+# Text, dílčí skóre, čas a zmínky se sečtou do SentimentAggregates už v bloku a dál se nedrží.
+FRAME_COLUMNS = ['candidate', 'user_timezone', 'sentiment_label', 'tokens']
+
+# Po kolika tweetech se staví dílčí Space-Saving souhrny, které se pak sloučí
+SUMMARY_BLOCK_ROWS = 100_000
+
+
+class _ByteRangeReader(io.RawIOBase):
+    """Soubor, ze kterého jde číst jen úsek bajtů [start, end) - pro načtení jen nově přidaných řádků."""
+
+    def __init__(self, filepath: str, start: int, end: int):
+        self._file = open(filepath, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._file.read(size)
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def iter_data_chunks(filepath: str, chunksize: int = DEFAULT_CHUNK_SIZE,
+                     start_offset: int = 0, end_offset: int = None, columns: list = None) -> Iterator[pd.DataFrame]:
+    """
+    Krok 1: Čte CSV postupně po blocích (chunk) o max. 'chunksize' řádcích.
+    Načítá jen potřebné sloupce s explicitními typy, takže paměť roste s velikostí bloku, ne souboru.
+    'start_offset' / 'end_offset' omezí čtení na úsek souboru v bajtech (musí ležet na hranici řádku),
+    hlavička se v tom případě vezme ze začátku souboru.
+    Čas tweetu se v každém bloku rovnou převede na int64 UTC nanosekundy (parse_timestamps).
+    'columns' = jen některé sloupce z COLUMN_DTYPES (výchozí všechny).
+    """
+    if columns is None:
+        columns = list(COLUMN_DTYPES)
+        print(f"Loading file: {filepath} (chunks of {chunksize} rows)...")
     try:
-        df = pd.read_csv(filepath, encoding='latin-1')
+        header = pd.read_csv(filepath, encoding='latin-1', nrows=0).columns
     except FileNotFoundError:
         print(f"Error: File '{filepath}' not found :(")
+        return
+
+    # Chybějící sloupce nevyžadujeme tady, to kontroluje filter_data
+    usecols = [col for col in columns if col in header]
+    dtypes = {col: COLUMN_DTYPES[col] for col in usecols}
+
+    if start_offset == 0 and end_offset is None:
+        source, header_args = filepath, {}
+    else:
+        end_offset = os.path.getsize(filepath) if end_offset is None else end_offset
+        source = io.BufferedReader(_ByteRangeReader(filepath, start_offset, end_offset))
+        header_args = {} if start_offset == 0 else {'header': None, 'names': list(header)}
+
+    with pd.read_csv(source, encoding='latin-1', usecols=usecols, dtype=dtypes,
+                     chunksize=chunksize, **header_args) as reader:
+        for chunk in reader:
+            if 'tweet_created' in chunk.columns:
+                chunk['tweet_created'] = parse_timestamps(chunk['tweet_created'])
+            yield chunk
+
+
+def concat_chunks(chunks: list) -> pd.DataFrame:
+    """
+    Spojí zpracované bloky do jednoho dataframe.
+    Kategorie se sjednotí, jinak by pandas kategorické sloupce převedl zpět na text.
+    """
+    chunks = [chunk for chunk in chunks if not chunk.empty]
+    if not chunks:
         return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+
+    for col in CATEGORY_COLUMNS:
+        if all(col in chunk.columns for chunk in chunks):
+            categories = pd.api.types.union_categoricals([chunk[col] for chunk in chunks]).categories
+            chunks = [chunk.assign(**{col: chunk[col].cat.set_categories(categories)}) for chunk in chunks]
+
+    return pd.concat(chunks, ignore_index=True)
+
 
-    print("Loaded successfully.")
+def read_candidate_names(filepath: str, start_offset: int = 0, end_offset: int = None) -> list:
+    """Jména kandidátů v pořadí prvního výskytu (čte se jen sloupec 'candidate'), pro aliasy zmínek."""
+    names = {}
+    for chunk in iter_data_chunks(filepath, DEFAULT_CHUNK_SIZE, start_offset, end_offset, columns=['candidate']):
+        if 'candidate' in chunk.columns:
+            names.update(dict.fromkeys(chunk['candidate'].dropna().unique()))
+    return list(names)
+
+
+def load_data(filepath: str, chunksize: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    """Krok 1: Načte data z CSVčka (celý soubor najednou, po blocích)."""
+    df = concat_chunks(list(iter_data_chunks(filepath, chunksize)))
+    if not df.empty:
+        print("Loaded successfully.")
     return df
 
 
-def filter_data(df: pd.DataFrame) -> pd.DataFrame:
-    """Krok 2: Vyhodím zbytečný sloupce a řádky, kde nic není."""
-    print("Filtering data...")
+def filter_data(df: pd.DataFrame, quiet: bool = False) -> pd.DataFrame:
+    """Krok 2: Vyhodím zbytečný sloupce a řádky, kde nic není. (quiet = bez výpisu průběhu)"""
+    if not quiet:
+        print("Filtering data...")
 
 
     columns_to_keep = ['candidate', 'text', 'tweet_created', 'user_timezone']
@@ -39,57 +157,298 @@ def filter_data(df: pd.DataFrame) -> pd.DataFrame:
     # Vyhodím řádky, kde chybí text nebo kandidát (NaN)
     df_filtered.dropna(subset=['candidate', 'text'], inplace=True)
 
-    print("Data filtered.")
+    if not quiet:
+        print("Data filtered.")
     return df_filtered
 
 
-def split_by_all_candidates(df: pd.DataFrame) -> DataFrameDict:
+class CandidateFrames(Mapping):
     """
-    Krok 3: Rozdělí data na slovník, kde klíč je jméno kandidáta.
+    Všechna data v jednom dataframe seřazeném podle kandidáta (v pořadí prvního výskytu).
+    Navenek se chová jako slovník [jméno_kandidáta] -> [jeho_dataframe],
+    ale dataframe kandidáta je jen řez (iloc) společné tabulky, ne kopie.
+    Celá tabulka je dostupná v atributu 'frame', souhrnné statistiky pro grafy (i počty slov) v 'aggregates'.
+    'presorted' = tabulka už je seřazená podle kandidáta (z cache), znovu se neřadí.
     """
-    print("Splitting data by ALL candidates...")
-
-    # Slovník pro ukládání [jméno_kandidáta] -> [jeho_dataframe]
-    candidate_dataframes = {}
 
-    all_candidates = df['candidate'].unique()
-
-    print(f"Found {len(all_candidates)} unique candidate categories.")
+    def __init__(self, df: pd.DataFrame, aggregates: SentimentAggregates = None, presorted: bool = False):
+        self._slices = {}
+        self._aggregates = aggregates
+        self._word_summaries = {}
+        self._load_frame = None
+        self._set_frame(df, presorted)
+
+    @classmethod
+    def lazy(cls, load_frame, aggregates: SentimentAggregates) -> 'CandidateFrames':
+        """
+        Tabulka se načte (load_frame() -> dataframe seřazený podle kandidáta) až při prvním přístupu
+        k 'frame' nebo k řádkům kandidáta. Do té doby se kandidáti a počty tweetů berou z 'aggregates',
+        takže grafy ze souhrnných statistik tabulku vůbec nepotřebují (inkrementální režim).
+        """
+        candidate_frames = cls(pd.DataFrame(), aggregates)
+        candidate_frames._load_frame = load_frame
+        return candidate_frames
+
+    def _set_frame(self, df: pd.DataFrame, presorted: bool):
+        self._slices = {}
+        if df.empty or 'candidate' not in df.columns:
+            self._frame = df
+            return
+
+        # Kódy kandidátů v pořadí prvního výskytu, stabilní řazení zachová pořadí tweetů
+        codes, candidates = pd.factorize(df['candidate'])
+        if presorted:
+            self._frame = df.reset_index(drop=True)
+        else:
+            self._frame = df.iloc[np.argsort(codes, kind='stable')].reset_index(drop=True)
+        if not isinstance(self._frame['candidate'].dtype, pd.CategoricalDtype):
+            self._frame['candidate'] = self._frame['candidate'].astype('category')
+
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(candidates)))))
+        for i, candidate_name in enumerate(candidates):
+            self._slices[candidate_name] = slice(int(bounds[i]), int(bounds[i + 1]))
+
+    def _ensure_loaded(self):
+        if self._load_frame is not None:
+            load_frame, self._load_frame = self._load_frame, None
+            self._set_frame(load_frame(), presorted=True)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        self._ensure_loaded()
+        return self._frame
+
+    @property
+    def aggregates(self) -> SentimentAggregates:
+        """Souhrnné statistiky (spočítají se při prvním použití, v inkrementálním režimu se jen sčítají)."""
+        if self._aggregates is None:
+            self._aggregates = SentimentAggregates.from_frame(self.frame)
+        return self._aggregates
+
+    def _select_rows(self, candidate_name: str = None, label: str = None):
+        """Řádky kandidáta (slice), s popiskem jako bool maska."""
+        rows = self._candidate_slices().get(candidate_name, slice(0, 0)) if candidate_name is not None else slice(None)
+        if label is None:
+            return rows
+
+        mask = np.zeros(len(self.frame), dtype=bool)
+        mask[rows] = True
+        mask &= (self.frame['sentiment_label'] == label).to_numpy()
+        return mask
+
+    def word_summary(self, candidate_name: str = None, label: str = None,
+                     capacity: int = DEFAULT_CAPACITY) -> SpaceSaving:
+        """
+        Přibližný souhrn nejčastějších slov (Space-Saving, max. 'capacity' slov v paměti)
+        pro stejný výběr řádků jako top_words. Staví se po blocích SUMMARY_BLOCK_ROWS tweetů
+        a dílčí souhrny se sloučí (stejně jde slučovat i souhrny z více workerů / běhů).
+        """
+        key = (candidate_name, label, capacity)
+        if key not in self._word_summaries:
+            tokens = self.frame['tokens'].to_numpy()[self._select_rows(candidate_name, label)]
+            summary = SpaceSaving(capacity)
+            for start in range(0, len(tokens), SUMMARY_BLOCK_ROWS):
+                summary = summary.merge(SpaceSaving.from_token_lists(tokens[start:start + SUMMARY_BLOCK_ROWS],
+                                                                     capacity))
+            self._word_summaries[key] = summary
+        return self._word_summaries[key]
+
+    def top_words(self, candidate_name: str = None, label: str = None,
+                  num: int = 15, exclude=None, capacity: int = None) -> list:
+        """
+        Nejčastější slova [(slovo, počet), ...] pro kandidáta a volitelně jen jeden
+        sentiment ('Positive', ...). Bez kandidáta pro všechny tweety.
+        Slova z 'exclude' se vynechají.
+        S 'capacity' se počítá přibližně s omezenou pamětí (word_summary), jinak přesně ze sečtených
+        počtů slov v 'aggregates' (ty se při inkrementálním běhu jen přičítají).
+        """
+        if capacity is not None:
+            return self.word_summary(candidate_name, label, capacity).most_common(num, exclude)
+        return self.aggregates.top_words(candidate_name, label, num, exclude)
+
+    def rows(self, candidate_name: str) -> slice:
+        """Rozsah řádků kandidáta ve společné tabulce 'frame'."""
+        return self._candidate_slices()[candidate_name]
+
+    def tweet_count(self, candidate_name: str) -> int:
+        """Počet tweetů kandidáta (nenačítá tabulku, pokud ještě načtená není)."""
+        if self._load_frame is not None:
+            return sum(self._aggregates.label_counts[candidate_name].values())
+        rows = self._slices[candidate_name]
+        return rows.stop - rows.start
+
+    def _candidate_slices(self) -> dict:
+        self._ensure_loaded()
+        return self._slices
+
+    def __getitem__(self, candidate_name: str) -> pd.DataFrame:
+        return self.frame.iloc[self._candidate_slices()[candidate_name]]
+
+    def __iter__(self):
+        if self._load_frame is not None:
+            return iter(self._aggregates.label_counts)
+        return iter(self._slices)
+
+    def __len__(self) -> int:
+        if self._load_frame is not None:
+            return len(self._aggregates.label_counts)
+        return len(self._slices)
+
+
+def split_by_all_candidates(df: pd.DataFrame, aggregates: SentimentAggregates = None,
+                            presorted: bool = False) -> CandidateFrames:
+    """
+    Krok 5: Rozdělí data podle kandidátů.
+    Vrací CandidateFrames - slovníkové rozhraní nad jednou seřazenou tabulkou (bez kopií pro každého kandidáta).
+    """
+    print("Splitting data by ALL candidates...")
 
-    for candidate_name in all_candidates:
-        # Vytvořím dataframe jen pro tohoto kandidáta
-        df_candidate = df[df['candidate'] == candidate_name].copy()
+    candidate_frames = CandidateFrames(df, aggregates, presorted)
+    print_candidates(candidate_frames)
+    return candidate_frames
 
-        # Uložím ho do slovníku
-        candidate_dataframes[candidate_name] = df_candidate
 
-        print(f"  > {candidate_name}: {len(df_candidate)} tweets")
+def print_candidates(candidate_frames: CandidateFrames):
+    """Vypíše kandidáty a počty jejich tweetů."""
+    print(f"Found {len(candidate_frames)} unique candidate categories.")
 
-    return candidate_dataframes
+    for candidate_name in candidate_frames:
+        print(f"  > {candidate_name}: {candidate_frames.tweet_count(candidate_name)} tweets")
 
 
-def load_and_process_data(filepath: str = 'data/Sentiment.csv') -> DataFrameDict:
+def iter_processed_chunks(filepath: str, workers: int = 1, scorer: str = 'vader',
+                          chunksize: int = DEFAULT_CHUNK_SIZE, start_offset: int = 0,
+                          end_offset: int = None, metrics: StageMetrics = None,
+                          tokenizer: str = 'nltk', candidate_names: list = None,
+                          tokenize: bool = True, mentions: bool = True,
+                          quiet: bool = False) -> Iterator[pd.DataFrame]:
+    """
+    Generátor: Krok 1 až 4 pro každý blok CSV zvlášť.
+    Vrací vyfiltrované, ohodnocené a tokenizované bloky se sloupcem zmínek kandidátů.
+    S tokenize=False / mentions=False se tokenizace / hledání zmínek vynechá (sloupec pak chybí),
+    když je žádný požadovaný výstup nepotřebuje.
+    S 'metrics' se čas každého kroku sčítá přes všechny bloky (etapy load_csv, filter, score...).
+    S quiet=True se nevypisuje průběh jednotlivých bloků.
+    Stejné texty (retweety) se skórují a tokenizují jen jednou, i napříč bloky (src/dedup.py).
+    Zmínky se hledají pro všechny kandidáty ze zpracovávaného úseku souboru
+    (+ 'candidate_names', např. kandidáti z dřívějších inkrementálních běhů).
+    """
+    if mentions:
+        with stage(metrics, 'mentions'):
+            candidate_names = list(dict.fromkeys(list(candidate_names or [])
+                                                 + read_candidate_names(filepath, start_offset, end_offset)))
+    score_cache, token_cache = TextCache(), TextCache()
+    # Jeden pool workerů pro všechny bloky (VADER a stopwords se ve workerech načtou jen jednou)
+    with worker_pool(workers) as executor:
+        chunks = iter_data_chunks(filepath, chunksize, start_offset, end_offset)
+        for chunk in timed_iter(metrics, 'load_csv', chunks):
+            # Krok 2
+            with stage(metrics, 'filter', rows=len(chunk)):
+                df_filtered = filter_data(chunk, quiet=quiet)
+            if df_filtered.empty:
+                continue
+
+            # Krok 3 - VADER skóre se spočítá jednou pro všechny tweety
+            with stage(metrics, f'score_{scorer}', rows=len(df_filtered)):
+                df_scored = score_sentiment(df_filtered, workers, scorer, score_cache, quiet=quiet,
+                                            executor=executor)
+            if df_scored.empty:
+                continue
+
+            # Krok 4 - tokenizace taky jen jednou, tokeny se uloží ke každému řádku
+            df_tokens = df_scored
+            if tokenize:
+                with stage(metrics, f'tokenize_{tokenizer}', rows=len(df_scored)) as counters:
+                    df_tokens = tokenize_data(df_scored, workers, tokenizer, token_cache, quiet=quiet,
+                                              executor=executor)
+                    if df_tokens.empty:
+                        continue
+                    counters['tokens'] = int(df_tokens['tokens'].map(len).sum())
+
+            # Krok 4b - zmínky ostatních kandidátů (sloupec 'mentions')
+            if not mentions:
+                yield df_tokens
+                continue
+            with stage(metrics, 'mentions', rows=len(df_tokens)):
+                df_mentions = add_mentions(df_tokens, candidate_names)
+            yield df_mentions
+
+    if score_cache.hits + score_cache.misses:
+        print(f"Deduplication: {score_cache.misses} unique texts scored and tokenized for "
+              f"{score_cache.hits + score_cache.misses} tweets (hit rate {score_cache.hit_rate():.1%}).")
+
+
+def load_and_process_data(filepath: str = 'data/Sentiment.csv', workers: int = 1,
+                          scorer: str = 'vader', chunksize: int = DEFAULT_CHUNK_SIZE,
+                          cache_dir: str = None, metrics: StageMetrics = None,
+                          tokenizer: str = 'nltk', tokenize: bool = True, mentions: bool = True,
+                          keep_tokens: bool = True, key: str = None, quiet: bool = False) -> CandidateFrames:
     """
     Hlavní funkce, co zavolá ty ostatní popořadě.
+    'workers' = počet procesů pro skórování a tokenizaci (1 = sériově).
+    'scorer' = 'vader' (přesný NLTK) nebo 'fast' (vektorizovaná aproximace).
+    'tokenizer' = 'nltk' (word_tokenize) nebo 'fast' (jeden regex, bez odkazů a @zmínek).
+    'chunksize' = kolik řádků CSV se zpracovává najednou.
+    'cache_dir' = složka pro uložení zpracované tabulky (None = bez cache).
+    'metrics' = kam zapisovat čas a paměť jednotlivých etap (None = neměřit).
+    'tokenize' / 'mentions' = False vynechá tokenizaci / zmínky (viz iter_processed_chunks).
+    'keep_tokens' = False nedrží tokeny u řádků tabulky (počty slov pro grafy jsou i tak v 'aggregates').
+    Takový neúplný výsledek se do cache neukládá, úplný výsledek z cache se ale použije.
+    'key' = už spočítaný cache_key souboru (ať se celý soubor nehashuje dvakrát).
+    'quiet' = bez výpisu průběhu jednotlivých bloků.
+
+    Statistiky pro grafy (SentimentAggregates, i počty slov) se počítají po blocích a sečtou se,
+    z bloků se pak drží jen FRAME_COLUMNS. Paměť tedy neroste s velikostí bloku, ale s počtem
+    tweetů (pár malých sloupců na řádek) a s keep_tokens i se seznamy tokenů všech tweetů -
+    ty potřebuje jen textová analýza kandidátů a slova ze Space-Saving souhrnů.
     """
-    # Krok 1
-    df = load_data(filepath)
-    if df.empty:
-        return {}
-
-    # Krok 2
-    df_filtered = filter_data(df)
-    if df_filtered.empty:
-        return {}
-
-    # Krok 3
-    return split_by_all_candidates(df_filtered)
+    if not cache_dir or not os.path.exists(filepath):
+        key = None
+    else:
+        with stage(metrics, 'cache_load') as counters:
+            if key is None:
+                key = cache_key(filepath, scorer, tokenizer)
+            cached = load_cached(filepath, key, cache_dir)
+            counters['rows'] = None if cached is None else len(cached[0])
+        if cached is not None:
+            # Tabulka v cache je už seřazená podle kandidátů, jen ji znovu rozdělíme
+            df_cached, aggregates = cached
+            with stage(metrics, 'split', rows=len(df_cached)):
+                return split_by_all_candidates(df_cached, aggregates, presorted=True)
+
+    # Krok 1 až 4 po blocích, statistiky se sečtou hned z každého bloku
+    frames, partials = [], []
+    columns = [col for col in FRAME_COLUMNS if keep_tokens or col != 'tokens']
+    for chunk in iter_processed_chunks(filepath, workers, scorer, chunksize, metrics=metrics, tokenizer=tokenizer,
+                                       tokenize=tokenize, mentions=mentions, quiet=quiet):
+        with stage(metrics, 'aggregates', rows=len(chunk)):
+            partials.append(SentimentAggregates.from_frame(chunk))
+        frames.append(chunk[[col for col in columns if col in chunk.columns]])
+    df_processed = concat_chunks(frames)
+    if df_processed.empty:
+        return CandidateFrames(df_processed)
+    with stage(metrics, 'aggregates'):
+        aggregates = SentimentAggregates.combine(partials)
+
+    # Krok 5
+    with stage(metrics, 'split', rows=len(df_processed)):
+        candidate_frames = split_by_all_candidates(df_processed, aggregates)
+
+    if key is not None and tokenize and mentions and keep_tokens:
+        with stage(metrics, 'cache_save', rows=len(df_processed)):
+            save_cached((candidate_frames.frame, aggregates), filepath, key, cache_dir)
+
+    return candidate_frames
 
 
 # ---- Kód pro testování ----
 if __name__ == "__main__":
     print("--- Testing data_loader.py (dict version) ---")
 
+    from src.preprocessing import ensure_nltk_data
+    if not ensure_nltk_data():
+        raise SystemExit(1)
+
     TEST_PATH = '../data/Sentiment.csv'
 
     # Teď je to jedna proměnná (slovník)
@@ -0,0 +1,91 @@
+# src/dedup.py
+
+from collections import OrderedDict
+from typing import Callable
+import pandas as pd
+from src.parallel import map_chunks
+
+# Kolik různých textů si cache pamatuje (nejdéle nepoužité se zahodí)
+DEFAULT_MAX_SIZE = 100_000
+
+
+def normalize_text(text):
+    """
+    Klíč pro cache: text se sjednocenými mezerami ("RT  @a:  x\\n" -> "RT @a: x").
+    VADER i tokenizery dělí text podle mezer, výsledek je pro oba tvary stejný.
+    Prefix "RT @uživatel:" zůstává - ovlivňuje tokeny (jméno ze zmínky) i skóre.
+    """
+    return ' '.join(text.split()) if isinstance(text, str) else text
+
+
+class TextCache:
+    """
+    Omezená LRU cache výsledků podle normalizovaného textu (retweety = stejný text).
+    map() spočítá každý různý text jen jednou a výsledek rozkopíruje na všechny jeho řádky;
+    texty viděné v dřívějších blocích / dávkách se vezmou z cache.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def map(self, func: Callable[[list], list], texts: list, workers: int = 1, executor=None) -> list:
+        """
+        Jako map_chunks(func, texts, workers, executor), ale 'func' dostane jen texty, které ještě nejsou v cache
+        (každý jen jednou). Výstup je řádek po řádku stejný jako bez cache.
+        """
+        codes, keys = pd.factorize(pd.Series([normalize_text(text) for text in texts], dtype=object),
+                                   use_na_sentinel=False)
+
+        results = [None] * len(keys)
+        missing = []
+        for position, key in enumerate(keys):
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                results[position] = self._entries[key]
+            else:
+                missing.append(position)
+
+        computed = map_chunks(func, [keys[position] for position in missing], workers, executor)
+        for position, result in zip(missing, computed):
+            results[position] = result
+            self._entries[keys[position]] = result
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+        return [results[code] for code in codes]
+
+    def hit_rate(self) -> float:
+        """Podíl řádků, které se nemusely počítat (duplikát v bloku nebo text z cache)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {'rows': self.hits + self.misses, 'computed': self.misses,
+                'hit_rate': round(self.hit_rate(), 4), 'cached': len(self._entries)}
+
+
+# ---- Kód pro testování ----
+if __name__ == "__main__":
+    print("--- Testing dedup.py ---")
+
+    cache = TextCache(max_size=2)
+    calls = []
+
+    def _upper(texts):
+        calls.extend(texts)
+        return [text.upper() for text in texts]
+
+    print(cache.map(_upper, ["RT @a: hello", "RT  @a: hello", "other"]))
+    print(cache.map(_upper, ["other", "new text"]))
+    print(f"Computed: {calls}")
+    print(f"Stats: {cache.stats()}")
+
+    print("\n--- Test complete ---")
@@ -0,0 +1,386 @@
+# src/fast_sentiment.py
+
+import string
+import time
+import numpy as np
+import pandas as pd
+from nltk.sentiment.vader import VaderConstants
+
+# Konstanty bereme přímo z NLTK, aby pravidla odpovídala referenčnímu VADERu
+C_INCR = VaderConstants.C_INCR
+N_SCALAR = VaderConstants.N_SCALAR
+BOOSTER_DICT = VaderConstants.BOOSTER_DICT
+NEGATE = VaderConstants.NEGATE
+PUNC_LIST = VaderConstants.PUNC_LIST
+
+_PUNCTUATION = set(string.punctuation)
+# Delší interpunkce první, ať "great!!" neořízneme jen o jeden vykřičník
+_PUNC_BY_LENGTH = sorted(set(PUNC_LIST), key=len, reverse=True)
+
+# Dvouslovné dampenery z BOOSTER_DICT ("kind of", "sort of", "just enough"):
+# první i druhé slovo dostane stejný kód, shoda kódů = dvojice je v BOOSTER_DICT
+_BIGRAM_FIRST = {'just': 1, 'kind': 2, 'sort': 2}
+_BIGRAM_SECOND = {'enough': 1, 'of': 2}
+B_DECR = VaderConstants.B_DECR
+
+# Slova, na která se pravidla ptají kromě lexikonu, boosterů a negací (viz _flags a dvouslovné dampenery)
+_CONTEXT_WORDS = {'never', 'so', 'this'}
+_CONTEXT_WORDS_LOWER = {'least', 'at', 'very', 'but', 'kind', 'of'} | set(_BIGRAM_FIRST) | set(_BIGRAM_SECOND)
+
+
+def _strip_vader_punctuation(token: str) -> str:
+    """
+    Stejně jako VADER ořízne jednu položku z PUNC_LIST před nebo za slovem
+    ('great!' -> 'great'), pokud zbytek neobsahuje další interpunkci.
+    """
+    for punc in _PUNC_BY_LENGTH:
+        if token.endswith(punc):
+            rest = token[:-len(punc)]
+            if len(rest) > 1 and not any(ch in _PUNCTUATION for ch in rest):
+                return rest
+    for punc in _PUNC_BY_LENGTH:
+        if token.startswith(punc):
+            rest = token[len(punc):]
+            if len(rest) > 1 and not any(ch in _PUNCTUATION for ch in rest):
+                return rest
+    return token
+
+
+class FastSentimentScorer:
+    """
+    Vektorizovaná (NumPy) aproximace VADERu pro dávky tweetů.
+
+    VADER lexikon se "zkompiluje" do tabulky: každý surový token dostane id
+    a k němu se uloží valence, booster hodnota, příznak negace, ALL CAPS atd.
+    Celá dávka se pak převede na plochá pole tokenů s offsety (jako CSR matice)
+    a pravidla VADERu se počítají posuny polí místo Python smyček pro každý tweet.
+
+    Pokryto: lexikon, ALL CAPS zdůraznění, boostery/dampenery (3 slova zpět),
+    negace včetně "n't", "never so/this", "least", pravidlo "but", vykřičníky
+    a otazníky, dvouslovné dampenery ("kind of"). Vynechány jsou jen vzácné
+    idiomy ("the bomb", "yeah right" apod.).
+    """
+
+    def __init__(self, lexicon: dict):
+        self.lexicon = lexicon
+        # Tabulka surový token -> id a vlastnosti tokenů (indexované id).
+        # Ukládají se jen tokeny, na kterých pravidlům záleží (lexikon, boostery, negace, kontextová slova),
+        # ostatní (odkazy, @účty, běžná slova) dostanou jedno ze 4 "neznámých" id podle ALL CAPS a "n't"
+        # - jinak by tabulka v dlouhém streamu rostla s každým novým tokenem.
+        self._token_ids = {}
+        # Oříznuté slovo -> id (VADER bere kontext opakovaného slova z jeho prvního výskytu)
+        self._word_ids = {}
+        self._word_id = []
+        self._bigram_first = []
+        self._bigram_second = []
+        self._valence = []
+        self._in_lexicon = []
+        self._booster = []
+        self._negated = []
+        self._upper = []
+        # Příznaky slov, na která se VADER ptá při kontrole kontextu
+        self._flags = {name: [] for name in ('never', 'so_this', 'least', 'at_very', 'but', 'kind', 'of')}
+        # NumPy kopie tabulek pro score_batch, přestaví se jen když přibude token
+        self._arrays = None
+
+        # Neznámé tokeny: (velkými písmeny, obsahuje "n't") -> id. Zástupná slova obsahují mezeru,
+        # takže se nikdy nepotkají se skutečným tokenem (ty vznikají z text.split())
+        self._unknown_ids = {}
+        for upper in (False, True):
+            for negated in (False, True):
+                self._unknown_ids[(upper, negated)] = self._add_token(' X' if upper else ' x', negated)
+
+    def _is_relevant(self, word: str, word_lower: str) -> bool:
+        """True, když se na slovo ptá některé pravidlo (jinak se chová jako kterékoliv neznámé slovo)."""
+        return (word_lower in self.lexicon or word_lower in BOOSTER_DICT or word_lower in NEGATE
+                or word in _CONTEXT_WORDS or word_lower in _CONTEXT_WORDS_LOWER)
+
+    def _token_id(self, token: str) -> int:
+        token_id = self._token_ids.get(token)
+        if token_id is not None:
+            return token_id
+
+        word = _strip_vader_punctuation(token)
+        word_lower = word.lower()
+        if not self._is_relevant(word, word_lower):
+            return self._unknown_ids[(word.isupper(), "n't" in word_lower)]
+
+        token_id = self._add_token(word)
+        self._token_ids[token] = token_id
+        return token_id
+
+    def _add_token(self, word: str, negated: bool = False) -> int:
+        """Přidá řádek tabulky vlastností pro (oříznuté) slovo. Vrací jeho id."""
+        token_id = len(self._valence)
+        self._arrays = None
+        word_lower = word.lower()
+        self._word_id.append(self._word_ids.setdefault(word, len(self._word_ids)))
+        self._bigram_first.append(_BIGRAM_FIRST.get(word, 0))
+        self._bigram_second.append(_BIGRAM_SECOND.get(word, 0))
+        self._valence.append(self.lexicon.get(word_lower, 0.0))
+        self._in_lexicon.append(word_lower in self.lexicon)
+        self._booster.append(BOOSTER_DICT.get(word_lower, 0.0))
+        self._negated.append(negated or word_lower in NEGATE or "n't" in word_lower)
+        self._upper.append(word.isupper())
+
+        # "never so/this" VADER porovnává bez převodu na malá písmena
+        self._flags['never'].append(word == 'never')
+        self._flags['so_this'].append(word in ('so', 'this'))
+        self._flags['least'].append(word_lower == 'least')
+        self._flags['at_very'].append(word_lower in ('at', 'very'))
+        self._flags['but'].append(word_lower == 'but')
+        self._flags['kind'].append(word_lower == 'kind')
+        self._flags['of'].append(word_lower == 'of')
+        return token_id
+
+    def _tables(self) -> dict:
+        """Tabulky vlastností tokenů jako NumPy pole (z cache, dokud nepřibude nový token)."""
+        if self._arrays is None:
+            self._arrays = {
+                'valence': np.asarray(self._valence, dtype=np.float64),
+                'in_lexicon': np.asarray(self._in_lexicon, dtype=bool),
+                'booster': np.asarray(self._booster, dtype=np.float64),
+                'negated': np.asarray(self._negated, dtype=bool),
+                'upper': np.asarray(self._upper, dtype=bool),
+                'word_id': np.asarray(self._word_id, dtype=np.int64),
+                'bigram_first': np.asarray(self._bigram_first, dtype=np.int64),
+                'bigram_second': np.asarray(self._bigram_second, dtype=np.int64),
+                'flags': {name: np.asarray(values, dtype=bool) for name, values in self._flags.items()},
+            }
+        return self._arrays
+
+    def _encode(self, texts: list):
+        """Převede dávku textů na plochá pole id tokenů + číslo dokumentu + pozici v dokumentu."""
+        ids = []
+        lengths = np.zeros(len(texts), dtype=np.int64)
+        exclamations = np.zeros(len(texts), dtype=np.int64)
+        questions = np.zeros(len(texts), dtype=np.int64)
+
+        for doc, text in enumerate(texts):
+            text = str(text)
+            tokens = [token for token in text.split() if len(token) > 1]
+            ids.extend(map(self._token_id, tokens))
+            lengths[doc] = len(tokens)
+            exclamations[doc] = text.count("!")
+            questions[doc] = text.count("?")
+
+        ids = np.asarray(ids, dtype=np.int64)
+        doc_ids = np.repeat(np.arange(len(texts)), lengths)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        positions = np.arange(len(ids)) - np.repeat(starts, lengths)
+        return ids, doc_ids, positions, lengths, exclamations, questions
+
+    def score_batch(self, texts) -> np.ndarray:
+        """
+        Ohodnotí celou dávku textů najednou.
+        Vrací pole tvaru (len(texts), 4) se sloupci compound, pos, neg, neu.
+        """
+        texts = list(texts)
+        n_docs = len(texts)
+        ids, doc_ids, positions, lengths, exclamations, questions = self._encode(texts)
+
+        tables = self._tables()
+        valence_table = tables['valence']
+        in_lexicon_table = tables['in_lexicon']
+        booster_table = tables['booster']
+        negated_table = tables['negated']
+        upper_table = tables['upper']
+        flags = {name: values[ids] for name, values in tables['flags'].items()}
+
+        in_lexicon = in_lexicon_table[ids]
+        upper = upper_table[ids]
+
+        # ALL CAPS rozdíl: některá (ale ne všechna) slova v tweetu jsou velkými písmeny
+        upper_per_doc = np.bincount(doc_ids, weights=upper, minlength=n_docs)
+        cap_diff_doc = (upper_per_doc > 0) & (upper_per_doc < lengths)
+        cap_diff = cap_diff_doc[doc_ids]
+
+        valence = valence_table[ids].copy()
+        caps_boost = in_lexicon & upper & cap_diff
+        valence = np.where(caps_boost, valence + np.where(valence > 0, C_INCR, -C_INCR), valence)
+
+        is_so_this = flags['so_this']
+        is_never = flags['never']
+
+        def shifted(values, k, fill):
+            """Hodnota tokenu o k pozic dříve (ve stejném tweetu), jinak 'fill'."""
+            out = np.full(len(values), fill, dtype=values.dtype)
+            if k < len(values):
+                out[k:] = values[:-k]
+            return out
+
+        # Boostery a negace ze 3 předchozích slov (postupně jako ve VADERu)
+        for start_i, damping in ((0, 1.0), (1, 0.95), (2, 0.9)):
+            k = start_i + 1
+            has_prev = in_lexicon & (positions > start_i)
+            prev_ids = shifted(ids, k, 0)
+            prev_not_lex = ~in_lexicon_table[prev_ids]
+            active = has_prev & prev_not_lex
+
+            scalar = booster_table[prev_ids]
+            scalar = np.where(valence < 0, -scalar, scalar)
+            caps_booster = (scalar != 0) & upper_table[prev_ids] & cap_diff
+            scalar = scalar + np.where(caps_booster, np.where(valence > 0, C_INCR, -C_INCR), 0.0)
+            valence = np.where(active, valence + scalar * damping, valence)
+
+            prev_negated = negated_table[prev_ids]
+            if start_i == 0:
+                factor = np.where(prev_negated, N_SCALAR, 1.0)
+            elif start_i == 1:
+                never_so = shifted(is_never, 2, False) & shifted(is_so_this, 1, False)
+                factor = np.where(never_so, 1.5, np.where(prev_negated, N_SCALAR, 1.0))
+            else:
+                never_so = (shifted(is_never, 3, False) & shifted(is_so_this, 2, False)) | shifted(is_so_this, 1, False)
+                factor = np.where(never_so, 1.25, np.where(prev_negated, N_SCALAR, 1.0))
+            valence = np.where(active, valence * factor, valence)
+
+            if start_i == 2:
+                # Dvouslovný dampener před slovem ("kind of sad") sníží valenci
+                first_codes = tables['bigram_first'][ids]
+                second_codes = tables['bigram_second'][ids]
+                twoone = (shifted(first_codes, 2, 0) > 0) & (shifted(first_codes, 2, 0) == shifted(second_codes, 1, -1))
+                threetwo = (shifted(first_codes, 3, 0) > 0) & (shifted(first_codes, 3, 0) == shifted(second_codes, 2, -1))
+                valence = np.where(active & (twoone | threetwo), valence + B_DECR, valence)
+
+        # Negace přes "least" (kromě "at least" / "very least")
+        prev_least = shifted(flags['least'], 1, False) & in_lexicon & (positions > 0)
+        least_exception = (positions > 1) & shifted(flags['at_very'], 2, False)
+        valence = np.where(prev_least & ~least_exception, valence * N_SCALAR, valence)
+
+        # Slova mimo lexikon, samotné boostery a "kind" v "kind of" mají valenci 0
+        next_is_of = np.zeros(len(ids), dtype=bool)
+        next_is_of[:-1] = flags['of'][1:] & (doc_ids[1:] == doc_ids[:-1])
+        kind_of = flags['kind'] & next_is_of
+        valence = np.where(in_lexicon & (booster_table[ids] == 0) & ~kind_of, valence, 0.0)
+
+        # VADER bere kontext opakovaného slova z jeho prvního výskytu v tweetu
+        if len(ids):
+            word_ids = tables['word_id'][ids]
+            key = doc_ids * (len(self._word_ids) + 1) + word_ids
+            _, first_index, inverse = np.unique(key, return_index=True, return_inverse=True)
+            valence = valence[first_index[inverse]]
+
+        # Pravidlo "but": před ním ×0.5, za ním ×1.5
+        but_positions = np.where(flags['but'], positions, np.iinfo(np.int64).max)
+        first_but = np.full(n_docs, np.iinfo(np.int64).max)
+        np.minimum.at(first_but, doc_ids, but_positions)
+        doc_but = first_but[doc_ids]
+        has_but = doc_but != np.iinfo(np.int64).max
+        valence = np.where(has_but & (positions < doc_but), valence * 0.5, valence)
+        valence = np.where(has_but & (positions > doc_but), valence * 1.5, valence)
+
+        # Součty pro každý tweet
+        sum_s = np.bincount(doc_ids, weights=valence, minlength=n_docs)
+        ep_amplifier = np.minimum(exclamations, 4) * 0.292
+        qm_amplifier = np.where(questions > 3, 0.96, np.where(questions > 1, questions * 0.18, 0.0))
+        punct = ep_amplifier + qm_amplifier
+        sum_s = np.where(sum_s > 0, sum_s + punct, np.where(sum_s < 0, sum_s - punct, sum_s))
+        compound = sum_s / np.sqrt(sum_s * sum_s + 15)
+
+        pos_sum = np.bincount(doc_ids, weights=np.where(valence > 0, valence + 1, 0.0), minlength=n_docs)
+        neg_sum = np.bincount(doc_ids, weights=np.where(valence < 0, valence - 1, 0.0), minlength=n_docs)
+        neu_count = np.bincount(doc_ids, weights=(valence == 0), minlength=n_docs)
+
+        pos_wins = pos_sum > np.abs(neg_sum)
+        neg_wins = pos_sum < np.abs(neg_sum)
+        pos_sum = np.where(pos_wins, pos_sum + punct, pos_sum)
+        neg_sum = np.where(neg_wins, neg_sum - punct, neg_sum)
+
+        total = pos_sum + np.abs(neg_sum) + neu_count
+        safe_total = np.where(total > 0, total, 1.0)
+        has_tokens = lengths > 0
+
+        result = np.zeros((n_docs, 4), dtype=np.float64)
+        result[:, 0] = np.where(has_tokens, np.round(compound, 4), 0.0)
+        result[:, 1] = np.where(has_tokens, np.round(np.abs(pos_sum / safe_total), 3), 0.0)
+        result[:, 2] = np.where(has_tokens, np.round(np.abs(neg_sum / safe_total), 3), 0.0)
+        result[:, 3] = np.where(has_tokens, np.round(np.abs(neu_count / safe_total), 3), 0.0)
+        return result
+
+
+_default_scorer = None
+
+
+def get_fast_scorer() -> FastSentimentScorer:
+    """Vrátí sdílený scorer postavený z lexikonu NLTK VADERu (vytvoří se při prvním použití)."""
+    global _default_scorer
+    if _default_scorer is None:
+        from src.sentiment import get_analyzer
+        sia = get_analyzer()
+        if sia is None:
+            raise LookupError("VADER lexicon not found, cannot build the fast scorer.")
+        _default_scorer = FastSentimentScorer(sia.lexicon)
+    return _default_scorer
+
+
+def score_batch(texts) -> np.ndarray:
+    """Ohodnotí dávku textů rychlým scorerem. Sloupce: compound, pos, neg, neu."""
+    return get_fast_scorer().score_batch(texts)
+
+
+def validation_report(filepath: str = 'data/Sentiment.csv') -> dict:
+    """
+    Porovná rychlý scorer s referenčním NLTK VADERem na daném datasetu.
+    Vrací shodu popisků (celkově i pro každý referenční popisek),
+    maximální a průměrnou odchylku compound skóre a rychlost obou variant.
+    """
+    from src.data_loader import load_data, filter_data
+    from src.sentiment import get_analyzer, label_sentiment
+
+    sia = get_analyzer()
+    df = filter_data(load_data(filepath))
+    texts = df['text'].astype(str).tolist()
+
+    start = time.perf_counter()
+    reference = pd.Series([sia.polarity_scores(text)['compound'] for text in texts])
+    vader_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = pd.Series(score_batch(texts)[:, 0])
+    fast_seconds = time.perf_counter() - start
+
+    reference_labels = label_sentiment(reference)
+    fast_labels = label_sentiment(fast)
+    deviation = (reference - fast).abs()
+
+    per_label = {}
+    for label in ['Positive', 'Negative', 'Neutral']:
+        mask = reference_labels == label
+        per_label[label] = {
+            'tweets': int(mask.sum()),
+            'agreement': float((fast_labels[mask] == label).mean()) if mask.any() else 1.0,
+        }
+
+    return {
+        'tweets': len(texts),
+        'label_agreement': float((reference_labels == fast_labels).mean()),
+        'per_label': per_label,
+        'max_compound_deviation': float(deviation.max()),
+        'mean_compound_deviation': float(deviation.mean()),
+        'exact_compound_matches': float((deviation < 1e-9).mean()),
+        'vader_tweets_per_second': len(texts) / vader_seconds if vader_seconds else float('inf'),
+        'fast_tweets_per_second': len(texts) / fast_seconds if fast_seconds else float('inf'),
+    }
+
+
+# ---- Kód pro testování ----
+if __name__ == "__main__":
+    print("--- Validating fast scorer against NLTK VADER ---")
+
+    from src.preprocessing import ensure_nltk_data
+    if not ensure_nltk_data():
+        raise SystemExit(1)
+
+    report = validation_report('data/Sentiment.csv')
+
+    print(f"\nTweets: {report['tweets']}")
+    print(f"Overall label agreement: {report['label_agreement']:.4f}")
+    for label, stats in report['per_label'].items():
+        print(f"  {label}: {stats['agreement']:.4f} ({stats['tweets']} tweets)")
+    print(f"Max compound deviation: {report['max_compound_deviation']:.4f}")
+    print(f"Mean compound deviation: {report['mean_compound_deviation']:.6f}")
+    print(f"Exact compound matches: {report['exact_compound_matches']:.4f}")
+    print(f"VADER: {report['vader_tweets_per_second']:.0f} tweets/s, "
+          f"fast: {report['fast_tweets_per_second']:.0f} tweets/s")
+
+    print("\n--- Validation complete ---")
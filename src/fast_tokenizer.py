@@ -0,0 +1,124 @@
+# src/fast_tokenizer.py
+
+import re
+import time
+from collections import Counter
+import pandas as pd
+
+# Odkazy a zmínky (@uživatel) se vyhodí ještě před hledáním slov
+_STRIP_PATTERN = re.compile(r'https?://\S+|www\.\S+|pic\.twitter\.com/\S+|@\w+')
+
+# Jména ze @zmínek (jen pro porovnání s NLTK v equivalence_report)
+_MENTION_PATTERN = re.compile(r'@(\w+)')
+
+# Slovo = souvislý úsek aspoň 3 písmen (i s diakritikou), který nesousedí s číslicí, '_', '-'
+# ani s rozbitým znakem \x80-\x9f (useknuté "#GOPDebatâ\x80¦" na konci retweetu).
+# Stejně jako u word_tokenize + isalpha() tak vypadnou "double-talking", "abc123" apod.
+_WORD_PATTERN = re.compile(r'(?<![\w\-\x80-\x9f])[^\W\d_]{3,}(?![\w\-\x80-\x9f])')
+
+
+def tokenize_series(texts: pd.Series) -> pd.Series:
+    """
+    Rychlá náhrada preprocess_text pro celý sloupec najednou:
+    malá písmena -> pryč odkazy a @zmínky -> jeden předkompilovaný regex na slova -> stopwords.
+    Vrací Series seznamů tokenů se stejným indexem (chybějící text = prázdný seznam).
+    """
+    from src.preprocessing import get_stop_words
+
+    stop_words = get_stop_words()
+    words = (texts.fillna('').astype(str).str.lower()
+             .str.replace(_STRIP_PATTERN, ' ', regex=True)
+             .str.findall(_WORD_PATTERN))
+    return pd.Series([[word for word in row if word not in stop_words] for row in words],
+                     index=texts.index, name=texts.name, dtype=object)
+
+
+def tokenize_batch(texts: list) -> list:
+    """Vyčistí seznam textů rychlým tokenizerem (volá se i ve workerech procesního poolu)."""
+    return tokenize_series(pd.Series(texts, dtype=object)).tolist()
+
+
+def equivalence_report(filepath: str = 'data/Sentiment.csv', num_words: int = 50) -> dict:
+    """
+    Porovná rychlý tokenizer s původním preprocess_text (NLTK word_tokenize) na daném datasetu.
+    Vrací podíl tweetů se stejnými tokeny, shodu tokenů (precision / recall vůči NLTK),
+    totéž bez jmen ze @zmínek (ty rychlý tokenizer zahazuje záměrně),
+    překryv nejčastějších slov, nejčastější rozdíly a rychlost obou variant.
+    """
+    from src.data_loader import load_data, filter_data
+    from src.preprocessing import preprocess_text
+
+    df = filter_data(load_data(filepath))
+    texts = df['text']
+
+    start = time.perf_counter()
+    reference = [preprocess_text(text) for text in texts]
+    nltk_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = tokenize_series(texts).tolist()
+    fast_seconds = time.perf_counter() - start
+
+    # Shoda tokenů po tweetech (jako multimnožiny), rozdíly sečtené přes celý dataset
+    common = missing = extra = 0
+    missing_without_mentions = exact_without_mentions = 0
+    differences = Counter()
+    for text, reference_tokens, fast_tokens in zip(texts.fillna('').astype(str), reference, fast):
+        reference_counts, fast_counts = Counter(reference_tokens), Counter(fast_tokens)
+        overlap = reference_counts & fast_counts
+        common += sum(overlap.values())
+        only_reference = reference_counts - overlap
+        only_fast = fast_counts - overlap
+        missing += sum(only_reference.values())
+        extra += sum(only_fast.values())
+        differences.update({f"-{word}": count for word, count in only_reference.items()})
+        differences.update({f"+{word}": count for word, count in only_fast.items()})
+
+        mentions = set(_MENTION_PATTERN.findall(text.lower()))
+        missing_without_mentions += sum(count for word, count in only_reference.items() if word not in mentions)
+        exact_without_mentions += [token for token in reference_tokens if token not in mentions] == fast_tokens
+
+    reference_top = [word for word, _ in Counter(token for row in reference for token in row).most_common(num_words)]
+    fast_top = [word for word, _ in Counter(token for row in fast for token in row).most_common(num_words)]
+
+    return {
+        'tweets': len(reference),
+        'exact_matches': sum(a == b for a, b in zip(reference, fast)) / len(reference) if reference else 1.0,
+        'reference_tokens': common + missing,
+        'fast_tokens': common + extra,
+        'precision': common / (common + extra) if common + extra else 1.0,
+        'recall': common / (common + missing) if common + missing else 1.0,
+        'exact_matches_without_mentions': exact_without_mentions / len(reference) if reference else 1.0,
+        'recall_without_mentions': (common / (common + missing_without_mentions)
+                                    if common + missing_without_mentions else 1.0),
+        'top_words_overlap': len(set(reference_top) & set(fast_top)) / num_words,
+        'top_differences': differences.most_common(15),
+        'nltk_tweets_per_second': len(reference) / nltk_seconds if nltk_seconds else float('inf'),
+        'fast_tweets_per_second': len(reference) / fast_seconds if fast_seconds else float('inf'),
+    }
+
+
+# ---- Kód pro testování ----
+if __name__ == "__main__":
+    print("--- Comparing fast tokenizer with NLTK word_tokenize ---")
+
+    from src.preprocessing import ensure_nltk_data
+    if not ensure_nltk_data():
+        raise SystemExit(1)
+
+    report = equivalence_report('data/Sentiment.csv')
+
+    print(f"\nTweets: {report['tweets']}")
+    print(f"Identical token lists: {report['exact_matches']:.4f}")
+    print(f"Tokens: NLTK {report['reference_tokens']}, fast {report['fast_tokens']}")
+    print(f"Token precision: {report['precision']:.4f}, recall: {report['recall']:.4f}")
+    print(f"Without @mention names: identical {report['exact_matches_without_mentions']:.4f}, "
+          f"recall {report['recall_without_mentions']:.4f}")
+    print(f"Top 50 words overlap: {report['top_words_overlap']:.2f}")
+    print("Most common differences (- only NLTK, + only fast):")
+    for word, count in report['top_differences']:
+        print(f"  {word}: {count}")
+    print(f"NLTK: {report['nltk_tweets_per_second']:.0f} tweets/s, "
+          f"fast: {report['fast_tweets_per_second']:.0f} tweets/s")
+
+    print("\n--- Comparison complete ---")
@@ -0,0 +1,158 @@
+# src/heavy_hitters.py
+
+import heapq
+from collections import Counter
+
+# Výchozí počet sledovaných slov v jednom souhrnu (= strop paměti)
+DEFAULT_CAPACITY = 1000
+
+# 'exact' = přesné počty (matice dokument x slovo / TopicStats), 'spacesaving' = přibližné top-k s omezenou pamětí
+TOPK_BACKENDS = ['exact', 'spacesaving']
+
+
+class SpaceSaving:
+    """
+    Přibližné nejčastější položky (algoritmus Space-Saving, Metwally a kol. 2005)
+    s pamětí omezenou na 'capacity' počítadel, ať je vstup jakkoliv velký.
+
+    Záruky pro N = součet všech přidaných počtů a m = capacity:
+      - každá položka se skutečným počtem > N / m v souhrnu určitě je,
+      - uložený počet položky nikdy není menší než skutečný a přečnívá ho nejvýš o error(položka) <= N / m,
+      - count - error je tedy spodní odhad; když je u k-té položky >= počtu (k+1)-ní, je pořadí top-k jisté.
+    Souhrny jde slučovat (merge) - bloky CSV nebo workery si spočítají vlastní a výsledek má
+    stejné záruky pro součet jejich N (Cafaro a kol. 2016, "parallel Space Saving").
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError("SpaceSaving capacity must be at least 1.")
+        self.capacity = capacity
+        self.total = 0
+        self.counts = {}
+        self.errors = {}
+        # Min-halda (počet při vložení, pořadí, položka); počty jen rostou, zastaralé záznamy se opraví při výběru
+        self._heap = []
+        self._order = 0
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __contains__(self, item) -> bool:
+        return item in self.counts
+
+    def _push(self, item):
+        self._order += 1
+        heapq.heappush(self._heap, (self.counts[item], self._order, item))
+
+    def _pop_min(self):
+        """Odebere položku s nejmenším počtem (zastaralé záznamy haldy se cestou aktualizují)."""
+        while True:
+            count, _, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return item, count
+            if item in self.counts:
+                self._push(item)
+
+    def min_count(self) -> int:
+        """Nejmenší uložený počet (0, dokud souhrn není plný) = horní mez počtu nesledované položky."""
+        if len(self.counts) < self.capacity:
+            return 0
+        item, count = self._pop_min()
+        self._push(item)
+        return count
+
+    def update(self, item, count: int = 1):
+        """Přičte 'count' výskytů položky (O(log m) amortizovaně)."""
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+            return
+        error = 0
+        if len(self.counts) >= self.capacity:
+            # Nahradí se nejméně častá položka, nová zdědí její počet jako možnou chybu
+            evicted, error = self._pop_min()
+            del self.counts[evicted]
+            del self.errors[evicted]
+        self.counts[item] = error + count
+        self.errors[item] = error
+        self._push(item)
+
+    def update_many(self, items):
+        """Přidá všechny položky (např. tokeny bloku tweetů); stejné položky se nejdřív sečtou."""
+        for item, count in Counter(items).items():
+            self.update(item, count)
+        return self
+
+    @classmethod
+    def from_token_lists(cls, token_lists, capacity: int = DEFAULT_CAPACITY) -> 'SpaceSaving':
+        """Souhrn ze seznamů tokenů (sloupec 'tokens'), bez skládání jednoho obřího seznamu."""
+        summary = cls(capacity)
+        for tokens in token_lists:
+            summary.update_many(tokens)
+        return summary
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """
+        Nový souhrn = součet dvou souhrnů (kapacita je větší z obou).
+        Položce, kterou jeden souhrn nesleduje, se za něj přičte jeho min_count (může tam být nejvýš tolik).
+        """
+        merged = SpaceSaving(max(self.capacity, other.capacity))
+        merged.total = self.total + other.total
+        self_min, other_min = self.min_count(), other.min_count()
+
+        combined = {}
+        for item in list(self.counts) + [item for item in other.counts if item not in self.counts]:
+            count = self.counts.get(item, self_min) + other.counts.get(item, other_min)
+            error = self.errors.get(item, self_min) + other.errors.get(item, other_min)
+            combined[item] = (count, error)
+
+        # Ponechá 'capacity' největších (stabilně, shody v pořadí prvního souhrnu)
+        kept = sorted(combined.items(), key=lambda entry: -entry[1][0])[:merged.capacity]
+        for item, (count, error) in kept:
+            merged.counts[item] = count
+            merged.errors[item] = error
+            merged._push(item)
+        return merged
+
+    def error(self, item) -> int:
+        """Nejvyšší možné nadhodnocení počtu položky (pro nesledovanou položku min_count)."""
+        return self.errors.get(item, self.min_count())
+
+    def error_bound(self) -> float:
+        """Garantovaná horní mez chyby libovolného počtu: N / m."""
+        return self.total / self.capacity
+
+    def most_common(self, num: int = 10, exclude=None) -> list:
+        """
+        Nejčastější položky [(položka, odhad počtu), ...] jako Counter.most_common,
+        bez položek z 'exclude'. Shody v pořadí, v jakém se položky začaly sledovat.
+        """
+        items = self.counts.items() if not exclude else ((i, c) for i, c in self.counts.items() if i not in exclude)
+        return sorted(items, key=lambda entry: -entry[1])[:num]
+
+    def guaranteed(self, num: int = 10) -> bool:
+        """True, když je pořadí prvních 'num' položek jisté (spodní odhad k-té >= horní odhad (k+1)-ní)."""
+        top = self.most_common(num + 1)
+        if len(top) <= num:
+            return len(self.counts) < self.capacity or not top
+        item, _ = top[num - 1]
+        return self.counts[item] - self.errors[item] >= top[num][1]
+
+
+# ---- Kód pro testování ----
+if __name__ == "__main__":
+    print("--- Testing heavy_hitters.py ---")
+
+    tokens = ['tax', 'plan', 'tax', 'wall', 'jobs', 'tax', 'plan', 'iran', 'wall', 'tax', 'fox', 'plan']
+    exact = Counter(tokens)
+
+    summary = SpaceSaving(capacity=3).update_many(tokens)
+    print(f"Exact:        {exact.most_common(3)}")
+    print(f"Space-Saving: {summary.most_common(3)} (error bound N/m = {summary.error_bound():.1f})")
+    print(f"Errors: {summary.errors}")
+
+    half = len(tokens) // 2
+    merged = SpaceSaving(3).update_many(tokens[:half]).merge(SpaceSaving(3).update_many(tokens[half:]))
+    print(f"Merged halves: {merged.most_common(3)} (N = {merged.total})")
+
+    print("\n--- Test complete ---")
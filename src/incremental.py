@@ -0,0 +1,170 @@
+# src/incremental.py
+
+import hashlib
+import os
+import pickle
+import re
+import shutil
+import pandas as pd
+from src.cache import DEFAULT_CACHE_DIR, config_key
+from src.metrics import StageMetrics, stage
+from src.aggregates import SentimentAggregates
+from src.data_loader import (
+    DEFAULT_CHUNK_SIZE, FRAME_COLUMNS, CandidateFrames, concat_chunks, iter_processed_chunks, print_candidates
+)
+
+# Kolik bajtů ze začátku a před koncem zpracované části se použije jako otisk souboru
+FINGERPRINT_BYTES = 64 * 1024
+
+_QUOTE_OR_NEWLINE = re.compile(rb'["\n]')
+
+
+def _state_path(filepath: str, cache_dir: str) -> str:
+    base_name = os.path.splitext(os.path.basename(filepath))[0]
+    return os.path.join(cache_dir, f"{base_name}.incremental")
+
+
+def _blocks_dir(state_path: str) -> str:
+    """Složka s bloky řádků, každý běh do ní jen přidá jeden nový soubor."""
+    return f"{state_path}.d"
+
+
+def _last_complete_record_end(filepath: str, start: int, block_size: int = 1 << 20) -> int:
+    """
+    Pozice hned za posledním kompletním CSV záznamem (od 'start' dál).
+    Konec řádku se počítá jen mimo uvozovky (tweety můžou obsahovat nový řádek),
+    rozepsaný poslední záznam se tak zpracuje až příště. Čte se jen nová část souboru.
+    """
+    end = start
+    in_quotes = False
+    position = start
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        for block in iter(lambda: f.read(block_size), b''):
+            for match in _QUOTE_OR_NEWLINE.finditer(block):
+                if match.group() == b'"':
+                    in_quotes = not in_quotes
+                elif not in_quotes:
+                    end = position + match.end()
+            position += len(block)
+    return end
+
+
+def _fingerprint(filepath: str, offset: int) -> str:
+    """
+    Otisk už zpracované části souboru: začátek souboru + úsek těsně před 'offset'.
+    Pozná, že soubor někdo přepsal (a ne jen doplnil), aniž by se musel číst celý.
+    """
+    digest = hashlib.sha256(str(offset).encode())
+    with open(filepath, 'rb') as f:
+        digest.update(f.read(min(offset, FINGERPRINT_BYTES)))
+        tail_start = max(0, offset - FINGERPRINT_BYTES)
+        f.seek(tail_start)
+        digest.update(f.read(offset - tail_start))
+    return digest.hexdigest()
+
+
+def _load_blocks(blocks_dir: str, block_names: list) -> pd.DataFrame:
+    """
+    Spojí uložené bloky do jedné tabulky seřazené podle kandidáta. Každý blok je seřazený už
+    od uložení, takže se úseky kandidátů jen poskládají za sebe (v pořadí bloků), nic se znovu neřadí.
+    """
+    pieces = {}
+    for block_name in block_names:
+        block = CandidateFrames(pd.read_pickle(os.path.join(blocks_dir, block_name)), presorted=True)
+        for candidate_name in block:
+            pieces.setdefault(candidate_name, []).append(block[candidate_name])
+    return concat_chunks([piece for candidate_pieces in pieces.values() for piece in candidate_pieces])
+
+
+def _load_state(path: str):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"Warning: Incremental state '{path}' could not be read ({e}), processing from scratch.")
+        return None
+
+
+def load_incremental(filepath: str, workers: int = 1, scorer: str = 'vader',
+                     chunksize: int = DEFAULT_CHUNK_SIZE, cache_dir: str = DEFAULT_CACHE_DIR,
+                     metrics: StageMetrics = None, tokenizer: str = 'nltk', quiet: bool = False) -> CandidateFrames:
+    """
+    Inkrementální varianta load_and_process_data pro CSV, do kterého se průběžně připisují řádky.
+    Pamatuje si, do kterého bajtu je soubor zpracovaný; ohodnotí a tokenizuje jen nové řádky
+    a jejich statistiky přičte k uloženým (počty, slova, 10min okna, časové zóny).
+    Nové řádky (jen FRAME_COLUMNS) se uloží jako další blok vedle starých, staré bloky se nečtou
+    ani nepřepisují - načtou se až ve chvíli, kdy je potřeba celá tabulka (textová analýza).
+    Pokud se soubor změnil jinak než připsáním (nebo se změnily stopwords / lexikon / scorer / tokenizer),
+    zpracuje se celý znovu. S quiet=True se nevypisuje průběh jednotlivých bloků.
+    """
+    if not os.path.exists(filepath):
+        print(f"Error: File '{filepath}' not found :(")
+        return CandidateFrames(concat_chunks([]))
+
+    state_path = _state_path(filepath, cache_dir)
+    blocks_dir = _blocks_dir(state_path)
+    config = config_key(scorer, tokenizer)
+
+    state = _load_state(state_path)
+    if (state is not None and state.get('config') == config and state['offset'] <= os.path.getsize(filepath)
+            and state['fingerprint'] == _fingerprint(filepath, state['offset'])
+            and 'blocks' in state and all(os.path.exists(os.path.join(blocks_dir, name)) for name in state['blocks'])):
+        start_offset = state['offset']
+    else:
+        state = None
+        start_offset = 0
+        print("Incremental mode: no usable saved state, processing the whole file.")
+
+    end_offset = _last_complete_record_end(filepath, start_offset)
+    if state is not None:
+        print(f"Incremental mode: {start_offset} bytes already processed, "
+              f"{end_offset - start_offset} new bytes to process.")
+
+    if state is not None and start_offset == end_offset:
+        print("No new rows since the last run.")
+        aggregates, block_names = state['aggregates'], state['blocks']
+    else:
+        # Krok 1 až 4 jen pro nové řádky, statistiky se sečtou hned z každého bloku CSV
+        frames, partials = [], []
+        for chunk in iter_processed_chunks(filepath, workers, scorer, chunksize, start_offset, end_offset,
+                                           metrics=metrics, tokenizer=tokenizer, quiet=quiet,
+                                           candidate_names=list(state['aggregates'].label_counts) if state else None):
+            with stage(metrics, 'aggregates', rows=len(chunk)):
+                partials.append(SentimentAggregates.from_frame(chunk))
+            frames.append(chunk[[col for col in FRAME_COLUMNS if col in chunk.columns]])
+        df_new = concat_chunks(frames)
+        print(f"Processed {len(df_new)} new tweets.")
+
+        with stage(metrics, 'aggregates'):
+            aggregates = SentimentAggregates.combine(([state['aggregates']] if state is not None else []) + partials)
+
+        if state is None:
+            shutil.rmtree(blocks_dir, ignore_errors=True)
+        block_names = list(state['blocks']) if state is not None else []
+        os.makedirs(blocks_dir, exist_ok=True)
+        if not df_new.empty:
+            # Blok se uloží seřazený podle kandidáta, při načtení se pak jen skládá
+            with stage(metrics, 'split', rows=len(df_new)):
+                block = CandidateFrames(df_new).frame
+            block_name = f"block_{len(block_names):05d}.pkl"
+            block.to_pickle(os.path.join(blocks_dir, block_name))
+            block_names.append(block_name)
+
+        # Stav se zapíše až po bloku - přerušený běh nechá platný starý stav
+        with open(state_path, 'wb') as f:
+            pickle.dump({
+                'config': config,
+                'offset': end_offset,
+                'fingerprint': _fingerprint(filepath, end_offset),
+                'aggregates': aggregates,
+                'blocks': block_names,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        print(f"Incremental state saved: {state_path} ({len(block_names)} row blocks)")
+
+    # Krok 5 - kandidáti a počty ze statistik, řádky se načtou z bloků až když jsou potřeba
+    candidate_frames = CandidateFrames.lazy(lambda: _load_blocks(blocks_dir, block_names), aggregates)
+    print_candidates(candidate_frames)
+    return candidate_frames
@@ -0,0 +1,290 @@
+# src/linear_sentiment.py
+
+import argparse
+import json
+import os
+import re
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from scipy import optimize, sparse
+
+# Natrénovaný model pro --scorer linear (python -m src.linear_sentiment train)
+DEFAULT_MODEL_PATH = 'models/linear_sentiment.npz'
+
+# Počet košů hashovaných příznaků (2^18) - paměť modelu nezávisí na velikosti slovníku
+HASH_BITS = 18
+
+# Pořadí tříd = sloupce pravděpodobností a vah
+CLASSES = ['Negative', 'Neutral', 'Positive']
+
+# Odkazy se z textu vyhodí, zbytek jsou slova (včetně "n't" a čísel) a vykřičníky / otazníky
+_URL_PATTERN = re.compile(r'https?://\S+|pic\.twitter\.com/\S+')
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+|[!?]")
+
+
+def _text_features(text: str) -> list:
+    """
+    Příznaky jednoho tweetu: slova a dvojice sousedních slov.
+    Stopwords se tu nevyhazují (na rozdíl od tokenů pro analýzu témat) - "not" / "no" mění sentiment.
+    """
+    words = _TOKEN_PATTERN.findall(_URL_PATTERN.sub(' ', str(text).lower()))
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def hash_features(texts, hash_bits: int = HASH_BITS) -> sparse.csr_matrix:
+    """
+    Řídká matice tweet x hashovaný příznak s počty výskytů.
+    Každý různý příznak v dávce se hashuje (CRC32, stejné v každém procesu) jen jednou.
+    """
+    feature_lists = [_text_features(text) for text in texts]
+    lengths = np.fromiter((len(features) for features in feature_lists), dtype=np.int64, count=len(feature_lists))
+    codes, uniques = pd.factorize(pd.Series([f for features in feature_lists for f in features], dtype=object))
+    buckets = np.fromiter((zlib.crc32(feature.encode('utf-8')) for feature in uniques), dtype=np.int64,
+                          count=len(uniques)) & ((1 << hash_bits) - 1)
+
+    rows = np.repeat(np.arange(len(feature_lists), dtype=np.int64), lengths)
+    matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.float64), (rows, buckets[codes])),
+                               shape=(len(feature_lists), 1 << hash_bits))
+    matrix.sum_duplicates()
+    return matrix
+
+
+class LinearSentimentModel:
+    """
+    Multinomická logistická regrese nad hashovanými TF-IDF příznaky (slova + dvojice slov),
+    natrénovaná na ručních popiscích datasetu (sloupec 'sentiment', váhy 'sentiment_confidence').
+    Dávka tweetů se ohodnotí dvěma maticovými součiny (řídká matice x váhy), bez Python smyčky přes pravidla.
+
+    Výstup má stejné sloupce jako VADER (compound, pos, neg, neu), aby šel použít všude místo něj:
+      - pos / neg / neu = pravděpodobnosti tříd,
+      - compound = P(pos) - P(neg) v rozsahu -1 až 1,
+      - popisek tweetu = nejpravděpodobnější třída (viz label_probabilities v src/sentiment.py).
+    """
+
+    def __init__(self, idf: np.ndarray, weights: np.ndarray, bias: np.ndarray):
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+        self.hash_bits = int(np.log2(len(idf)))
+
+    def transform(self, texts) -> sparse.csr_matrix:
+        """TF-IDF: log(1 + počet) * idf, řádky normalizované na jednotkovou délku."""
+        matrix = hash_features(texts, self.hash_bits)
+        matrix.data = np.log1p(matrix.data)
+        matrix = matrix.multiply(self.idf).tocsr()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        return sparse.diags(1 / np.where(norms > 0, norms, 1)) @ matrix
+
+    def predict_proba(self, texts) -> np.ndarray:
+        """Pravděpodobnosti tříd (sloupce podle CLASSES)."""
+        return _softmax(self.transform(texts) @ self.weights + self.bias)
+
+    def predict(self, texts) -> np.ndarray:
+        return np.array(CLASSES, dtype=object)[self.predict_proba(texts).argmax(axis=1)]
+
+    def score_batch(self, texts) -> np.ndarray:
+        """Ohodnotí dávku textů. Sloupce: compound, pos, neg, neu (jako VADER)."""
+        proba = self.predict_proba(texts)
+        negative, neutral, positive = proba[:, 0], proba[:, 1], proba[:, 2]
+        return np.column_stack([positive - negative, positive, negative, neutral])
+
+    @classmethod
+    def train(cls, texts, labels, sample_weights=None, hash_bits: int = HASH_BITS, l2: float = 1e-5,
+              max_iter: int = 200) -> 'LinearSentimentModel':
+        """
+        Natrénuje model (L-BFGS na vážené křížové entropii s L2 regularizací).
+        'labels' = 'Positive' / 'Negative' / 'Neutral', 'sample_weights' např. jistota anotátorů.
+        """
+        counts = hash_features(texts, hash_bits)
+        num_docs = counts.shape[0]
+        document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+        idf = np.log((1 + num_docs) / (1 + document_frequency)) + 1
+        model = cls(idf, np.zeros((counts.shape[1], len(CLASSES))), np.zeros(len(CLASSES)))
+
+        features = model.transform(texts)
+        targets = np.zeros((num_docs, len(CLASSES)))
+        targets[np.arange(num_docs), pd.Categorical(labels, categories=CLASSES).codes] = 1
+        sample_weights = np.ones(num_docs) if sample_weights is None else np.asarray(sample_weights, dtype=float)
+        sample_weights = sample_weights / sample_weights.sum()
+
+        # Trénují se jen koše, které se v datech vyskytly (ostatní váhy zůstanou nulové)
+        used = np.flatnonzero(document_frequency)
+        features = features[:, used]
+        num_weights = len(used) * len(CLASSES)
+
+        def loss_and_gradient(params):
+            weights = params[:num_weights].reshape(len(used), len(CLASSES))
+            bias = params[num_weights:]
+            proba = _softmax(features @ weights + bias)
+            loss = -np.sum(sample_weights * np.log(np.maximum((proba * targets).sum(axis=1), 1e-12)))
+            loss += l2 / 2 * np.sum(weights ** 2)
+            residual = (proba - targets) * sample_weights[:, None]
+            gradient_weights = features.T @ residual + l2 * weights
+            return loss, np.concatenate([gradient_weights.ravel(), residual.sum(axis=0)])
+
+        result = optimize.minimize(loss_and_gradient, np.zeros(num_weights + len(CLASSES)), jac=True,
+                                   method='L-BFGS-B', options={'maxiter': max_iter})
+        model.weights[used] = result.x[:num_weights].reshape(len(used), len(CLASSES))
+        model.bias = result.x[num_weights:]
+        return model
+
+    def save(self, path: str = DEFAULT_MODEL_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(path, idf=self.idf, weights=self.weights, bias=self.bias)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> 'LinearSentimentModel':
+        with np.load(path) as data:
+            return cls(data['idf'], data['weights'], data['bias'])
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+_default_model = None
+
+
+def get_linear_model() -> LinearSentimentModel:
+    """Vrátí sdílený natrénovaný model z DEFAULT_MODEL_PATH (načte se při prvním použití)."""
+    global _default_model
+    if _default_model is None:
+        if not os.path.exists(DEFAULT_MODEL_PATH):
+            raise LookupError(f"Linear sentiment model '{DEFAULT_MODEL_PATH}' not found, "
+                              f"train it with: python -m src.linear_sentiment train")
+        _default_model = LinearSentimentModel.load(DEFAULT_MODEL_PATH)
+    return _default_model
+
+
+def score_batch(texts) -> np.ndarray:
+    """Ohodnotí dávku textů natrénovaným modelem. Sloupce: compound, pos, neg, neu."""
+    return get_linear_model().score_batch(texts)
+
+
+def load_labeled_data(filepath: str = 'data/Sentiment.csv') -> pd.DataFrame:
+    """Tweety s ručními popisky: sloupce text, sentiment a sentiment_confidence (řádky bez popisku se vynechají)."""
+    df = pd.read_csv(filepath, encoding='latin-1', usecols=['text', 'sentiment', 'sentiment_confidence'])
+    df = df.dropna(subset=['text', 'sentiment'])
+    df = df[df['sentiment'].isin(CLASSES)].reset_index(drop=True)
+    df['sentiment_confidence'] = df['sentiment_confidence'].fillna(1.0)
+    return df
+
+
+def train_model(filepath: str = 'data/Sentiment.csv', output: str = DEFAULT_MODEL_PATH) -> LinearSentimentModel:
+    """Natrénuje model na všech označených tweetech souboru a uloží ho pro --scorer linear."""
+    df = load_labeled_data(filepath)
+    print(f"Training linear sentiment model on {len(df)} labeled tweets...")
+    start = time.perf_counter()
+    model = LinearSentimentModel.train(df['text'].tolist(), df['sentiment'], df['sentiment_confidence'])
+    model.save(output)
+    print(f"Model saved: {output} ({time.perf_counter() - start:.1f} s)")
+    return model
+
+
+def benchmark_report(filepath: str = 'data/Sentiment.csv', test_fraction: float = 0.2, seed: int = 42) -> dict:
+    """
+    Porovná lineární model s VADERem (přesným i rychlým) na odložené části dat (model ji při
+    tréninku neviděl): přesnost proti ručním popiskům (všem i jen s jistotou 1.0),
+    shodu popisků s VADERem a rychlost v tweetech za sekundu.
+    """
+    from src.sentiment import get_analyzer, label_sentiment
+    from src.fast_sentiment import score_batch as fast_score_batch
+
+    df = load_labeled_data(filepath)
+    test = np.random.default_rng(seed).random(len(df)) < test_fraction
+    train_df, test_df = df[~test], df[test].reset_index(drop=True)
+    texts = test_df['text'].tolist()
+    gold = test_df['sentiment'].to_numpy()
+    confident = (test_df['sentiment_confidence'] == 1.0).to_numpy()
+
+    start = time.perf_counter()
+    model = LinearSentimentModel.train(train_df['text'].tolist(), train_df['sentiment'],
+                                       train_df['sentiment_confidence'])
+    train_seconds = time.perf_counter() - start
+
+    sia = get_analyzer()
+    start = time.perf_counter()
+    vader = pd.Series([sia.polarity_scores(str(text))['compound'] for text in texts])
+    vader_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = pd.Series(fast_score_batch(texts)[:, 0])
+    fast_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    linear = model.predict(texts)
+    linear_seconds = time.perf_counter() - start
+
+    predictions = {
+        'vader': label_sentiment(vader).to_numpy(),
+        'fast': label_sentiment(fast).to_numpy(),
+        'linear': linear,
+    }
+    seconds = {'vader': vader_seconds, 'fast': fast_seconds, 'linear': linear_seconds}
+
+    scorers = {}
+    for name, labels in predictions.items():
+        scorers[name] = {
+            'accuracy': float((labels == gold).mean()),
+            'accuracy_confident': float((labels[confident] == gold[confident]).mean()) if confident.any() else None,
+            'per_label_recall': {label: float((labels[gold == label] == label).mean())
+                                 for label in CLASSES if (gold == label).any()},
+            'tweets_per_second': len(texts) / seconds[name] if seconds[name] else float('inf'),
+        }
+
+    return {
+        'train_tweets': len(train_df),
+        'test_tweets': len(texts),
+        'confident_test_tweets': int(confident.sum()),
+        'train_seconds': train_seconds,
+        'majority_baseline': float((gold == train_df['sentiment'].mode()[0]).mean()),
+        'linear_vs_vader_agreement': float((predictions['linear'] == predictions['vader']).mean()),
+        'scorers': scorers,
+    }
+
+
+# ---- Kód pro testování ----
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trainable linear sentiment classifier (--scorer linear)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    train_parser = commands.add_parser('train', help="Train on the labeled tweets and save the model")
+    train_parser.add_argument('--data', default='data/Sentiment.csv', help="CSV with 'sentiment' labels")
+    train_parser.add_argument('--output', default=DEFAULT_MODEL_PATH, help=f"Model file (default: {DEFAULT_MODEL_PATH})")
+    benchmark_parser = commands.add_parser('benchmark', help="Accuracy and speed vs. VADER on a held-out split")
+    benchmark_parser.add_argument('--data', default='data/Sentiment.csv', help="CSV with 'sentiment' labels")
+    benchmark_parser.add_argument('--output', default='results/benchmarks/linear_sentiment.json',
+                                  help="Where to save the report (JSON)")
+    args = parser.parse_args()
+
+    if args.command == 'train':
+        train_model(args.data, args.output)
+        raise SystemExit(0)
+
+    print("--- Benchmarking linear sentiment model against VADER and gold labels ---")
+    from src.preprocessing import ensure_nltk_data
+    if not ensure_nltk_data():
+        raise SystemExit(1)
+
+    report = benchmark_report(args.data)
+
+    print(f"\nTrain / test tweets: {report['train_tweets']} / {report['test_tweets']} "
+          f"({report['confident_test_tweets']} test tweets with confidence 1.0)")
+    print(f"Training time: {report['train_seconds']:.1f} s")
+    print(f"Majority class baseline: {report['majority_baseline']:.4f}")
+    print(f"{'scorer':<8}{'accuracy':>10}{'confident':>11}{'tweets/s':>12}   recall per label")
+    for name, stats in report['scorers'].items():
+        recall = ', '.join(f"{label} {value:.2f}" for label, value in stats['per_label_recall'].items())
+        print(f"{name:<8}{stats['accuracy']:>10.4f}{stats['accuracy_confident']:>11.4f}"
+              f"{stats['tweets_per_second']:>12.0f}   {recall}")
+    print(f"Linear vs. VADER label agreement: {report['linear_vs_vader_agreement']:.4f}")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report saved: {args.output}")
+
+    print("\n--- Benchmark complete ---")
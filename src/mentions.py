@@ -0,0 +1,144 @@
+# src/mentions.py
+
+import re
+import numpy as np
+import pandas as pd
+
+MENTIONS_COLUMN = 'mentions'
+
+# Hodnota sloupce 'candidate' pro tweety, které nejsou o žádném kandidátovi (nejde ji zmínit)
+NO_CANDIDATE = 'No candidate mentioned'
+
+# Twitterové účty, které se ze jména kandidáta odvodit nedají - přidávají se k aliasům z candidate_aliases
+EXTRA_ALIASES = {
+    'Donald Trump': ['realdonaldtrump'],
+    'Ben Carson': ['realbencarson'],
+    'Mike Huckabee': ['govmikehuckabee'],
+    'Chris Christie': ['govchristie'],
+}
+
+
+def candidate_aliases(candidate_names) -> dict:
+    """
+    Jak se kandidáti z dat v tweetech zmiňují: příjmení + celé jméno dohromady (účet / hashtag,
+    např. 'Ted Cruz' -> ['cruz', 'tedcruz']) + ručně doplněné účty z EXTRA_ALIASES.
+    Hledá se v textu převedeném na malá písmena.
+    """
+    aliases = {}
+    for candidate_name in candidate_names:
+        words = re.findall(r'[a-z]+', str(candidate_name).lower())
+        if candidate_name == NO_CANDIDATE or not words:
+            continue
+        aliases[candidate_name] = list(dict.fromkeys([words[-1], ''.join(words)] + EXTRA_ALIASES.get(candidate_name, [])))
+    return aliases
+
+
+def _trie_pattern(words: list) -> str:
+    """
+    Poskládá seznam slov do jednoho regexu ve tvaru prefixového stromu (trie),
+    např. ['carson', 'cruz'] -> 'c(?:arson|ruz)'. Regex pak u každé pozice
+    v textu zkouší jen větve se správným začátkem, ne všechna slova postupně.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}  # konec slova
+
+    def build(node: dict) -> str:
+        ends_here = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not ends_here:
+            return branches[0]
+        pattern = '(?:' + '|'.join(branches) + ')'
+        return pattern + '?' if ends_here else pattern
+
+    return build(trie)
+
+
+class MentionMatcher:
+    """
+    Najde zmínky všech kandidátů v textu jedním průchodem jedním zkompilovaným regexem.
+    Alias musí stát samostatně: před ním ani za ním nesmí být písmeno
+    ("paul" ve "pauline" se nepočítá, "trump" v "#trump2016" ano).
+    """
+
+    def __init__(self, aliases: dict):
+        self.targets = list(aliases.keys())
+        self._alias_to_target = {}
+        for target_index, target in enumerate(self.targets):
+            for alias in aliases[target]:
+                self._alias_to_target[alias.lower()] = target_index
+
+        self._regex = re.compile(r'(?<![a-z])' + _trie_pattern(list(self._alias_to_target)) + r'(?![a-z])')
+
+    def find_indices(self, text: str) -> list:
+        """Indexy (do self.targets) kandidátů zmíněných v textu, každý max. jednou, v pořadí výskytu."""
+        found = []
+        if not self._alias_to_target:
+            return found
+        for alias in self._regex.findall(str(text).lower()):
+            target_index = self._alias_to_target[alias]
+            if target_index not in found:
+                found.append(target_index)
+        return found
+
+    def find(self, text: str) -> list:
+        """Jména kandidátů zmíněných v textu."""
+        return [self.targets[i] for i in self.find_indices(text)]
+
+
+_matchers = {}
+
+
+def get_matcher(candidate_names) -> MentionMatcher:
+    """Sdílený matcher pro aliasy daných kandidátů (regex se pro stejné kandidáty zkompiluje jen jednou)."""
+    key = tuple(candidate_names)
+    if key not in _matchers:
+        _matchers[key] = MentionMatcher(candidate_aliases(key))
+    return _matchers[key]
+
+
+def add_mentions(df: pd.DataFrame, candidate_names: list = None) -> pd.DataFrame:
+    """
+    Přidá sloupec 'mentions' se seznamem kandidátů zmíněných v každém tweetu.
+    Hledají se kandidáti 'candidate_names' (při čtení po blocích všichni kandidáti souboru,
+    aby výsledek nezávisel na velikosti bloku), bez nich kandidáti z tabulky.
+    Sloupec můžou používat i jiné analýzy než heatmapa.
+    """
+    if candidate_names is None:
+        candidate_names = list(pd.unique(df['candidate'])) if not df.empty else []
+    matcher = get_matcher(candidate_names)
+    df_mentions = df.copy()
+    df_mentions[MENTIONS_COLUMN] = [matcher.find(text) for text in df['text']]
+    return df_mentions
+
+
+def mention_matrix(df: pd.DataFrame, targets: list = None) -> pd.DataFrame:
+    """
+    Matice: řádky = o kom tweet je (sloupec 'candidate'), sloupce = koho zmiňuje
+    (bez 'targets' kandidáti z tabulky a pak ostatní zmínění, v pořadí výskytu).
+    Počty se sčítají v NumPy poli najednou, ne po jednotlivých buňkách pandas.
+    """
+    speakers = list(pd.unique(df['candidate'])) if not df.empty else []
+    if targets is None:
+        mentioned = [name for names in df[MENTIONS_COLUMN] for name in names] if speakers else []
+        targets = list(dict.fromkeys(list(candidate_aliases(speakers)) + mentioned))
+    matrix = np.zeros((len(speakers), len(targets)), dtype=np.int64)
+
+    if speakers:
+        speaker_index = {name: i for i, name in enumerate(speakers)}
+        target_index = {name: i for i, name in enumerate(targets)}
+
+        mentions = df[MENTIONS_COLUMN]
+        lengths = mentions.map(len).to_numpy()
+        rows = np.repeat(df['candidate'].map(speaker_index).to_numpy(dtype=np.int64), lengths)
+        cols = np.array([target_index.get(name, -1) for names in mentions for name in names], dtype=np.int64)
+
+        known = cols >= 0
+        np.add.at(matrix, (rows[known], cols[known]), 1)
+
+    return pd.DataFrame(matrix, index=speakers, columns=targets)
@@ -0,0 +1,226 @@
+# src/metrics.py
+
+import cProfile
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+
+    HAS_RESOURCE = True
+except ImportError:  # Windows
+    HAS_RESOURCE = False
+
+# Import pro pyinstrument (volitelný profiler, ošetřeno, kdyby chyběl)
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+
+    HAS_PYINSTRUMENT = True
+except ImportError:
+    HAS_PYINSTRUMENT = False
+
+PROFILERS = ['cprofile', 'pyinstrument']
+
+
+def current_rss_mb() -> float:
+    """
+    Aktuální paměť procesu (RSS) v MB. Na Linuxu z /proc, jinde aspoň
+    maximum za celý běh procesu (resource.getrusage), případně 0.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    if HAS_RESOURCE:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS vrací bajty, Linux kilobajty
+        return max_rss / 2 ** 20 if sys.platform == 'darwin' else max_rss / 2 ** 10
+    return 0.0
+
+
+class _PeakMemorySampler(threading.Thread):
+    """Vlákno, které během etapy každých 'interval' sekund změří RSS a pamatuje si maximum."""
+
+    def __init__(self, interval: float = 0.01):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_mb = current_rss_mb()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def stop(self) -> float:
+        self._stop_event.set()
+        self.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+        return self.peak_mb
+
+
+class StageMetrics:
+    """
+    Měření jednotlivých etap zpracování: čas, špička paměti (RSS) a počty řádků / tokenů.
+
+        metrics = StageMetrics()
+        with metrics.stage('load') as counters:
+            df = load_data(...)
+            counters['rows'] = len(df)
+
+    Etapa se stejným jménem spuštěná víckrát (např. pro každý blok CSV) se sčítá do jednoho záznamu.
+    Podetapy (add_substage, např. jednotlivé grafy uvnitř render_charts) mají v záznamu 'parent'
+    a do celkového času se nepočítají - jejich čas už je v nadřazené etapě.
+    S profile='cprofile' / 'pyinstrument' se každá etapa navíc profiluje (viz save).
+    Výsledky jsou v metrics.records (seznam slovníků, jde rovnou uložit do JSON).
+    """
+
+    def __init__(self, profile: str = None):
+        if profile == 'pyinstrument' and not HAS_PYINSTRUMENT:
+            print("Warning: 'pyinstrument' library not found, using cProfile instead.")
+            print("To install: pip install pyinstrument")
+            profile = 'cprofile'
+        self.profile = profile
+        self.records = []
+        self._by_name = {}
+        self._profilers = {}
+
+    def _start_profiler(self, name: str):
+        if self.profile is None:
+            return None
+        if name not in self._profilers:
+            self._profilers[name] = cProfile.Profile() if self.profile == 'cprofile' else PyinstrumentProfiler()
+        profiler = self._profilers[name]
+        profiler.enable() if self.profile == 'cprofile' else profiler.start()
+        return profiler
+
+    def _stop_profiler(self, profiler):
+        if profiler is not None:
+            profiler.disable() if self.profile == 'cprofile' else profiler.stop()
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None, tokens: int = None):
+        """Změří blok kódu. Počty jdou doplnit i až uvnitř bloku (counters['rows'] = ...)."""
+        counters = {'rows': rows, 'tokens': tokens}
+        sampler = _PeakMemorySampler()
+        rss_before = current_rss_mb()
+        sampler.start()
+        profiler = self._start_profiler(name)
+        start = time.perf_counter()
+        try:
+            yield counters
+        finally:
+            seconds = time.perf_counter() - start
+            self._stop_profiler(profiler)
+            peak_mb = sampler.stop()
+            self.add(name, seconds, counters['rows'], counters['tokens'], rss_before, peak_mb)
+
+    def add(self, name: str, seconds: float, rows: int = None, tokens: int = None,
+            rss_start_mb: float = None, rss_peak_mb: float = None, parent: str = None):
+        """Přidá změřenou etapu (i změřenou jinde, např. graf vykreslený ve workeru)."""
+        record = self._by_name.get(name)
+        if record is None:
+            record = {'stage': name, 'parent': parent, 'calls': 0, 'seconds': 0.0, 'rows': None, 'tokens': None,
+                      'rss_start_mb': None if rss_start_mb is None else round(rss_start_mb, 1),
+                      'rss_peak_mb': None}
+            self._by_name[name] = record
+            self.records.append(record)
+
+        record['calls'] += 1
+        record['seconds'] = round(record['seconds'] + seconds, 4)
+        if rows is not None:
+            record['rows'] = (record['rows'] or 0) + rows
+        if tokens is not None:
+            record['tokens'] = (record['tokens'] or 0) + tokens
+        if rss_peak_mb is not None:
+            record['rss_peak_mb'] = round(max(record['rss_peak_mb'] or 0.0, rss_peak_mb), 1)
+
+        # Propustnost (řádky / tokeny za sekundu)
+        for counter in ('rows', 'tokens'):
+            value = record[counter]
+            record[f'{counter}_per_s'] = round(value / record['seconds'], 1) if value and record['seconds'] else None
+
+    def add_substage(self, name: str, seconds: float, parent: str, rows: int = None):
+        """
+        Přidá podetapu etapy 'parent' (např. čas jedné kreslicí funkce uvnitř render_charts,
+        s více workery jde o součet jejich časů). Do total_seconds se nepočítá.
+        """
+        self.add(name, seconds, rows, parent=parent)
+
+    def total_seconds(self) -> float:
+        """Součet časů etap bez podetap (ty jsou už započtené v nadřazené etapě)."""
+        return sum(record['seconds'] for record in self.records if record.get('parent') is None)
+
+    def report(self) -> str:
+        """Přehledná tabulka etap pro výpis do konzole (podetapy odsazené pod nadřazenou etapou)."""
+        lines = [f"{'stage':<48}{'seconds':>10}{'rows/s':>14}{'peak MB':>10}"]
+        top_level = [record for record in self.records if record.get('parent') is None]
+        ordered = []
+        for parent in top_level:
+            ordered += [parent] + [record for record in self.records if record.get('parent') == parent['stage']]
+        ordered += [record for record in self.records if record not in ordered]
+        for record in ordered:
+            rows_per_s = f"{record['rows_per_s']:.0f}" if record.get('rows_per_s') else '-'
+            peak_mb = f"{record['rss_peak_mb']:.1f}" if record.get('rss_peak_mb') is not None else '-'
+            name = record['stage'] if record.get('parent') is None else f"  {record['stage']}"
+            lines.append(f"{name:<48}{record['seconds']:>10.3f}{rows_per_s:>14}{peak_mb:>10}")
+        lines.append(f"{'total':<48}{self.total_seconds():>10.3f}")
+        return "\n".join(lines)
+
+    def save(self, output_dir: str, name: str = 'metrics'):
+        """
+        Uloží metriky do '{output_dir}/{name}.json' a '{name}.csv'.
+        Pokud se profilovalo, uloží i profil každé etapy do '{output_dir}/profiles/'
+        (cProfile: .prof pro pstats / snakeviz, pyinstrument: .html).
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        json_path = os.path.join(output_dir, f"{name}.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'total_seconds': round(self.total_seconds(), 4), 'stages': self.records}, f, indent=2)
+
+        csv_path = os.path.join(output_dir, f"{name}.csv")
+        columns = ['stage', 'parent', 'calls', 'seconds', 'rows', 'rows_per_s', 'tokens', 'tokens_per_s',
+                   'rss_start_mb', 'rss_peak_mb']
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(self.records)
+
+        if self._profilers:
+            profile_dir = os.path.join(output_dir, 'profiles')
+            os.makedirs(profile_dir, exist_ok=True)
+            for stage_name, profiler in self._profilers.items():
+                safe_name = "".join(c if c.isalnum() or c in '-_' else '_' for c in stage_name)
+                if self.profile == 'cprofile':
+                    profiler.dump_stats(os.path.join(profile_dir, f"{safe_name}.prof"))
+                else:
+                    with open(os.path.join(profile_dir, f"{safe_name}.html"), 'w', encoding='utf-8') as f:
+                        f.write(profiler.output_html())
+            print(f"Profiles saved: {profile_dir}")
+
+        print(f"Metrics saved: {json_path}, {csv_path}")
+
+
+def stage(metrics: StageMetrics, name: str, rows: int = None, tokens: int = None):
+    """metrics.stage(...), nebo nic neměřící blok, když se měřit nemá (metrics=None)."""
+    if metrics is None:
+        return nullcontext({'rows': rows, 'tokens': tokens})
+    return metrics.stage(name, rows=rows, tokens=tokens)
+
+
+def timed_iter(metrics: StageMetrics, name: str, iterable):
+    """Projde 'iterable' a čas strávený čekáním na každý prvek (např. čtení bloku CSV) přičte k etapě 'name'."""
+    iterator = iter(iterable)
+    while True:
+        with stage(metrics, name) as counters:
+            item = next(iterator, None)
+            if item is not None and hasattr(item, '__len__'):
+                counters['rows'] = len(item)
+        if item is None:
+            return
+        yield item
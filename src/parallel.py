@@ -0,0 +1,63 @@
+# src/parallel.py
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, List
+
+
+def _init_worker():
+    """
+    Spustí se jednou v každém workeru při startu poolu.
+    Načte VADER lexikon a stopwords jen jednou na proces, ne pro každý úkol
+    (ze sdílených lru_cache funkcí, bez stahování čehokoliv).
+    """
+    from src.preprocessing import get_stop_words
+    from src.sentiment import get_analyzer
+
+    get_stop_words()
+    get_analyzer()
+
+
+@contextmanager
+def worker_pool(workers: int, initializer=_init_worker):
+    """
+    Jeden pool procesů na celý běh (pro workers <= 1 None = sériově). Předává se do map_chunks
+    (score_sentiment, tokenize_data...), takže se workery spustí a VADER se stopwords načtou
+    jen jednou, ne znovu pro každý blok CSV. 'initializer=None' pro pooly, které je nepotřebují (grafy).
+    """
+    if workers <= 1:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer) as executor:
+        yield executor
+
+
+def split_into_chunks(items: list, workers: int, chunks_per_worker: int = 4) -> List[list]:
+    """Rozseká seznam na souvislé úseky řádků (row range), pořadí zůstává zachované."""
+    if not items:
+        return []
+    num_chunks = max(1, workers * chunks_per_worker)
+    chunk_size = -(-len(items) // num_chunks)  # zaokrouhlení nahoru
+    return [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+
+def map_chunks(func: Callable[[list], list], items: list, workers: int = 1,
+               executor: ProcessPoolExecutor = None) -> list:
+    """
+    Aplikuje 'func' na úseky seznamu 'items' a výsledky spojí zpět ve stejném pořadí.
+    Pro workers <= 1 běží vše sériově v hlavním procesu, výstup je v obou případech stejný.
+    'executor' = pool z worker_pool (jinak se pro toto volání vytvoří nový).
+    'func' musí být funkce definovaná na úrovni modulu (kvůli pickle).
+    """
+    if workers <= 1 or len(items) < 2:
+        return func(items)
+
+    if executor is None:
+        with worker_pool(workers) as executor:
+            return map_chunks(func, items, workers, executor)
+
+    results = []
+    # executor.map vrací výsledky ve stejném pořadí, jako byly úseky zadány
+    for chunk_result in executor.map(func, split_into_chunks(items, workers)):
+        results.extend(chunk_result)
+    return results
@@ -0,0 +1,214 @@
+# src/pipeline.py
+
+import hashlib
+import json
+import os
+from src.cache import cache_key
+from src.render import function_fingerprint
+from src.reporting import CANDIDATE_OUTPUTS, SUMMARY_OUTPUTS, OUTPUT_FUNCTIONS, output_path
+
+# Textová analýza (témata, kolokace, kontexty) jde jen do konzole, nemá obrázek
+TEXT_OUTPUT = 'text_analysis'
+ALL_OUTPUTS = CANDIDATE_OUTPUTS + SUMMARY_OUTPUTS + [TEXT_OUTPUT]
+
+# Etapy a na čem závisí (etapa -> etapy, které musí proběhnout dřív), v pořadí, v jakém běží -
+# skóre, tokeny a zmínky se počítají po blocích při načtení, statistiky se z bloků sčítají až po nich
+STAGE_DEPENDENCIES = {
+    'score': [],                # načtení, filtr, skóre sentimentu (nebo cache)
+    'tokens': ['score'],        # tokenizace
+    'row_tokens': ['tokens'],   # tokeny zůstanou u každého řádku tabulky (paměť roste s počtem tokenů)
+    'mentions': ['score'],      # zmínky kandidátů
+    'aggregates': ['score'],    # SentimentAggregates - počty, časová okna, zóny, histogram skóre (+ slova, zmínky)
+}
+
+MANIFEST_NAME = '.pipeline_manifest.json'
+
+
+def output_dependencies(output: str, topk_capacity: int = None) -> list:
+    """
+    Etapy, ze kterých se výstup počítá. Tokeny u řádků tabulky potřebuje jen textová analýza
+    a slova ze Space-Saving souhrnů, přesné počty slov jsou v SentimentAggregates.
+    """
+    if output == TEXT_OUTPUT:
+        return ['row_tokens']
+    if output == 'words' or output.startswith('wordcloud_'):
+        return ['row_tokens'] if topk_capacity is not None else ['tokens', 'aggregates']
+    if output == 'interaction_heatmap':
+        return ['mentions', 'aggregates']
+    return ['aggregates']
+
+
+def plan_stages(outputs: list, topk_capacity: int = None) -> list:
+    """Etapy potřebné pro dané výstupy i s jejich závislostmi (každá jen jednou), v pořadí STAGE_DEPENDENCIES."""
+    order = []
+
+    def visit(stage_name):
+        if stage_name in order:
+            return
+        for dependency in STAGE_DEPENDENCIES[stage_name]:
+            visit(dependency)
+        order.append(stage_name)
+
+    for output in outputs:
+        for stage_name in output_dependencies(output, topk_capacity):
+            visit(stage_name)
+    return [stage_name for stage_name in STAGE_DEPENDENCIES if stage_name in order]
+
+
+def output_fingerprint(input_key: str, output: str, candidate_name: str = None, **options) -> str:
+    """
+    Otisk vstupů výstupu: vstupní data + nastavení zpracování (input_key, viz cache_key),
+    volby ovlivňující výsledek (počet zón, kapacita top-k) a kreslicí funkce (function_fingerprint,
+    stejný otisk jako u src/render.py).
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{input_key}|{output}|{candidate_name}|{sorted(options.items())}|".encode())
+    func = OUTPUT_FUNCTIONS.get(output)
+    if func is not None:
+        digest.update(function_fingerprint(func).encode())
+    return digest.hexdigest()
+
+
+class OutputManifest:
+    """
+    Otisky výstupů z minulých běhů (results/images/.pipeline_manifest.json).
+    Výstup je aktuální, když se jeho otisk nezměnil a obrázek je tam, kde byl (nebo pořád chybí,
+    protože minule nebylo co kreslit). Aktuální výstupy se pak vůbec nepočítají, a když jsou
+    aktuální všechny, nenačítají se ani data.
+    Pamatuje si i seznam kandidátů, ať se kvůli němu nemusí načítat data.
+    """
+
+    def __init__(self, output_dir: str = "results/images"):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.input_key = None
+        self.candidates = []
+        self.outputs = {}
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.input_key = data.get('input_key')
+            self.candidates = data.get('candidates', [])
+            self.outputs = data.get('outputs', {})
+        except (OSError, ValueError) as e:
+            print(f"Warning: Pipeline manifest '{self.path}' could not be read ({e}), computing everything.")
+
+    def known_candidates(self, input_key: str):
+        """Kandidáti ze stejných vstupních dat (None, když se data od minula změnila)."""
+        return list(self.candidates) if input_key is not None and input_key == self.input_key else None
+
+    def is_fresh(self, filepath: str, fingerprint: str) -> bool:
+        entry = self.outputs.get(filepath)
+        return (entry is not None and entry['fingerprint'] == fingerprint
+                and entry['file'] == os.path.exists(filepath))
+
+    def record(self, filepath: str, fingerprint: str):
+        self.outputs[filepath] = {'fingerprint': fingerprint, 'file': os.path.exists(filepath)}
+
+    def save(self, input_key: str, candidates: list):
+        self.input_key = input_key
+        self.candidates = list(candidates)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'input_key': input_key, 'candidates': self.candidates, 'outputs': self.outputs},
+                      f, indent=2, sort_keys=True)
+
+
+class OutputPlan:
+    """
+    Které výstupy se mají v tomhle běhu spočítat: vybrané výstupy (--outputs) pro vybrané
+    kandidáty (--candidates), bez těch, které jsou podle OutputManifest aktuální (--skip-unchanged).
+    Souhrnné grafy jsou vždy za všechny kandidáty.
+    """
+
+    def __init__(self, filepath: str, scorer: str = 'vader', tokenizer: str = 'nltk', outputs: list = None,
+                 candidates: list = None, skip_unchanged: bool = False, num_zones: int = 5,
+                 topk_capacity: int = None, output_dir: str = "results/images"):
+        self.outputs = list(ALL_OUTPUTS if outputs is None else outputs)
+        self.candidates = candidates
+        self.output_dir = output_dir
+        self.topk_capacity = topk_capacity
+        self.options = {'num_zones': num_zones, 'topk_capacity': topk_capacity}
+
+        self.manifest = OutputManifest(output_dir) if skip_unchanged else None
+        self.input_key = cache_key(filepath, scorer, tokenizer) if skip_unchanged and os.path.exists(filepath) else None
+
+    def selected_candidates(self, available: list) -> list:
+        """Vybraní kandidáti v pořadí dat; neznámá jména se jen nahlásí."""
+        if self.candidates is None:
+            return list(available)
+        for candidate_name in self.candidates:
+            if candidate_name not in available:
+                print(f"Warning: Candidate '{candidate_name}' not found in the data, skipping.")
+        return [candidate_name for candidate_name in available if candidate_name in self.candidates]
+
+    def _fingerprint(self, output: str, candidate_name: str = None) -> str:
+        return output_fingerprint(self.input_key, output, candidate_name, **self.options)
+
+    def _path(self, output: str, candidate_name: str = None) -> str:
+        return output_path(output, candidate_name, self.output_dir)
+
+    def _is_pending(self, output: str, candidate_name: str = None) -> bool:
+        if output == TEXT_OUTPUT or self.manifest is None or self.input_key is None:
+            return True
+        return not self.manifest.is_fresh(self._path(output, candidate_name), self._fingerprint(output, candidate_name))
+
+    def pending(self, available: list) -> dict:
+        """
+        Výstupy k výpočtu {kandidát: [výstupy], None: [souhrnné výstupy]}
+        pro dané kandidáty v datech (jen kandidáti, kterým něco zbývá).
+        """
+        pending = {}
+        for candidate_name in self.selected_candidates(available):
+            outputs = [output for output in self.outputs if output in CANDIDATE_OUTPUTS + [TEXT_OUTPUT]
+                       and self._is_pending(output, candidate_name)]
+            if outputs:
+                pending[candidate_name] = outputs
+        summary = [output for output in self.outputs if output in SUMMARY_OUTPUTS and self._is_pending(output)]
+        if summary:
+            pending[None] = summary
+        return pending
+
+    def known_pending(self):
+        """
+        Výstupy k výpočtu bez načtení dat - jde jen se --skip-unchanged, když se vstup od minula
+        nezměnil (kandidáti jsou v manifestu). Jinak None a o výstupech se rozhodne až po načtení.
+        """
+        if self.manifest is None:
+            return None
+        available = self.manifest.known_candidates(self.input_key)
+        return None if available is None else self.pending(available)
+
+    def stages(self, pending: dict = None) -> list:
+        """
+        Etapy pro výstupy k výpočtu. Bez 'pending' (před načtením dat, kdy ještě není jasné,
+        co je aktuální) pro všechny vybrané výstupy - z toho se pozná, co se při načtení dá vynechat.
+        """
+        if pending is None:
+            outputs = set(self.outputs)
+        else:
+            outputs = {output for candidate_outputs in pending.values() for output in candidate_outputs}
+        return plan_stages(sorted(outputs), self.topk_capacity)
+
+    def record(self, pending: dict, available: list):
+        """Uloží otisky spočítaných výstupů (po vykreslení, ať manifest odpovídá souborům)."""
+        if self.manifest is None or self.input_key is None:
+            return
+        for candidate_name, outputs in pending.items():
+            for output in outputs:
+                if output != TEXT_OUTPUT:
+                    self.manifest.record(self._path(output, candidate_name), self._fingerprint(output, candidate_name))
+        self.manifest.save(self.input_key, available)
+
+
+# ---- Kód pro testování ----
+if __name__ == "__main__":
+    print("--- Testing pipeline.py ---")
+
+    for outputs in (['sentiment_overview'], ['words', 'time'], ALL_OUTPUTS):
+        print(f"{outputs} -> stages {plan_stages(outputs)}")
+    print(f"['interaction_heatmap'] -> stages {plan_stages(['interaction_heatmap'])}")
+    print(f"Space-Saving words -> stages {plan_stages(['words'], topk_capacity=1000)}")
+
+    print("\n--- Test complete ---")
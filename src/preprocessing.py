@@ -5,12 +5,58 @@ from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 import string  # Pro odstranění interpunkce
 import ssl  # <-- PŘIDÁNO: Pro opravu SSL chyby
+from functools import lru_cache
+from itertools import chain
+import pandas as pd
+from src.parallel import map_chunks
+from src.fast_tokenizer import tokenize_batch
+from src.dedup import TextCache
+
+
+# NLTK balíčky, které projekt potřebuje -> cesta, pod kterou je NLTK hledá lokálně
+NLTK_RESOURCES = {
+    'stopwords': 'corpora/stopwords',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'vader_lexicon': 'sentiment/vader_lexicon.zip',
+}
+
+
+def missing_nltk_data() -> list:
+    """Vrátí seznam NLTK balíčků, které nejsou stažené lokálně (nic nestahuje, nesahá na síť)."""
+    missing = []
+    for package, resource_path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(resource_path)
+        except LookupError:
+            missing.append(package)
+    return missing
+
+
+def ensure_nltk_data(download: bool = False) -> bool:
+    """
+    Zkontroluje lokální NLTK data. Stahuje jen když je to výslovně povolené (download=True),
+    jinak jen vypíše, co chybí - při běžném spuštění se tak nikdy nečeká na síť.
+    """
+    missing = missing_nltk_data()
+    if not missing:
+        return True
+
+    if download:
+        download_nltk_data()
+        missing = missing_nltk_data()
+        if not missing:
+            return True
+
+    print(f"Error: Missing NLTK data: {', '.join(missing)}.")
+    print("Run 'python main.py --download-nltk' once (or copy nltk_data to this machine).")
+    return False
 
 
 def download_nltk_data():
     """
     Stáhne potřebný data pro NLTK (stačí spustit jednou).
     OBSAHUJE FIX PRO SSL CHYBU.
+    Volá se jen explicitně (main.py --download-nltk), nikdy při importu.
     """
     print("Downloading NLTK data (stopwords, punkt)...")
 
@@ -32,16 +78,7 @@ def download_nltk_data():
     print("NLTK data downloaded successfully.")
 
 
-# --- Stáhneme data HNED ---
-# Teď už by to mělo projít díky tomu SSL fixu
-download_nltk_data()
-
-# --- Tohle se načte jen jednou při startu skriptu ---
-
-# 1. Načtu si anglický "stopwords"
-stop_words = set(stopwords.words('english'))
-
-# 2. Přidám vlastní "smetí", co nechci v analýze
+# Vlastní "smetí", co nechci v analýze (přidá se k anglickým stopwords)
 custom_stop_words = [
     'rt', 'gopdebate', 'gop', 'debate', 'amp', 'http', 'https', 'co', 'realdonaldtrump',
     # Jména kandidátů
@@ -49,9 +86,20 @@ custom_stop_words = [
     'jeb', 'bush', 'marco', 'rubio', 'mike', 'huckabee', 'chris', 'christie',
     'rand', 'paul', 'john', 'kasich'
 ]
-stop_words.update(custom_stop_words)
 
-# 3. Připravím si sadu interpunkce k odstranění
+
+@lru_cache(maxsize=None)
+def get_stop_words() -> frozenset:
+    """
+    Anglické stopwords + vlastní slova. Načte se až při prvním použití
+    a pak jen jednou za proces (i v každém workeru poolu).
+    """
+    words = set(stopwords.words('english'))
+    words.update(custom_stop_words)
+    return frozenset(words)
+
+
+# Připravím si sadu interpunkce k odstranění
 punctuation = set(string.punctuation)
 punctuation.add("''")
 punctuation.add("...")
@@ -83,6 +131,7 @@ def preprocess_text(text: str) -> list:
     # 3. Čištění
 
 
+    stop_words = get_stop_words()
     cleaned_tokens = []
     for token in tokens:
         if token in punctuation:
@@ -94,11 +143,56 @@ def preprocess_text(text: str) -> list:
 
     return cleaned_tokens
 
+
+TOKENS_COLUMN = 'tokens'
+
+# 'nltk' = word_tokenize + čištění (preprocess_text), 'fast' = jeden regex na celý sloupec (src/fast_tokenizer.py)
+TOKENIZERS = ['nltk', 'fast']
+
+
+def _preprocess_texts(texts: list) -> list:
+    """Vyčistí seznam textů (volá se i ve workerech procesního poolu)."""
+    return [preprocess_text(text) for text in texts]
+
+
+def tokenize_data(df: pd.DataFrame, workers: int = 1, tokenizer: str = 'nltk',
+                  cache: TextCache = None, quiet: bool = False, executor=None) -> pd.DataFrame:
+    """
+    Krok 4 (část 2): Vyčistí každý tweet právě jednou.
+    Tokeny uloží do sloupce 'tokens' (seznam slov pro každý řádek),
+    ze kterého pak čte analýza témat, top slova i word cloudy.
+    S workers > 1 se tokenizace rozdělí po úsecích řádků mezi více procesů ('executor' = sdílený pool).
+    tokenizer='fast' použije regexový tokenizer místo NLTK word_tokenize (navíc zahodí odkazy a @zmínky).
+    S 'cache' (src/dedup.py) se každý různý text (retweety) tokenizuje jen jednou.
+    S quiet=True se nevypisuje průběh (jen chyby).
+    """
+    if tokenizer not in TOKENIZERS:
+        print(f"Error: Unknown tokenizer '{tokenizer}', choose one of {TOKENIZERS}.")
+        return pd.DataFrame()
+
+    tokenize_func = tokenize_batch if tokenizer == 'fast' else _preprocess_texts
+    if not quiet:
+        print(f"Tokenizing {len(df)} tweets (tokenizer: {tokenizer}, workers: {workers})...")
+
+    df_tokens = df.copy()
+    texts = df['text'].tolist()
+    df_tokens[TOKENS_COLUMN] = (cache.map(tokenize_func, texts, workers, executor) if cache is not None
+                                else map_chunks(tokenize_func, texts, workers, executor))
+
+    if not quiet:
+        print("Tokenizing done.")
+    return df_tokens
+
+
+def flatten_tokens(token_lists) -> list:
+    """Spojí seznamy tokenů z více tweetů do jednoho seznamu."""
+    return list(chain.from_iterable(token_lists))
+
 # ---- Kód pro testování ----
 if __name__ == "__main__":
     print("--- Testing preprocessing.py ---")
 
-    # Stahování už proběhlo nahoře
+    ensure_nltk_data()
 
     test_tweet = "RT @User1: Donald Trump was GREAT in the #GOPDebate! So much better than Jeb Bush... http://t.co.Network/abc"
 
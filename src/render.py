@@ -0,0 +1,121 @@
+# src/render.py
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+import types
+from collections import namedtuple
+from src.metrics import StageMetrics
+from src.parallel import map_chunks, worker_pool
+
+# Jeden graf: kreslicí funkce z src/reporting.py, cesta k obrázku a předpočítaná data (argumenty funkce)
+ChartSpec = namedtuple('ChartSpec', ['func', 'filepath', 'args'])
+
+MANIFEST_NAME = '.render_manifest.json'
+
+
+def chart(func, filepath: str, *args) -> ChartSpec:
+    """Zkratka: chart(plot_top_words, cesta, top_words, jméno) -> func(top_words, jméno, filepath=cesta)."""
+    return ChartSpec(func, filepath, args)
+
+
+def function_fingerprint(func) -> str:
+    """
+    Otisk funkce: jméno + zdrojový kód, takže ho změní i úprava barvy, titulku nebo velikosti grafu.
+    Když zdrojový kód není k dispozici, bere se bytecode i s konstantami a jmény (i vnořených funkcí).
+    """
+    digest = hashlib.sha256(f"{func.__module__}.{func.__qualname__}|".encode())
+    try:
+        digest.update(inspect.getsource(func).encode())
+    except (OSError, TypeError):
+        _update_code_digest(digest, func.__code__)
+    return digest.hexdigest()
+
+
+def _update_code_digest(digest, code: types.CodeType):
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _update_code_digest(digest, const)
+        else:
+            digest.update(repr(const).encode())
+
+
+def spec_hash(spec: ChartSpec) -> str:
+    """
+    Otisk vstupů grafu: data + kreslicí funkce (function_fingerprint).
+    Když se nezmění data ani funkce, obrázek by vyšel stejně.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{function_fingerprint(spec.func)}|".encode())
+    digest.update(pickle.dumps(spec.args, protocol=4))
+    return digest.hexdigest()
+
+
+def _render_specs(specs: list) -> list:
+    """
+    Vykreslí seznam grafů (volá se i ve workerech procesního poolu).
+    Vrací [(cesta, jméno funkce, sekundy), ...].
+    """
+    results = []
+    for spec in specs:
+        start = time.perf_counter()
+        spec.func(*spec.args, filepath=spec.filepath)
+        results.append((spec.filepath, spec.func.__name__, time.perf_counter() - start))
+    return results
+
+
+def _load_manifest(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Render manifest '{path}' could not be read ({e}), rendering everything.")
+        return {}
+
+
+def render_charts(specs: list, workers: int = 1, skip_unchanged: bool = False,
+                  output_dir: str = "results/images", metrics: StageMetrics = None) -> list:
+    """
+    Vykreslí všechny grafy najednou, s workers > 1 paralelně ve více procesech (backend Agg).
+    Se skip_unchanged se přeskočí grafy, jejichž obrázek existuje a vstupy se od
+    minulého běhu nezměnily (otisky jsou v results/images/.render_manifest.json).
+    S 'metrics' se čas vykreslení sečte za každou kreslicí funkci (podetapy chart_<funkce>
+    etapy render_charts, do celkového času se nepočítají).
+    Vrací cesty nově vykreslených obrázků.
+    """
+    # Manifest se načte vždy - běh jen s částí grafů nesmí zahodit záznamy ostatních
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = _load_manifest(manifest_path)
+
+    hashes = {spec.filepath: spec_hash(spec) for spec in specs}
+    pending = [spec for spec in specs
+               if not (skip_unchanged and manifest.get(spec.filepath) == hashes[spec.filepath]
+                       and os.path.exists(spec.filepath))]
+
+    skipped = len(specs) - len(pending)
+    print(f"Rendering {len(pending)} charts (workers: {workers}"
+          + (f", {skipped} unchanged skipped)..." if skip_unchanged else ")..."))
+
+    # Pool bez načítání VADERu a stopwords, kreslení je nepotřebuje
+    with worker_pool(workers if pending else 1, initializer=None) as executor:
+        results = map_chunks(_render_specs, pending, workers, executor) if pending else []
+    rendered = [path for path, _, _ in results]
+    if metrics is not None:
+        for _, func_name, seconds in results:
+            metrics.add_substage(f"chart_{func_name}", seconds, parent='render_charts')
+
+    # Manifest se zapisuje vždy, aby příští běh se --skip-unchanged věděl, co je aktuální
+    manifest.update({path: hashes[path] for path in rendered})
+    os.makedirs(output_dir, exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print("Rendering done.")
+    return rendered
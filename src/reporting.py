@@ -1,16 +1,18 @@
 # src/reporting.py
 
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Grafy se jen ukládají do souborů (i ve workerech), žádné okno
 import matplotlib.pyplot as plt
 import numpy as np
 import os
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from nltk import FreqDist
-from src.preprocessing import preprocess_text
+from src.data_loader import CandidateFrames
+from src.aggregates import SentimentAggregates
+from src.render import chart
 
 # Import pro WordCloud (ošetřeno, kdyby chyběl)
 try:
-    from wordcloud import WordCloud
+    from wordcloud import WordCloud, STOPWORDS
 
     HAS_WORDCLOUD = True
 except ImportError:
@@ -18,12 +20,9 @@ except ImportError:
     print("Warning: 'wordcloud' library not found. WordCloud graphs will be skipped.")
     print("To install: pip install wordcloud")
 
-# Inicializace VADERu
-try:
-    sia = SentimentIntensityAnalyzer()
-except LookupError:
-    sia = None
-    print("Warning: VADER lexicon not found in reporting.")
+
+# Kolik nejčastějších slov dostane jeden word cloud (stejně jako výchozí WordCloud max_words)
+WORDCLOUD_MAX_WORDS = 200
 
 
 def _ensure_dir(filepath: str):
@@ -49,23 +48,15 @@ def save_sentiment_bar_chart(sentiment_data: pd.DataFrame,
     print(f"Summary chart saved: {filepath}")
 
 
-def plot_sentiment_over_time(df: pd.DataFrame, candidate_name: str, filepath: str):
+def plot_sentiment_over_time(sentiment_trend: pd.Series, candidate_name: str, filepath: str):
+    """
+    Průměrný sentiment v 10min oknech.
+    'sentiment_trend' je předpočítaná řada (viz SentimentAggregates.sentiment_trend).
+    """
     _ensure_dir(filepath)
-    df_time = df.copy()
-    df_time['tweet_created'] = pd.to_datetime(df_time['tweet_created'], errors='coerce')
-    df_time.dropna(subset=['tweet_created'], inplace=True)
-
-    if sia:
-        df_time['compound'] = df_time['text'].apply(lambda x: sia.polarity_scores(str(x))['compound'])
-    else:
+    if sentiment_trend.dropna().empty:
         return
 
-    df_time.set_index('tweet_created', inplace=True)
-    df_time.sort_index(inplace=True)
-
-    # Resample po 10 minutách pro detailnější křivku
-    sentiment_trend = df_time['compound'].resample('10min').mean()
-
     plt.figure(figsize=(10, 5))
     sentiment_trend.plot(kind='line', marker='o', color='purple', linewidth=2)
     plt.title(f"Sentiment Over Time: {candidate_name}")
@@ -77,18 +68,15 @@ def plot_sentiment_over_time(df: pd.DataFrame, candidate_name: str, filepath: st
     plt.close()
 
 
-def plot_top_words(df: pd.DataFrame, candidate_name: str, filepath: str, num=15):
+def plot_top_words(top_words: list, candidate_name: str, filepath: str):
+    """
+    Sloupcový graf nejčastějších slov.
+    'top_words' je seznam [(slovo, počet), ...] (viz CandidateFrames.top_words).
+    """
     _ensure_dir(filepath)
-    all_tokens = []
-    for text in df['text']:
-        all_tokens.extend(preprocess_text(text))
-
-    if not all_tokens:
+    if not top_words:
         return
 
-    fdist = FreqDist(all_tokens)
-    top_words = fdist.most_common(num)
-
     words = [w[0] for w in top_words]
     counts = [w[1] for w in top_words]
     words.reverse()
@@ -102,17 +90,19 @@ def plot_top_words(df: pd.DataFrame, candidate_name: str, filepath: str, num=15)
     plt.close()
 
 
-def plot_sentiment_distribution(df: pd.DataFrame, candidate_name: str, filepath: str):
+def plot_sentiment_distribution(score_counts: pd.Series, candidate_name: str, filepath: str):
+    """
+    Histogram compound skóre tweetů kandidáta.
+    'score_counts' = počet tweetů pro každou hodnotu skóre (viz SentimentAggregates.score_distribution).
+    """
     _ensure_dir(filepath)
-    scores = []
-    if sia:
-        scores = [sia.polarity_scores(str(t))['compound'] for t in df['text']]
 
-    if not scores:
+    if score_counts.empty:
         return
 
     plt.figure(figsize=(8, 5))
-    plt.hist(scores, bins=20, color='orange', edgecolor='black', alpha=0.7)
+    plt.hist(score_counts.index.to_numpy(), bins=20, weights=score_counts.to_numpy(),
+             color='orange', edgecolor='black', alpha=0.7)
     plt.title(f"Polarization: {candidate_name}")
     plt.axvline(0, color='black', linestyle='--', linewidth=1)
     plt.tight_layout()
@@ -120,22 +110,15 @@ def plot_sentiment_distribution(df: pd.DataFrame, candidate_name: str, filepath:
     plt.close()
 
 
-def plot_sentiment_by_timezone(df: pd.DataFrame, candidate_name: str, filepath: str):
+def plot_sentiment_by_timezone(timezone_sentiment: pd.Series, candidate_name: str, filepath: str):
+    """
+    Průměrný sentiment v nejčastějších časových zónách kandidáta.
+    'timezone_sentiment' je předpočítaná řada (viz SentimentAggregates.timezone_sentiment).
+    """
     _ensure_dir(filepath)
-    df_zone = df.dropna(subset=['user_timezone']).copy()
-    if df_zone.empty:
-        return
-
-    top_zones = df_zone['user_timezone'].value_counts().head(5).index
-    df_zone = df_zone[df_zone['user_timezone'].isin(top_zones)]
-
-    if sia:
-        df_zone['compound'] = df_zone['text'].apply(lambda x: sia.polarity_scores(str(x))['compound'])
-    else:
+    if timezone_sentiment.empty:
         return
 
-    timezone_sentiment = df_zone.groupby('user_timezone')['compound'].mean().sort_values()
-
     plt.figure(figsize=(10, 6))
     colors = ['red' if x < 0 else 'green' for x in timezone_sentiment.values]
     timezone_sentiment.plot(kind='barh', color=colors)
@@ -146,51 +129,28 @@ def plot_sentiment_by_timezone(df: pd.DataFrame, candidate_name: str, filepath:
     plt.close()
 
 
-def plot_top_positive_candidates_by_timezone(all_data: dict, filepath: str = "results/images/timezone_comparison.png"):
+def plot_top_positive_candidates_by_timezone(comparison: list,
+                                             filepath: str = "results/images/timezone_comparison.png"):
+    """
+    Srovnání kandidátů v nejčastějších časových zónách, jeden graf na zónu.
+    'comparison' je [(zóna, tabulka podílů), ...] (viz SentimentAggregates.timezone_comparison),
+    počet zón tedy není pevně daný.
+    """
     _ensure_dir(filepath)
     print("Generating timezone comparison chart...")
 
-    df_list = []
-    for candidate, df in all_data.items():
-        temp_df = df.copy()
-        if 'candidate' not in temp_df.columns:
-            temp_df['candidate'] = candidate
-        df_list.append(temp_df)
+    if not comparison: return
 
-    if not df_list: return
-    full_df = pd.concat(df_list, ignore_index=True)
-    full_df.dropna(subset=['user_timezone'], inplace=True)
-    top_zones = full_df['user_timezone'].value_counts().head(5).index.tolist()
-
-    if not sia: return
-
-    full_df['sentiment_label'] = full_df['text'].apply(
-        lambda x: 'Positive' if sia.polarity_scores(str(x))['compound'] > 0.05
-        else ('Negative' if sia.polarity_scores(str(x))['compound'] < -0.05 else 'Neutral')
-    )
-
-    fig, axes = plt.subplots(nrows=1, ncols=5, figsize=(24, 6), sharey=False)
+    fig, axes = plt.subplots(nrows=1, ncols=len(comparison), figsize=(4.8 * len(comparison), 6),
+                             sharey=False, squeeze=False)
+    axes = axes[0]
     colors = ['#2ca02c', '#8c8c8c', '#d62728']
 
-    for i, zone in enumerate(top_zones):
-        ax = axes[i]
-        zone_df = full_df[full_df['user_timezone'] == zone]
-        counts = pd.crosstab(zone_df['candidate'], zone_df['sentiment_label'])
-
-        for col in ['Positive', 'Neutral', 'Negative']:
-            if col not in counts.columns: counts[col] = 0
-
-        counts['Total'] = counts.sum(axis=1)
-        counts = counts[counts['Total'] > 10]
-
-        if counts.empty:
+    for ax, (zone, plot_data) in zip(axes, comparison):
+        if plot_data.empty:
             ax.text(0.5, 0.5, "No Data", ha='center')
             continue
 
-        counts['Pos_Pct'] = counts['Positive'] / counts['Total']
-        top_cands = counts.sort_values(by='Pos_Pct', ascending=True).tail(5)
-        plot_data = top_cands[['Positive', 'Neutral', 'Negative']].div(top_cands['Total'], axis=0)
-
         plot_data.plot(kind='barh', stacked=True, ax=ax, color=colors, legend=False)
         ax.set_title(f"Zone: {zone}")
         ax.set_xlim(0, 1)
@@ -206,77 +166,53 @@ def plot_top_positive_candidates_by_timezone(all_data: dict, filepath: str = "re
 
 # --- NOVÉ FUNKCE (1 & 3) ---
 
-def plot_sentiment_wordclouds(df: pd.DataFrame, candidate_name: str, filepath_prefix: str):
+def wordcloud_frequencies(all_data: CandidateFrames, candidate_name: str, sentiment_name: str,
+                          max_words: int = WORDCLOUD_MAX_WORDS, capacity: int = None) -> dict:
     """
-    (1) Vygeneruje dva Word Cloud obrázky: Pozitivní a Negativní.
+    Frekvence slov {slovo: počet} pro word cloud jednoho kandidáta a sentimentu.
+    Bere se z matice dokument x slovo (už vyčištěné tokeny, max. 'max_words' slov),
+    WordCloud tak nemusí skládat a znovu tokenizovat jeden obří text.
+    S 'capacity' jsou frekvence přibližné z Space-Saving souhrnu (viz CandidateFrames.top_words).
     """
-    if not HAS_WORDCLOUD or not sia:
-        return
-
-    _ensure_dir(filepath_prefix)
+    exclude = STOPWORDS if HAS_WORDCLOUD else None
+    return dict(all_data.top_words(candidate_name, label=sentiment_name, num=max_words, exclude=exclude,
+                                   capacity=capacity))
 
-    # Rozdělení textů
-    pos_text = []
-    neg_text = []
 
-    for text in df['text']:
-        score = sia.polarity_scores(str(text))['compound']
-        # Předpokládáme, že preprocess_text vrátí list tokenů -> spojíme zpět do stringu
-        tokens = preprocess_text(text)
-        clean_text = " ".join(tokens)
-
-        if score > 0.05:
-            pos_text.append(clean_text)
-        elif score < -0.05:
-            neg_text.append(clean_text)
-
-    # Funkce pro vykreslení jednoho mraku
-    def _save_cloud(text_list, sentiment_name, colormap):
-        if not text_list: return
-        full_text = " ".join(text_list)
-        wc = WordCloud(width=800, height=400, background_color='white', colormap=colormap).generate(full_text)
+def plot_sentiment_wordcloud(frequencies: dict, candidate_name: str, sentiment_name: str,
+                             colormap: str, filepath: str):
+    """(1) Word Cloud z předpočítaných frekvencí (viz wordcloud_frequencies)."""
+    if not HAS_WORDCLOUD or not frequencies:
+        return
 
-        plt.figure(figsize=(10, 5))
-        plt.imshow(wc, interpolation='bilinear')
-        plt.axis("off")
-        plt.title(f"{sentiment_name} Word Cloud: {candidate_name}")
-        plt.tight_layout()
-        path = f"{filepath_prefix}_{sentiment_name.lower()}.png"
-        plt.savefig(path)
-        plt.close()
-        print(f"WordCloud saved: {path}")
+    _ensure_dir(filepath)
+    wc = WordCloud(width=800, height=400, background_color='white', colormap=colormap,
+                   max_words=len(frequencies)).generate_from_frequencies(frequencies)
 
-    _save_cloud(pos_text, "Positive", "Greens")
-    _save_cloud(neg_text, "Negative", "Reds")
+    plt.figure(figsize=(10, 5))
+    plt.imshow(wc, interpolation='bilinear')
+    plt.axis("off")
+    plt.title(f"{sentiment_name} Word Cloud: {candidate_name}")
+    plt.tight_layout()
+    plt.savefig(filepath)
+    plt.close()
+    print(f"WordCloud saved: {filepath}")
 
 
-def plot_interaction_heatmap(all_data: dict, filepath: str = "results/images/interaction_heatmap.png"):
+def plot_interaction_heatmap(matrix: pd.DataFrame, filepath: str = "results/images/interaction_heatmap.png"):
     """
     (3) Heatmapa: Kdo mluví o kom?
+    'matrix' = řádky kdo mluví (Source), sloupce o kom (Target), viz SentimentAggregates.interaction_matrix.
+    Zmínky hledá src/mentions.py (příjmení a účty kandidátů jako samostatná slova).
     """
     _ensure_dir(filepath)
     print("Generating interaction heatmap...")
 
-    candidates = list(all_data.keys())
-    # Vyhodíme "No candidate mentioned" ze sloupců (koho zmiňují), ale necháme v řádcích (kdo mluví)
-    targets = [c for c in candidates if c != "No candidate mentioned"]
-
-    # Matice: řádky = Kdo mluví (Source), sloupce = O kom (Target)
-    matrix = pd.DataFrame(0, index=candidates, columns=targets)
-
-    for speaker, df in all_data.items():
-        for text in df['text']:
-            text_lower = str(text).lower()
-            for target in targets:
-                # Jednoduchá detekce: Hledáme příjmení
-                # Trump -> trump, Jeb Bush -> bush, Ben Carson -> carson
-                # Pozor na jména jako "Paul" (Rand Paul), která jsou běžná slova, ale zkusíme to.
-                last_name = target.split()[-1].lower()
-                if last_name in text_lower:
-                    matrix.loc[speaker, target] += 1
+    if matrix.empty:
+        return
 
-    # Normalizace (volitelné) - abychom viděli intenzitu bez ohledu na počet tweetů
-    # Ale absolutní čísla jsou pro heatmapu taky fajn. Necháme absolutní.
+    candidates = list(matrix.index)
+    targets = list(matrix.columns)
 
     # Vykreslení pomocí Matplotlib
     fig, ax = plt.subplots(figsize=(12, 10))
@@ -299,4 +235,92 @@ def plot_interaction_heatmap(all_data: dict, filepath: str = "results/images/int
     plt.colorbar(im, ax=ax)
     plt.savefig(filepath)
     plt.close()
-    print(f"Heatmap saved: {filepath}")
\ No newline at end of file
+    print(f"Heatmap saved: {filepath}")
+
+
+# ---------------------------------------------------
+
+
+# Názvy výstupů (--outputs): grafy kandidáta -> <Jméno>_<výstup>.png, souhrnné grafy -> <výstup>.png
+CANDIDATE_OUTPUTS = ['time', 'words', 'dist', 'timezone', 'wordcloud_positive', 'wordcloud_negative']
+SUMMARY_OUTPUTS = ['sentiment_overview', 'timezone_comparison', 'interaction_heatmap']
+
+# Kreslicí funkce každého výstupu (její kód je součástí otisku výstupu, viz src/pipeline.py)
+OUTPUT_FUNCTIONS = {
+    'time': plot_sentiment_over_time,
+    'words': plot_top_words,
+    'dist': plot_sentiment_distribution,
+    'timezone': plot_sentiment_by_timezone,
+    'wordcloud_positive': plot_sentiment_wordcloud,
+    'wordcloud_negative': plot_sentiment_wordcloud,
+    'sentiment_overview': save_sentiment_bar_chart,
+    'timezone_comparison': plot_top_positive_candidates_by_timezone,
+    'interaction_heatmap': plot_interaction_heatmap,
+}
+
+
+def output_path(output: str, candidate_name: str = None, output_dir: str = "results/images") -> str:
+    """Cesta k obrázku výstupu ('time' + 'Donald Trump' -> results/images/Donald_Trump_time.png)."""
+    if candidate_name is None:
+        return os.path.join(output_dir, f"{output}.png")
+    return os.path.join(output_dir, f"{candidate_name.replace(' ', '_')}_{output}.png")
+
+
+def candidate_charts(aggregates: SentimentAggregates, all_data: CandidateFrames, candidate_name: str,
+                     num_zones: int = 5, topk_capacity: int = None, output_dir: str = "results/images",
+                     outputs: list = None) -> list:
+    """
+    Grafy jednoho kandidáta (ChartSpec pro render_charts) z předpočítaných statistik.
+    Slova bere z all_data.top_words - stačí cokoliv s touhle metodou (CandidateFrames, sloučené shardy).
+    S 'outputs' se připraví (a spočítají) jen vybrané grafy z CANDIDATE_OUTPUTS.
+    """
+    outputs = CANDIDATE_OUTPUTS if outputs is None else outputs
+
+    def path(output):
+        return output_path(output, candidate_name, output_dir)
+
+    charts = []
+    if 'time' in outputs:
+        charts.append(chart(plot_sentiment_over_time, path('time'), aggregates.sentiment_trend(candidate_name),
+                            candidate_name))
+    if 'words' in outputs:
+        charts.append(chart(plot_top_words, path('words'), all_data.top_words(candidate_name, capacity=topk_capacity),
+                            candidate_name))
+    if 'dist' in outputs:
+        charts.append(chart(plot_sentiment_distribution, path('dist'), aggregates.score_distribution(candidate_name),
+                            candidate_name))
+    if 'timezone' in outputs:
+        charts.append(chart(plot_sentiment_by_timezone, path('timezone'),
+                            aggregates.timezone_sentiment(candidate_name, num_zones), candidate_name))
+
+    # Word Clouds (Pozitivní a Negativní)
+    for sentiment_name, colormap in (("Positive", "Greens"), ("Negative", "Reds")):
+        output = f"wordcloud_{sentiment_name.lower()}"
+        if output in outputs:
+            charts.append(chart(plot_sentiment_wordcloud, path(output),
+                                wordcloud_frequencies(all_data, candidate_name, sentiment_name, capacity=topk_capacity),
+                                candidate_name, sentiment_name, colormap))
+    return charts
+
+
+def summary_charts(aggregates: SentimentAggregates, num_zones: int = 5, output_dir: str = "results/images",
+                   outputs: list = None) -> list:
+    """Souhrnné grafy za všechny kandidáty (ChartSpec pro render_charts), s 'outputs' jen vybrané."""
+    outputs = SUMMARY_OUTPUTS if outputs is None else outputs
+
+    charts = []
+    # Souhrnný sloupcový graf (bez tweetů se vynechá, stejně jako grafy níž)
+    if 'sentiment_overview' in outputs and aggregates.label_counts:
+        charts.append(chart(save_sentiment_bar_chart, output_path('sentiment_overview', output_dir=output_dir),
+                            aggregates.sentiment_counts()))
+    # Srovnání podle časových zón (bez údajů o zónách se graf vynechá)
+    if 'timezone_comparison' in outputs:
+        comparison = aggregates.timezone_comparison(num_zones=num_zones)
+        if comparison:
+            charts.append(chart(plot_top_positive_candidates_by_timezone,
+                                output_path('timezone_comparison', output_dir=output_dir), comparison))
+    # Heatmapa interakcí
+    if 'interaction_heatmap' in outputs:
+        charts.append(chart(plot_interaction_heatmap, output_path('interaction_heatmap', output_dir=output_dir),
+                            aggregates.interaction_matrix()))
+    return charts
@@ -0,0 +1,115 @@
+# src/sentiment.py
+
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from src.parallel import map_chunks
+from src.dedup import TextCache
+from src.fast_sentiment import score_batch
+from src.linear_sentiment import CLASSES, get_linear_model, score_batch as linear_score_batch
+
+
+@lru_cache(maxsize=None)
+def get_analyzer():
+    """
+    Sdílená instance VADERu (jediná pro celý proces), vytvoří se až při prvním použití.
+    Lexikon se čte jen z lokálních NLTK dat; když chybí, vrací None.
+    """
+    try:
+        return SentimentIntensityAnalyzer()
+    except LookupError:
+        print("Warning: VADER lexicon not found, sentiment scoring will be skipped.")
+        return None
+
+# Hranice pro rozdělení na pozitivní / negativní / neutrální tweety
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+SCORE_COLUMNS = ['compound', 'pos', 'neg', 'neu']
+LABEL_COLUMN = 'sentiment_label'
+
+# 'vader' = přesný NLTK VADER (tweet po tweetu), 'fast' = vektorizovaná aproximace (src/fast_sentiment.py),
+# 'linear' = natrénovaný klasifikátor na ručních popiscích datasetu (src/linear_sentiment.py)
+SCORERS = ['vader', 'fast', 'linear']
+
+
+def label_sentiment(compound: pd.Series) -> pd.Series:
+    """Převede compound skóre na popisky 'Positive' / 'Negative' / 'Neutral'."""
+    labels = np.select(
+        [compound > POSITIVE_THRESHOLD, compound < NEGATIVE_THRESHOLD],
+        ['Positive', 'Negative'],
+        default='Neutral'
+    )
+    return pd.Series(labels, index=compound.index)
+
+
+def label_probabilities(scores: pd.DataFrame) -> pd.Series:
+    """Popisky podle nejpravděpodobnější třídy (--scorer linear: pos / neg / neu jsou pravděpodobnosti tříd)."""
+    columns = {'Negative': 'neg', 'Neutral': 'neu', 'Positive': 'pos'}
+    proba = scores[[columns[label] for label in CLASSES]].to_numpy()
+    return pd.Series(np.array(CLASSES, dtype=object)[proba.argmax(axis=1)], index=scores.index)
+
+
+def _score_texts(texts: list) -> list:
+    """Ohodnotí seznam textů VADERem (volá se i ve workerech procesního poolu)."""
+    sia = get_analyzer()
+    return [sia.polarity_scores(str(text)) for text in texts]
+
+
+def _score_texts_fast(texts: list) -> list:
+    """Ohodnotí seznam textů rychlým vektorizovaným scorerem (řádky ve stejném pořadí jako SCORE_COLUMNS)."""
+    return score_batch(texts).tolist()
+
+
+def _score_texts_linear(texts: list) -> list:
+    """Ohodnotí seznam textů natrénovaným lineárním klasifikátorem (sloupce jako SCORE_COLUMNS)."""
+    return linear_score_batch(texts).tolist()
+
+
+def score_sentiment(df: pd.DataFrame, workers: int = 1, scorer: str = 'vader',
+                    cache: TextCache = None, quiet: bool = False, executor=None) -> pd.DataFrame:
+    """
+    Krok 3: Ohodnotí každý tweet VADERem právě jednou.
+    Přidá sloupce compound/pos/neg/neu a sentiment_label, ze kterých čte analýza i reporting.
+    S workers > 1 se skórování rozdělí po úsecích řádků mezi více procesů
+    ('executor' = sdílený pool z parallel.worker_pool, ať se pro každý blok nespouští nový).
+    scorer='fast' použije vektorizovanou aproximaci VADERu místo přesného NLTK,
+    scorer='linear' natrénovaný klasifikátor (popisek = nejpravděpodobnější třída, compound = P(pos) - P(neg)).
+    S 'cache' (src/dedup.py) se každý různý text (retweety) ohodnotí jen jednou.
+    S quiet=True se nevypisuje průběh (jen chyby), např. pro malé dávky v živém režimu.
+    """
+    if scorer not in SCORERS:
+        print(f"Error: Unknown scorer '{scorer}', choose one of {SCORERS}.")
+        return pd.DataFrame()
+
+    if scorer == 'linear':
+        try:
+            get_linear_model()
+        except LookupError as e:
+            print(f"Error: {e}")
+            return pd.DataFrame()
+    elif get_analyzer() is None:
+        print("Error: VADER is not available, cannot score tweets.")
+        return pd.DataFrame()
+
+    score_func = {'vader': _score_texts, 'fast': _score_texts_fast, 'linear': _score_texts_linear}[scorer]
+    if not quiet:
+        print(f"Scoring {len(df)} tweets with {'linear model' if scorer == 'linear' else 'VADER'} "
+              f"(scorer: {scorer}, workers: {workers})...")
+
+    texts = df['text'].tolist()
+    scores = pd.DataFrame(
+        (cache.map(score_func, texts, workers, executor) if cache is not None
+         else map_chunks(score_func, texts, workers, executor)),
+        index=df.index,
+        columns=SCORE_COLUMNS
+    )
+
+    df_scored = pd.concat([df, scores], axis=1)
+    df_scored[LABEL_COLUMN] = (label_probabilities(df_scored) if scorer == 'linear'
+                               else label_sentiment(df_scored['compound']))
+
+    if not quiet:
+        print("Scoring done.")
+    return df_scored
@@ -0,0 +1,206 @@
+# src/shards.py
+
+import argparse
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from src.aggregates import SentimentAggregates
+from src.data_loader import DEFAULT_CHUNK_SIZE, iter_processed_chunks, read_candidate_names
+from src.render import render_charts
+from src.sentiment import SCORERS
+
+# Zvýšit při změně formátu dílčích výsledků (staré soubory pak merge odmítne)
+PARTIAL_VERSION = 3
+DEFAULT_PARTIAL_DIR = 'results/partials'
+# Po kolika blocích se jejich dílčí výsledky sečtou do průběžného součtu (paměť neroste s počtem bloků)
+SHARD_COMBINE_BATCH = 64
+
+
+class ShardSummary:
+    """
+    Dílčí výsledek jednoho shardu (skupiny CSV souborů) - všechno, z čeho se kreslí grafy,
+    bez samotných tweetů: SentimentAggregates (popisky, 10min okna, kostka zón, zmínky,
+    histogram skóre, počty slov s pozicí prvního výskytu) + seznam souborů a počet tweetů.
+    Shardy se sčítají (merge) v pořadí souborů, výsledek je stejný jako při zpracování všech souborů za sebou,
+    pokud všechny shardy hledaly zmínky stejných kandidátů (viz 'candidate_names' u map_shard).
+    Top slova umí stejně jako CandidateFrames.top_words, takže jde rovnou kreslit stejné grafy.
+    """
+
+    def __init__(self):
+        self.files = []
+        self.tweets = 0
+        self.aggregates = SentimentAggregates()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'ShardSummary':
+        """Dílčí výsledek ze zpracovaného bloku (sloupce candidate, sentiment_label, tokens...)."""
+        summary = cls()
+        summary.tweets = len(df)
+        summary.aggregates = SentimentAggregates.from_frame(df)
+        return summary
+
+    def merge(self, other: 'ShardSummary') -> 'ShardSummary':
+        """Vrátí nový dílčí výsledek = self + other (other jako by následoval po self)."""
+        return ShardSummary.combine([self, other])
+
+    @classmethod
+    def combine(cls, parts: list) -> 'ShardSummary':
+        """Sečte libovolný počet dílčích výsledků najednou (v daném pořadí)."""
+        merged = cls()
+        for part in parts:
+            merged.files += part.files
+            merged.tweets += part.tweets
+        merged.aggregates = SentimentAggregates.combine([part.aggregates for part in parts])
+        return merged
+
+    def top_words(self, candidate_name: str = None, label: str = None, num: int = 15,
+                  exclude=None, capacity: int = None) -> list:
+        """
+        Nejčastější slova [(slovo, počet), ...] kandidáta (volitelně jen jednoho sentimentu),
+        viz SentimentAggregates.top_words. Počty ve shardech jsou přesné, 'capacity' je tu jen kvůli stejnému rozhraní.
+        """
+        return self.aggregates.top_words(candidate_name, label, num, exclude)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump({'version': PARTIAL_VERSION, 'summary': self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path: str) -> 'ShardSummary':
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('version') != PARTIAL_VERSION:
+            raise ValueError(f"'{path}' has partial format {data.get('version')}, expected {PARTIAL_VERSION}")
+        return data['summary']
+
+
+def shard_candidate_names(files: list) -> list:
+    """Kandidáti ze všech souborů (v pořadí prvního výskytu), jedna sada pro hledání zmínek ve všech shardech."""
+    return list(dict.fromkeys(name for filepath in files for name in read_candidate_names(filepath)))
+
+
+def map_shard(files: list, output: str, workers: int = 1, scorer: str = 'vader', tokenizer: str = 'nltk',
+              chunksize: int = DEFAULT_CHUNK_SIZE, candidate_names: list = None) -> str:
+    """
+    Krok "map": zpracuje soubory shardu po blocích (načtení, filtr, skóre, tokeny, zmínky)
+    a uloží jen jejich dílčí statistiky do 'output'. Tweety se po bloku zahodí, statistiky bloků se
+    sečtou vždy po SHARD_COMBINE_BATCH do průběžného součtu.
+    Zmínky se hledají pro 'candidate_names' + kandidáty ze všech souborů shardu. Aby byl výsledek
+    po sloučení shardů stejný jako jeden běh přes všechny soubory, mají všechny shardy dostat
+    stejné 'candidate_names' (kandidáty ze všech souborů, viz shard_candidate_names / run_local).
+    """
+    candidate_names = list(dict.fromkeys(list(candidate_names or []) + shard_candidate_names(files)))
+    parts = []
+    for filepath in files:
+        for chunk in iter_processed_chunks(filepath, workers, scorer, chunksize, tokenizer=tokenizer,
+                                           candidate_names=candidate_names):
+            parts.append(ShardSummary.from_frame(chunk))
+            if len(parts) >= SHARD_COMBINE_BATCH:
+                parts = [ShardSummary.combine(parts)]
+    summary = ShardSummary.combine(parts)
+    summary.files = list(files)
+
+    summary.save(output)
+    print(f"Partial saved: {output} ({len(files)} files, {summary.tweets} tweets, "
+          f"{os.path.getsize(output) / 2 ** 20:.1f} MB)")
+    return output
+
+
+def merge_partials(paths: list, output_dir: str = "results/images", render_workers: int = 1,
+                   num_zones: int = 5, skip_unchanged: bool = False) -> ShardSummary:
+    """
+    Krok "merge": sečte dílčí výsledky (v zadaném pořadí) a vykreslí stejné grafy jako main.py.
+    Textová analýza (kolokace, kontexty) potřebuje celé tweety, ta se tady nedělá.
+    """
+    from src.reporting import candidate_charts, summary_charts
+
+    summary = ShardSummary.combine([ShardSummary.load(path) for path in paths])
+    print(f"Merged {len(paths)} partials: {len(summary.files)} files, {summary.tweets} tweets.")
+
+    aggregates = summary.aggregates
+    charts = []
+    for candidate_name, counts in aggregates.label_counts.items():
+        print(f"  > {candidate_name}: Found {counts.get('Positive', 0)} positive, {counts.get('Negative', 0)} "
+              f"negative, and {counts.get('Neutral', 0)} neutral tweets.")
+        if sum(counts.values()) > 10:
+            charts += candidate_charts(aggregates, summary, candidate_name, num_zones, output_dir=output_dir)
+    charts += summary_charts(aggregates, num_zones, output_dir=output_dir)
+
+    render_charts(charts, workers=render_workers, skip_unchanged=skip_unchanged, output_dir=output_dir)
+    return summary
+
+
+def _map_shard_args(args: tuple) -> str:
+    return map_shard(*args)
+
+
+def run_local(files: list, num_shards: int, partial_dir: str = DEFAULT_PARTIAL_DIR, scorer: str = 'vader',
+              tokenizer: str = 'nltk', chunksize: int = DEFAULT_CHUNK_SIZE, output_dir: str = "results/images",
+              num_zones: int = 5) -> ShardSummary:
+    """
+    Vyzkoušení map/merge na jednom stroji: soubory se rozdělí do 'num_shards' souvislých skupin,
+    každá se zpracuje ve vlastním procesu (jako na samostatném uzlu) a výsledky se sloučí.
+    Kandidáti pro hledání zmínek se zjistí jednou ze všech souborů a dostane je každý shard.
+    """
+    num_shards = max(1, min(num_shards, len(files)))
+    groups = [list(group) for group in np.array_split(np.array(files, dtype=object), num_shards)]
+    candidate_names = shard_candidate_names(files)
+    tasks = [(group, os.path.join(partial_dir, f"shard_{i:03d}.pkl"), 1, scorer, tokenizer, chunksize,
+              candidate_names)
+             for i, group in enumerate(groups)]
+
+    with ProcessPoolExecutor(max_workers=num_shards) as executor:
+        paths = list(executor.map(_map_shard_args, tasks))
+    return merge_partials(paths, output_dir=output_dir, render_workers=num_shards, num_zones=num_zones)
+
+
+# ---- Spuštění map / merge ----
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Map/merge processing of many tweet CSV files")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    map_parser = commands.add_parser('map', help="Process CSV files into one partial result file")
+    map_parser.add_argument('files', nargs='+', help="CSV files of this shard")
+    map_parser.add_argument('--output', required=True, help="Partial result file, e.g. results/partials/node1.pkl")
+    map_parser.add_argument('--workers', type=int, default=1, help="Processes for scoring and tokenization")
+    map_parser.add_argument('--mention-candidates', nargs='+', metavar='NAME', default=None,
+                            help="Candidates of all shards to look for in mentions (the same list on every node "
+                                 "makes the merged heatmap match a single run over all files)")
+
+    merge_parser = commands.add_parser('merge', help="Merge partial results and render the reports")
+    merge_parser.add_argument('partials', nargs='+', help="Partial result files (merged in this order)")
+    merge_parser.add_argument('--render-workers', type=int, default=1, help="Processes for rendering charts")
+    merge_parser.add_argument('--skip-unchanged', action='store_true', help="Don't re-render unchanged charts")
+
+    local_parser = commands.add_parser('local', help="Map shards in parallel processes on this machine, then merge")
+    local_parser.add_argument('files', nargs='+', help="CSV files (split into contiguous shards)")
+    local_parser.add_argument('--shards', type=int, default=2, help="Number of shards / processes (default: 2)")
+    local_parser.add_argument('--partial-dir', default=DEFAULT_PARTIAL_DIR,
+                              help=f"Where to write the partial results (default: {DEFAULT_PARTIAL_DIR})")
+
+    for sub_parser in (map_parser, local_parser):
+        sub_parser.add_argument('--scorer', choices=SCORERS, default='vader', help="Sentiment scorer")
+        sub_parser.add_argument('--tokenizer', choices=['nltk', 'fast'], default='nltk', help="Tokenizer")
+        sub_parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNK_SIZE, help="CSV rows per chunk")
+    for sub_parser in (merge_parser, local_parser):
+        sub_parser.add_argument('--output-dir', default='results/images', help="Where to save the charts")
+        sub_parser.add_argument('--zones', type=int, default=5, help="Timezones in the timezone charts")
+    args = parser.parse_args()
+
+    from src.preprocessing import ensure_nltk_data
+    if args.command != 'merge' and not ensure_nltk_data():
+        raise SystemExit(1)
+
+    if args.command == 'map':
+        map_shard(args.files, args.output, workers=args.workers, scorer=args.scorer,
+                  tokenizer=args.tokenizer, chunksize=args.chunksize, candidate_names=args.mention_candidates)
+    elif args.command == 'merge':
+        merge_partials(args.partials, output_dir=args.output_dir, render_workers=args.render_workers,
+                       num_zones=args.zones, skip_unchanged=args.skip_unchanged)
+    else:
+        run_local(args.files, args.shards, partial_dir=args.partial_dir, scorer=args.scorer,
+                  tokenizer=args.tokenizer, chunksize=args.chunksize, output_dir=args.output_dir,
+                  num_zones=args.zones)
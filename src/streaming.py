@@ -0,0 +1,461 @@
+# src/streaming.py
+
+import asyncio
+import contextlib
+import csv
+import json
+import os
+import stat
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from src.data_loader import COLUMN_DTYPES, filter_data
+from src.sentiment import score_sentiment, LABEL_COLUMN
+from src.preprocessing import tokenize_data, TOKENS_COLUMN
+from src.dedup import TextCache
+from src.aggregates import TIME_BUCKET
+from src.timestamps import MISSING_TIME, parse_timestamps, to_datetime_index
+
+# Kolik záznamů může čekat ve frontě; když je plná, čtení ze zdroje se pozastaví (nic se nezahodí)
+MAX_QUEUE_SIZE = 10_000
+
+# Posuvné okno se posouvá po minutových slotech, graf v čase má 10min okna jako dávkový běh
+WINDOW_SLOT = '1min'
+MAX_HISTORY_BUCKETS = 1000
+
+DEFAULT_OUTPUT_DIR = 'results/images/live'
+
+# Značka konce vstupu ve frontě (konec stdin / souboru bez sledování)
+_END = object()
+
+
+class _Totals:
+    """Součty za jeden slot nebo celé okno: počet, součet compound, popisky a slova."""
+
+    __slots__ = ('count', 'compound_sum', 'labels', 'words')
+
+    def __init__(self):
+        self.count = 0
+        self.compound_sum = 0.0
+        self.labels = Counter()
+        self.words = Counter()
+
+    def add(self, compound: float, label: str, tokens: list):
+        self.count += 1
+        self.compound_sum += compound
+        self.labels[label] += 1
+        self.words.update(tokens)
+
+    def subtract(self, other: '_Totals'):
+        """Odečte jiné součty; prochází jen jejich položky, ne celé okno."""
+        self.count -= other.count
+        self.compound_sum -= other.compound_sum
+        for counter, removed in ((self.labels, other.labels), (self.words, other.words)):
+            for key, count in removed.items():
+                remaining = counter[key] - count
+                if remaining > 0:
+                    counter[key] = remaining
+                else:
+                    del counter[key]
+
+
+class RollingWindow:
+    """
+    Posuvné okno jednoho kandidáta za posledních 'window' (např. '15min') podle času tweetu.
+    Přidání tweetu i posun okna je O(1) (amortizovaně): okno drží minutové sloty a průběžné
+    součty, při posunu se odečtou jen sloty, které z okna vypadly.
+    Vedle okna se sčítají 10min koše pro graf vývoje sentimentu (trend()).
+    """
+
+    def __init__(self, window: str = '15min', max_history: int = MAX_HISTORY_BUCKETS):
+        self.slot_ns = pd.Timedelta(WINDOW_SLOT).value
+        self.window_ns = max(pd.Timedelta(window).value, self.slot_ns)
+        self.bucket_ns = pd.Timedelta(TIME_BUCKET).value
+        self.max_history = max_history
+        self.totals = _Totals()
+        self.latest = None
+        self._slots = {}
+        self._history = {}
+
+    def _first_slot(self, latest: int) -> int:
+        """Začátek nejstaršího slotu, který ještě patří do okna končícího slotem 'latest'."""
+        return latest - self.window_ns + self.slot_ns
+
+    def advance(self, timestamp: int):
+        """Posune konec okna na 'timestamp' (ns) a odečte sloty, které z okna vypadly."""
+        slot = timestamp - timestamp % self.slot_ns
+        if self.latest is not None and slot <= self.latest:
+            return
+        if self.latest is None or slot - self.latest >= self.window_ns:
+            # Okno se posunulo o celou délku, nic z něj nezbylo
+            self._slots.clear()
+            self.totals = _Totals()
+        else:
+            for start in range(self._first_slot(self.latest), self._first_slot(slot), self.slot_ns):
+                expired = self._slots.pop(start, None)
+                if expired is not None:
+                    self.totals.subtract(expired)
+        self.latest = slot
+
+    def add(self, timestamp: int, compound: float, label: str, tokens: list):
+        """Přidá jeden tweet (čas v int64 UTC ns, jako sloupec tweet_created)."""
+        bucket = timestamp - timestamp % self.bucket_ns
+        stats = self._history.get(bucket)
+        if stats is None:
+            stats = self._history[bucket] = [0.0, 0]
+            if len(self._history) > self.max_history:
+                del self._history[min(self._history)]
+        stats[0] += compound
+        stats[1] += 1
+
+        self.advance(timestamp)
+        slot = timestamp - timestamp % self.slot_ns
+        if slot < self._first_slot(self.latest):
+            return  # tweet přišel pozdě, do okna už nepatří (v trendu je)
+        slot_totals = self._slots.get(slot)
+        if slot_totals is None:
+            slot_totals = self._slots[slot] = _Totals()
+        slot_totals.add(compound, label, tokens)
+        self.totals.add(compound, label, tokens)
+
+    def mean_compound(self) -> float:
+        return self.totals.compound_sum / self.totals.count if self.totals.count else float('nan')
+
+    def trend(self) -> pd.Series:
+        """Průměrné compound skóre v 10min oknech - stejná řada jako SentimentAggregates.sentiment_trend."""
+        if not self._history:
+            return pd.Series(dtype=float)
+        buckets = sorted(self._history)
+        trend = pd.Series([self._history[b][0] / self._history[b][1] for b in buckets], name='compound')
+        trend.index = to_datetime_index(buckets, name='tweet_created')
+        return trend.asfreq(TIME_BUCKET)
+
+
+class LiveSentiment:
+    """
+    Stav streamovacího režimu: ohodnotí a tokenizuje dávky záznamů (se sdílenou TextCache,
+    retweety se počítají jen jednou) a každý tweet přičte do posuvného okna jeho kandidáta.
+    """
+
+    def __init__(self, scorer: str = 'vader', tokenizer: str = 'nltk', window: str = '15min'):
+        self.scorer = scorer
+        self.tokenizer = tokenizer
+        self.window = window
+        self.windows = {}
+        self.tweets = 0
+        self.score_cache = TextCache()
+        self.token_cache = TextCache()
+
+    def process_batch(self, records: list) -> int:
+        """Zpracuje jednu dávku záznamů (slovníky se sloupci CSV). Vrací počet přidaných tweetů."""
+        arrival = time.time_ns()
+        df = pd.DataFrame.from_records(records, columns=list(COLUMN_DTYPES))
+        df = df.where(df != '', None)  # prázdná buňka CSV = chybějící hodnota, stejně jako v read_csv
+        df['tweet_created'] = parse_timestamps(df['tweet_created'].astype(object))
+
+        # Dávkové funkce vypisují průběh, u malých dávek by to zahltilo konzoli (chyby se vypíšou i tak)
+        df = filter_data(df, quiet=True)
+        if df.empty:
+            return 0
+        df = score_sentiment(df, 1, self.scorer, self.score_cache, quiet=True)
+        if df.empty:
+            return 0
+        df = tokenize_data(df, 1, self.tokenizer, self.token_cache, quiet=True)
+        if df.empty:
+            return 0
+
+        timestamps = df['tweet_created'].to_numpy(copy=True)
+        timestamps[timestamps == MISSING_TIME] = arrival  # bez času tweetu bereme čas příchodu
+        for candidate_name, timestamp, compound, label, tokens in zip(
+                df['candidate'], timestamps, df['compound'], df[LABEL_COLUMN], df[TOKENS_COLUMN]):
+            window = self.windows.get(candidate_name)
+            if window is None:
+                window = self.windows[candidate_name] = RollingWindow(self.window)
+            window.add(int(timestamp), float(compound), label, tokens)
+
+        # Okna všech kandidátů končí v nejnovějším čase, i když o někom zrovna nikdo nepíše
+        latest = max(window.latest for window in self.windows.values())
+        for window in self.windows.values():
+            window.advance(latest)
+
+        self.tweets += len(df)
+        return len(df)
+
+    def snapshot(self) -> pd.DataFrame:
+        """Tabulka kandidátů za aktuální okno: počet tweetů, průměrné compound, podíly popisků, top slova."""
+        rows = []
+        for candidate_name, window in self.windows.items():
+            totals = window.totals
+            if not totals.count:
+                continue
+            rows.append({
+                'candidate': candidate_name,
+                'tweets': totals.count,
+                'mean_compound': round(window.mean_compound(), 3),
+                **{label: round(totals.labels[label] / totals.count, 2)
+                   for label in ('Positive', 'Negative', 'Neutral')},
+                'top_words': ', '.join(word for word, _ in totals.words.most_common(3)),
+            })
+        if not rows:
+            return pd.DataFrame()
+        return pd.DataFrame(rows).sort_values('tweets', ascending=False, kind='stable').reset_index(drop=True)
+
+    def render(self, output_dir: str = DEFAULT_OUTPUT_DIR) -> list:
+        """Překreslí graf vývoje sentimentu pro každého kandidáta (stejná funkce jako v dávkovém běhu)."""
+        from src.reporting import plot_sentiment_over_time
+
+        paths = []
+        for candidate_name, window in self.windows.items():
+            filepath = os.path.join(output_dir, f"{candidate_name.replace(' ', '_')}_time.png")
+            plot_sentiment_over_time(window.trend(), candidate_name, filepath=filepath)
+            paths.append(filepath)
+        return paths
+
+
+class _RecordParser:
+    """
+    Převádí řádky vstupu na záznamy. Řádek začínající '{' je JSON objekt,
+    jinak CSV: první řádek je hlavička, záznam s novým řádkem v uvozovkách se skládá z více řádků.
+    """
+
+    def __init__(self):
+        self.header = None
+        self._pending = ''
+
+    def feed(self, line: str):
+        """Vrátí záznam (slovník), nebo None, pokud záznam ještě není celý / šlo o hlavičku."""
+        if not self._pending and line.lstrip().startswith('{'):
+            try:
+                return json.loads(line)
+            except ValueError:
+                print(f"Warning: Skipping invalid JSON record: {line[:80]!r}")
+                return None
+
+        self._pending += line
+        if self._pending.count('"') % 2:
+            return None  # uvozovky nejsou uzavřené, záznam pokračuje na dalším řádku
+        text, self._pending = self._pending, ''
+        if not text.strip():
+            return None
+        values = next(csv.reader([text.rstrip('\r\n')]))
+        if self.header is None:
+            self.header = values
+            return None
+        return dict(zip(self.header, values))
+
+
+def _decode(line: bytes) -> str:
+    """Řádek vstupu na text: UTF-8 (JSON), jinak latin-1 jako CSV z data/."""
+    try:
+        return line.decode('utf-8')
+    except UnicodeDecodeError:
+        return line.decode('latin-1')
+
+
+async def _read_stream(reader: asyncio.StreamReader, queue: asyncio.Queue):
+    """Čte řádky ze streamu (stdin / socket) do fronty; při plné frontě čeká = backpressure."""
+    await _read_lines(reader.readline, queue)
+
+
+async def _read_lines(readline, queue: asyncio.Queue):
+    """Čte řádky (await readline(), prázdné bajty = konec) do fronty záznamů."""
+    parser = _RecordParser()
+    while True:
+        line = await readline()
+        if not line:
+            return
+        record = parser.feed(_decode(line))
+        if record is not None:
+            await queue.put(record)
+
+
+async def _read_stdin(queue: asyncio.Queue):
+    """
+    Stdin jako roura / socket / terminál čte event loop přímo. Přesměrovaný soubor (< tweets.csv)
+    connect_read_pipe nepřijme, ten se čte po řádcích ve vlákně (run_in_executor).
+    """
+    loop = asyncio.get_running_loop()
+    mode = os.fstat(sys.stdin.fileno()).st_mode
+    if stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode) or stat.S_ISCHR(mode):
+        reader = asyncio.StreamReader(limit=2 ** 20)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        await _read_stream(reader, queue)
+    else:
+        await _read_lines(lambda: loop.run_in_executor(None, sys.stdin.buffer.readline), queue)
+    await queue.put(_END)
+
+
+async def _serve_unix_socket(path: str, queue: asyncio.Queue):
+    """Unixový socket: každé připojení posílá řádky záznamů (vlastní CSV hlavička pro každé připojení)."""
+    async def handle(reader, writer):
+        try:
+            await _read_stream(reader, queue)
+        finally:
+            writer.close()
+
+    if os.path.exists(path):
+        os.remove(path)
+    server = await asyncio.start_unix_server(handle, path=path, limit=2 ** 20)
+    print(f"Listening on unix socket: {path}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+async def _tail_file(path: str, queue: asyncio.Queue, follow: bool = True, poll_interval: float = 0.5):
+    """
+    Čte soubor od začátku a pak sleduje nově připsané řádky (jako tail -f).
+    Rozepsaný poslední řádek se zpracuje, až bude celý. Zkrácený soubor se čte znovu od začátku.
+    """
+    parser = _RecordParser()
+    position = 0
+    partial = b''
+    while True:
+        if not os.path.exists(path) or os.path.getsize(path) < position:
+            if position:
+                print(f"Warning: '{path}' was truncated or removed, reading it again from the start.")
+            position, partial, parser = 0, b'', _RecordParser()
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                f.seek(position)
+                for line in f:
+                    position += len(line)
+                    if not line.endswith(b'\n'):
+                        partial += line
+                        continue
+                    record = parser.feed(_decode(partial + line))
+                    partial = b''
+                    if record is not None:
+                        await queue.put(record)
+        if not follow:
+            await queue.put(_END)
+            return
+        await asyncio.sleep(poll_interval)
+
+
+async def _produce(source: str, queue: asyncio.Queue, follow: bool):
+    """'-' = stdin, 'unix:/cesta' = unixový socket, jinak cesta k souboru, který se sleduje."""
+    try:
+        if source == '-':
+            await _read_stdin(queue)
+        elif source.startswith('unix:'):
+            await _serve_unix_socket(source[len('unix:'):], queue)
+        else:
+            await _tail_file(source, queue, follow=follow)
+    except (OSError, ValueError) as e:
+        print(f"Error: Stream source '{source}' failed ({e}).")
+        await queue.put(_END)
+
+
+async def _next_batch(queue: asyncio.Queue, batch_size: int, max_delay: float, idle_timeout: float):
+    """
+    Počká na první záznam (nejdéle 'idle_timeout' s, jinak None) a pak přibírá další,
+    dokud dávka není plná nebo neuplyne 'max_delay' s. Vrací (záznamy, konec_vstupu).
+    """
+    try:
+        first = await asyncio.wait_for(queue.get(), idle_timeout)
+    except asyncio.TimeoutError:
+        return None, True
+    if first is _END:
+        return [], True
+
+    batch = [first]
+    deadline = asyncio.get_running_loop().time() + max_delay
+    while len(batch) < batch_size:
+        timeout = deadline - asyncio.get_running_loop().time()
+        try:
+            record = queue.get_nowait() if queue.qsize() else await asyncio.wait_for(queue.get(), max(timeout, 0))
+        except asyncio.TimeoutError:
+            break
+        if record is _END:
+            return batch, True
+        batch.append(record)
+    return batch, False
+
+
+async def stream(source: str, live: LiveSentiment, batch_size: int = 500, max_delay: float = 1.0,
+                 idle_timeout: float = None, follow: bool = True, report_every: float = 5.0,
+                 render_every: float = 30.0, output_dir: str = DEFAULT_OUTPUT_DIR):
+    """
+    Hlavní smyčka streamování: zdroj plní omezenou frontu, tahle smyčka z ní bere mikro-dávky.
+    Skórování běží v samostatném vlákně, takže se mezitím dál čte vstup; když skórování nestíhá,
+    fronta se zaplní a čtení počká (backpressure) - žádný záznam se nezahodí.
+    Konec: konec stdin / souboru (follow=False), 'idle_timeout' s bez dat, nebo Ctrl+C.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=MAX_QUEUE_SIZE)
+    producer = asyncio.ensure_future(_produce(source, queue, follow))
+    # Jediné vlákno pro skórování i kreslení (matplotlib není thread-safe)
+    executor = ThreadPoolExecutor(max_workers=1)
+    last_report = last_render = loop.time()
+
+    try:
+        while True:
+            batch, finished = await _next_batch(queue, batch_size, max_delay, idle_timeout)
+            if batch is None:
+                print(f"No new records for {idle_timeout} s, stopping.")
+                break
+            if batch:
+                added = await loop.run_in_executor(executor, live.process_batch, batch)
+                print(f"Batch: {len(batch)} records, {added} tweets scored "
+                      f"(total: {live.tweets}, queued: {queue.qsize()})")
+
+            if finished:
+                break
+
+            now = loop.time()
+            if now - last_report >= report_every:
+                _print_snapshot(live)
+                last_report = now
+            if now - last_render >= render_every:
+                await loop.run_in_executor(executor, live.render, output_dir)
+                last_render = now
+    finally:
+        producer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await producer
+        await loop.run_in_executor(executor, live.render, output_dir)
+        executor.shutdown()
+
+
+def _print_snapshot(live: LiveSentiment):
+    snapshot = live.snapshot()
+    if snapshot.empty:
+        return
+    print(f"\n--- Last {live.window} (score cache hit rate {live.score_cache.hit_rate():.1%}) ---")
+    print(snapshot.to_string(index=False))
+
+
+def run_stream(source: str, scorer: str = 'vader', tokenizer: str = 'nltk', window: str = '15min',
+               batch_size: int = 500, idle_timeout: float = None, follow: bool = True,
+               output_dir: str = DEFAULT_OUTPUT_DIR) -> LiveSentiment:
+    """Spustí streamovací režim (viz stream) a vrátí jeho konečný stav."""
+    live = LiveSentiment(scorer=scorer, tokenizer=tokenizer, window=window)
+    print(f"Streaming from: {'stdin' if source == '-' else source} "
+          f"(window: {window}, batch size: {batch_size}, scorer: {scorer}, tokenizer: {tokenizer})")
+    try:
+        asyncio.run(stream(source, live, batch_size=batch_size, idle_timeout=idle_timeout,
+                           follow=follow, output_dir=output_dir))
+    except KeyboardInterrupt:
+        print("\nStreaming stopped.")
+    _print_snapshot(live)
+    print(f"\nStreaming done: {live.tweets} tweets. Live charts are in '{output_dir}/'.")
+    return live
+
+
+# ---- Kód pro testování ----
+if __name__ == "__main__":
+    print("--- Testing streaming.py (replaying data/Sentiment.csv) ---")
+
+    from src.preprocessing import ensure_nltk_data
+    if not ensure_nltk_data():
+        raise SystemExit(1)
+
+    run_stream('data/Sentiment.csv', window='30min', follow=False)
+
+    print("\n--- Test complete ---")
@@ -0,0 +1,67 @@
+# src/synthetic_data.py
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+DEFAULT_OUTPUT_DIR = 'data/synthetic'
+
+
+def _mix_texts(first: np.ndarray, second: np.ndarray) -> list:
+    """Nový text = první polovina slov jednoho tweetu + druhá polovina slov jiného tweetu."""
+    mixed = []
+    for text_a, text_b in zip(first, second):
+        words_a, words_b = text_a.split(' '), text_b.split(' ')
+        mixed.append(' '.join(words_a[:len(words_a) // 2] + words_b[len(words_b) // 2:]))
+    return mixed
+
+
+def generate_csv(scale: int, source: str = 'data/Sentiment.csv', output: str = None, seed: int = 42) -> str:
+    """
+    Vytvoří syntetické CSV se stejnými sloupci jako 'source', 'scale'-krát delší.
+    Řádky se losují z originálu (kandidát, čas, časová zóna... zůstávají realistické),
+    text se skládá ze dvou náhodných tweetů, aby nevznikaly jen přesné kopie.
+    Zapisuje se po blocích velikosti originálu, paměť tedy neroste se 'scale'.
+    Vrací cestu k vytvořenému souboru.
+    """
+    if output is None:
+        base_name = os.path.splitext(os.path.basename(source))[0]
+        output = os.path.join(DEFAULT_OUTPUT_DIR, f"{base_name}_x{scale}.csv")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+
+    # Všechno jako text, prázdné buňky zůstanou prázdné -> stejný formát jako originál
+    original = pd.read_csv(source, encoding='latin-1', dtype=str, keep_default_na=False)
+    num_rows = len(original)
+    texts = original['text'].to_numpy()
+    rng = np.random.default_rng(seed)
+
+    print(f"Generating {scale}x {source} ({scale * num_rows} rows) -> {output}...")
+    for block in range(scale):
+        rows = rng.integers(0, num_rows, size=num_rows)
+        df_block = original.iloc[rows].copy()
+        df_block['text'] = _mix_texts(texts[rows], texts[rng.integers(0, num_rows, size=num_rows)])
+
+        first_id = block * num_rows + 1
+        df_block['id'] = np.arange(first_id, first_id + num_rows).astype(str)
+        if 'tweet_id' in df_block.columns:
+            df_block['tweet_id'] = (np.int64(629697200650592256) + np.arange(first_id, first_id + num_rows)).astype(str)
+
+        df_block.to_csv(output, mode='w' if block == 0 else 'a', header=block == 0,
+                        index=False, encoding='latin-1')
+
+    print(f"Synthetic data saved: {output} ({os.path.getsize(output) / 2 ** 20:.1f} MB)")
+    return output
+
+
+# ---- Kód pro testování ----
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic tweet CSVs with the Sentiment.csv schema")
+    parser.add_argument('--source', default='data/Sentiment.csv', help="Original CSV (default: data/Sentiment.csv)")
+    parser.add_argument('--scales', type=int, nargs='+', default=[10],
+                        help="How many times bigger than the original, e.g. --scales 10 100 1000 (default: 10)")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed (default: 42)")
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        generate_csv(scale, source=args.source, seed=args.seed)
@@ -0,0 +1,35 @@
+# src/timestamps.py
+
+import numpy as np
+import pandas as pd
+
+# Formát sloupce tweet_created v CSV, např. "2015-08-07 09:54:46 -0700"
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S %z'
+
+# Čas se ukládá jako int64 = nanosekundy od 1970-01-01 UTC, chybějící / nečitelný čas = tahle hodnota
+MISSING_TIME = np.iinfo(np.int64).min
+
+# Časy v datech jsou -0700 (debata 6. 8. 2015, Cleveland / PDT), grafy je ukazují v tomhle pásmu
+DISPLAY_TIMEZONE = 'America/Los_Angeles'
+
+
+def parse_timestamps(values: pd.Series) -> pd.Series:
+    """
+    Převede texty časů na int64 UTC nanosekundy (jednou při načtení, s explicitním formátem,
+    pandas tak nemusí formát odhadovat pro každý řádek). Nečitelné hodnoty -> MISSING_TIME.
+    """
+    parsed = pd.to_datetime(values, format=TIMESTAMP_FORMAT, errors='coerce', utc=True)
+    nanoseconds = parsed.dt.tz_convert(None).astype('datetime64[ns]').to_numpy().view(np.int64)
+    return pd.Series(nanoseconds, index=values.index, name=values.name)
+
+
+def floor_timestamps(nanoseconds: np.ndarray, freq: str) -> np.ndarray:
+    """Zaokrouhlí int64 časy dolů na začátek okna 'freq' (např. '10min'), čistě v NumPy."""
+    step = pd.Timedelta(freq).value
+    return nanoseconds - nanoseconds % step
+
+
+def to_datetime_index(nanoseconds, name: str = None) -> pd.DatetimeIndex:
+    """int64 UTC nanosekundy -> DatetimeIndex v pásmu DISPLAY_TIMEZONE (pro osy grafů)."""
+    index = pd.DatetimeIndex(np.asarray(nanoseconds, dtype='datetime64[ns]'), name=name)
+    return index.tz_localize('UTC').tz_convert(DISPLAY_TIMEZONE)
@@ -0,0 +1,227 @@
+# src/topic_stats.py
+
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+_SMALL = 1e-20  # stejná ochrana proti dělení nulou / log(0) jako v nltk.metrics.association
+
+MEASURES = ['likelihood_ratio', 'pmi']
+
+# Jeden řádek kontextu (stejné části jako nltk ConcordanceLine)
+ConcordanceLine = namedtuple('ConcordanceLine', ['left', 'query', 'right', 'offset', 'line'])
+
+
+@lru_cache(maxsize=None)
+def _english_stop_words() -> frozenset:
+    """Anglické stopwords z NLTK (nltk.Text.collocations ignoruje právě tyhle)."""
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+
+def _likelihood_ratio(n_ii, n_ix, n_xi, n_xx):
+    """Log-likelihood ratio (Manning a Schütze 5.3.4), pro všechny bigramy najednou."""
+    n_oi = n_xi - n_ii
+    n_io = n_ix - n_ii
+    cont = (n_ii, n_oi, n_io, n_xx - n_ii - n_oi - n_io)
+    total = cont[0] + cont[1] + cont[2] + cont[3]
+
+    score = 0.0
+    for i in range(4):
+        expected = (cont[i] + cont[i ^ 1]) * (cont[i] + cont[i ^ 2]) / total
+        score = score + cont[i] * np.log(cont[i] / (expected + _SMALL) + _SMALL)
+    return 2 * score
+
+
+def _pmi(n_ii, n_ix, n_xi, n_xx):
+    """Pointwise mutual information (Manning a Schütze 5.4)."""
+    return np.log2(n_ii * n_xx) - np.log2(n_ix * n_xi)
+
+
+_MEASURE_FUNCTIONS = {
+    'likelihood_ratio': _likelihood_ratio,
+    'pmi': _pmi,
+}
+
+
+class TopicStats:
+    """
+    Frekvence, kolokace a shody (concordance) pro jeden seznam tokenů.
+    Náhrada za nltk.FreqDist + nltk.Text se stejnými výsledky:
+      - tokeny se jednou převedou na celočíselná id (v pořadí prvního výskytu),
+      - počty slov i bigramů se spočítají v NumPy jedním průchodem,
+      - invertovaný index (id slova -> pozice) dává kontext slova v čase O(počet výskytů).
+    Nic nevypisuje, všechno vrací jako data.
+    S 'words' (např. slova, která zůstala ve Space-Saving souhrnu) se slovník, počty, bigramy
+    i invertovaný index staví jen pro tahle slova, ostatní tokeny mají id -1. Paměť navíc je pak
+    pole id (jedno číslo na token) + data pro max. len(words) slov, ne pro všechna různá slova.
+    Pro slova z 'words' jsou počty, kolokace i kontext stejné jako bez omezení, kolokace se slovem
+    mimo 'words' chybí.
+    """
+
+    def __init__(self, tokens: list, words: list = None):
+        # Seznam tokenů se nekopíruje, je potřeba jen pro text kontextu
+        self.tokens = tokens if isinstance(tokens, list) else list(tokens)
+        if words is None:
+            codes, vocabulary = pd.factorize(pd.Series(self.tokens, dtype=object))
+            self.ids = codes.astype(np.int64)
+            self.vocabulary = list(vocabulary)
+        else:
+            # Id jen pro vybraná slova, přečíslovaná v pořadí prvního výskytu (kvůli pořadí shod)
+            words = pd.Index(list(dict.fromkeys(words)), dtype=object)
+            ids = words.get_indexer(pd.Index(self.tokens, dtype=object)).astype(np.int64)
+            present = pd.unique(ids[ids >= 0])
+            renumber = np.full(len(words) + 1, -1, dtype=np.int64)
+            renumber[present] = np.arange(len(present))
+            self.ids = renumber[ids]
+            self.vocabulary = list(words[present])
+        self._word_to_id = {word: i for i, word in enumerate(self.vocabulary)}
+        self.counts = np.bincount(self.ids[self.ids >= 0], minlength=len(self.vocabulary))
+
+        # Invertovaný index: pozice všech výskytů slova i jsou positions[starts[i]:starts[i + 1]]
+        known = np.flatnonzero(self.ids >= 0)
+        self._positions = known[np.argsort(self.ids[known], kind='stable')]
+        self._starts = np.concatenate([[0], np.cumsum(self.counts)])
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    # --- Frekvence ---
+
+    def most_common(self, num: int = 10) -> list:
+        """Nejčastější slova [(slovo, počet), ...], shody v pořadí prvního výskytu (jako FreqDist)."""
+        order = np.argsort(-self.counts, kind='stable')[:num]
+        return [(self.vocabulary[i], int(self.counts[i])) for i in order]
+
+    def count(self, word: str) -> int:
+        word_id = self._word_to_id.get(word.lower())
+        if word_id is None:
+            return 0
+        return int(self.counts[word_id])
+
+    # --- Kolokace ---
+
+    def bigram_scores(self, measure: str = 'likelihood_ratio', min_freq: int = 2) -> pd.DataFrame:
+        """
+        Skóre všech sousedních dvojic slov, seřazené od nejlepší (při shodě abecedně, jako nltk).
+        Jako nltk.Text.collocations: bigramy s četností < min_freq a bigramy se slovem
+        kratším než 3 znaky nebo s anglickým stopword se vynechají.
+        Sloupce: w1, w2, count, score.
+        """
+        if measure not in _MEASURE_FUNCTIONS:
+            raise ValueError(f"Unknown measure '{measure}', choose from: {', '.join(MEASURES)}")
+
+        columns = ['w1', 'w2', 'count', 'score']
+        num_words = len(self.vocabulary)
+        if len(self.ids) < 2:
+            return pd.DataFrame(columns=columns)
+
+        # Bigram (a, b) -> jedno číslo a * num_words + b, spočítá se najednou přes np.unique
+        # (jen dvojice, kde obě slova mají id)
+        known = (self.ids[:-1] >= 0) & (self.ids[1:] >= 0)
+        pair_codes, pair_counts = np.unique(self.ids[:-1][known] * num_words + self.ids[1:][known],
+                                            return_counts=True)
+        first, second = np.divmod(pair_codes, num_words)
+        counts = self.counts
+
+        stop_words = _english_stop_words()
+        ignored = np.array([len(word) < 3 or word.lower() in stop_words for word in self.vocabulary])
+        keep = (pair_counts >= min_freq) & ~ignored[first] & ~ignored[second]
+        first, second, pair_counts = first[keep], second[keep], pair_counts[keep]
+
+        scores = _MEASURE_FUNCTIONS[measure](pair_counts.astype(float), counts[first].astype(float),
+                                             counts[second].astype(float), float(len(self.ids)))
+
+        # Pořadí jako nltk: nejvyšší skóre, při shodě podle (w1, w2) abecedně
+        alphabetical_rank = np.empty(num_words, dtype=np.int64)
+        alphabetical_rank[np.argsort(np.array(self.vocabulary, dtype=object))] = np.arange(num_words)
+        order = np.lexsort((alphabetical_rank[second], alphabetical_rank[first], -scores))
+
+        vocabulary = np.array(self.vocabulary, dtype=object)
+        return pd.DataFrame({
+            'w1': vocabulary[first[order]],
+            'w2': vocabulary[second[order]],
+            'count': pair_counts[order],
+            'score': scores[order],
+        }, columns=columns)
+
+    def collocations(self, num: int = 20, measure: str = 'likelihood_ratio', min_freq: int = 2) -> list:
+        """Nejlepší fráze [(w1, w2), ...] - stejný výsledek jako nltk.Text.collocation_list."""
+        top = self.bigram_scores(measure, min_freq).head(num)
+        return list(zip(top['w1'], top['w2']))
+
+    # --- Shody (concordance) ---
+
+    def offsets(self, word: str) -> np.ndarray:
+        """Pozice všech výskytů slova v seznamu tokenů (vzestupně), s indexem bez procházení celého textu."""
+        word_id = self._word_to_id.get(word.lower())
+        if word_id is None:
+            return np.empty(0, dtype=np.int64)
+        return self._positions[self._starts[word_id]:self._starts[word_id + 1]]
+
+    def concordance(self, word, width: int = 79, lines: int = 25) -> tuple:
+        """
+        Kontext slova (nebo fráze zadané jako seznam slov), řádky naformátované jako nltk.Text.concordance.
+        Vrací (celkový počet výskytů, seznam max. 'lines' ConcordanceLine).
+        """
+        phrase = word if isinstance(word, list) else [word]
+        offsets = self.offsets(phrase[0])
+        for i, next_word in enumerate(phrase[1:]):
+            offsets = np.intersect1d(offsets, self.offsets(next_word) - i - 1)
+
+        phrase_len = len(" ".join(phrase))
+        half_width = (width - phrase_len - 2) // 2
+        context = width // 4  # přibližný počet slov kontextu
+
+        result = []
+        for offset in offsets[:lines]:
+            offset = int(offset)
+            query = " ".join(self.tokens[offset:offset + len(phrase)])
+            left = self.tokens[max(0, offset - context):offset]
+            right = self.tokens[offset + len(phrase):offset + context]
+
+            left_text = " ".join(left)
+            left_print = left_text[max(0, len(left_text) - half_width):].rjust(half_width)
+            right_print = " ".join(right)[:max(0, half_width)]
+            result.append(ConcordanceLine(left, query, right, offset, " ".join([left_print, query, right_print])))
+
+        return len(offsets), result
+
+    # --- Všechno najednou ---
+
+    def summary(self, num_topics: int = 10, num_collocations: int = 5,
+                num_contexts: int = 3, lines: int = 5, top_topics: list = None) -> dict:
+        """
+        Výsledky pro analýzu témat jednoho seznamu tokenů:
+          - 'top_topics':   [(slovo, počet), ...] (nebo předané 'top_topics')
+          - 'collocations': [(w1, w2), ...]
+          - 'concordances': {slovo: (počet výskytů, [ConcordanceLine, ...])} pro 'num_contexts' top slov
+        """
+        if top_topics is None:
+            top_topics = self.most_common(num_topics)
+        return {
+            'top_topics': top_topics,
+            'collocations': self.collocations(num_collocations),
+            'concordances': {word: self.concordance(word, lines=lines) for word, _ in top_topics[:num_contexts]},
+        }
+
+
+# ---- Kód pro testování ----
+if __name__ == "__main__":
+    print("--- Testing topic_stats.py ---")
+
+    tokens = ['tax', 'plan', 'great', 'tax', 'plan', 'wall', 'great', 'wall', 'tax', 'plan', 'jobs']
+    stats = TopicStats(tokens)
+
+    print(f"Most common: {stats.most_common(3)}")
+    print(f"Collocations: {stats.collocations(5)}")
+    print(stats.bigram_scores('pmi'))
+    print(f"Only 'tax', 'plan': {TopicStats(tokens, words=['plan', 'tax']).most_common(3)}")
+
+    total, context_lines = stats.concordance('plan', lines=2)
+    print(f"'plan': {total} matches")
+    for context_line in context_lines:
+        print(context_line.line)
+
+    print("\n--- Test complete ---")
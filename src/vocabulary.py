@@ -0,0 +1,111 @@
+# src/vocabulary.py
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+class Vocabulary:
+    """Sdílený slovník slovo <-> celočíselné id, id se přidělují v pořadí prvního výskytu."""
+
+    def __init__(self):
+        self.words = []
+        self.ids = {}
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def add(self, words) -> np.ndarray:
+        """
+        Id slov (nová slova se přidají na konec). Slovník se prochází jen pro různá slova,
+        pro opakované výskyty stačí indexace pole.
+        """
+        codes, uniques = pd.factorize(pd.Series(words, dtype=object))
+        unique_ids = np.empty(len(uniques), dtype=np.int64)
+        for i, word in enumerate(uniques):
+            word_id = self.ids.get(word)
+            if word_id is None:
+                word_id = self.ids[word] = len(self.words)
+                self.words.append(word)
+            unique_ids[i] = word_id
+        return unique_ids[codes]
+
+
+class TermCounts:
+    """
+    Počty slov jako řídká matice skupina x slovo (scipy.sparse CSR): řádek = skupina
+    ('keys', např. dvojice kandidát + popisek), sloupec = id slova ze sdíleného slovníku,
+    hodnota = počet výskytů. 'first' je zarovnané s hodnotami matice a drží pozici
+    prvního výskytu slova ve skupině (kvůli pořadí shod jako u FreqDist).
+    Top slova libovolného výběru skupin = součet jejich řádků.
+    """
+
+    def __init__(self, keys: list, rows, columns, counts, first, num_words: int):
+        """Z trojic (řádek, sloupec, počet) - opakované dvojice se sečtou, u 'first' se bere minimum."""
+        self.keys = list(keys)
+        num_words = max(num_words, 1)
+        flat, inverse = np.unique(np.asarray(rows, dtype=np.int64) * num_words + np.asarray(columns, dtype=np.int64),
+                                  return_inverse=True)
+        summed = np.bincount(inverse, weights=counts, minlength=len(flat)).astype(np.int64)
+        self.first = np.full(len(flat), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(self.first, inverse, np.asarray(first, dtype=np.int64))
+
+        # Klíče jsou seřazené po řádcích a v řádku po sloupcích = kanonický tvar CSR
+        row_ids, column_ids = np.divmod(flat, num_words)
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(row_ids, minlength=len(self.keys)))))
+        self.matrix = sparse.csr_matrix((summed, column_ids.astype(np.int32), indptr),
+                                        shape=(len(self.keys), num_words))
+
+    @classmethod
+    def empty(cls) -> 'TermCounts':
+        return cls([], [], [], [], [], 0)
+
+    def entries(self, rows) -> np.ndarray:
+        """Pozice nenulových hodnot matice pro vybrané řádky (pole indexů řádků)."""
+        indptr = self.matrix.indptr
+        starts = indptr[rows]
+        lengths = indptr[np.asarray(rows) + 1] - starts
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        return offsets + np.arange(lengths.sum())
+
+    def row_ids(self) -> np.ndarray:
+        """Číslo řádku pro každou nenulovou hodnotu matice."""
+        return np.repeat(np.arange(len(self.keys)), np.diff(self.matrix.indptr))
+
+    def top(self, rows, num: int, exclude_ids=(), first_offsets=None) -> list:
+        """
+        Nejčastější sloupce vybraných řádků [(id slova, počet), ...], shody podle nejmenšího 'first'.
+        'first_offsets' (volitelně, po řádcích) se přičte k 'first', když řádky mají vlastní číslování pozic.
+        """
+        entries = self.entries(rows)
+        if len(entries) == 0:
+            return []
+        columns = self.matrix.indices[entries]
+        totals = np.bincount(columns, weights=self.matrix.data[entries], minlength=self.matrix.shape[1])
+        first = self.first[entries]
+        if first_offsets is not None:
+            first = first + np.repeat(first_offsets, np.diff(self.matrix.indptr)[rows])
+        first_seen = np.full(self.matrix.shape[1], np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first_seen, columns, first)
+
+        totals[list(exclude_ids)] = 0
+        present = np.flatnonzero(totals)
+        order = np.lexsort((first_seen[present], -totals[present]))[:num]
+        return [(int(i), int(totals[i])) for i in present[order]]
+
+
+# ---- Kód pro testování ----
+if __name__ == "__main__":
+    print("--- Testing vocabulary.py ---")
+
+    vocabulary = Vocabulary()
+    ids = vocabulary.add(['tax', 'plan', 'tax', 'wall', 'plan', 'jobs', 'wall', 'wall'])
+    print(f"Vocabulary: {vocabulary.words}, ids: {ids}")
+
+    rows = [0, 0, 0, 1, 1, 1, 1, 1]
+    counts = TermCounts(['A', 'B'], rows, ids, np.ones(len(ids)), [0, 1, 2, 0, 1, 2, 3, 4], len(vocabulary))
+    print(counts.matrix.toarray())
+    print(f"Top (all): {[(vocabulary.words[i], n) for i, n in counts.top([0, 1], 10)]}")
+    print(f"Top (B): {[(vocabulary.words[i], n) for i, n in counts.top([1], 10)]}")
+
+    print("\n--- Test complete ---")